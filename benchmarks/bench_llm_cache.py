@@ -0,0 +1,88 @@
+"""Cold vs warm scene generation with the on-disk LLM cache.
+
+Usage: uv run python benchmarks/bench_llm_cache.py [segments] [latency_ms]
+
+Serves chat completions from a local stub with a fixed latency, runs the
+same transcript twice through a fresh cache directory and reports wall
+time and the number of requests that reached the server.
+"""
+
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from talk2scene.llm_cache import LLMCache
+from talk2scene.performance import PerformanceMonitor
+from talk2scene.scene_gen import SceneGenerator
+
+SEGMENT_RE = re.compile(r"^\[([\d.]+)s - ([\d.]+)s\] Speaker: (.*?): (.*)$", re.M)
+
+
+def serve(latency_s: float) -> tuple[ThreadingHTTPServer, list]:
+    served = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            served.append(1)
+            time.sleep(latency_s)
+            prompt = body["messages"][-1]["content"].split("Segments:\n")[-1]
+            scenes = [
+                {"speaker_id": spk, "text": text, "sta": "STA_Stand_Front", "exp": "EXP_Neutral",
+                 "act": "ACT_None", "bg": "BG_Lab_Modern", "cg": "CG_None",
+                 "start": float(start), "end": float(end)}
+                for start, end, spk, text in SEGMENT_RE.findall(prompt)
+            ]
+            data = json.dumps({
+                "id": "bench", "object": "chat.completion", "created": 0, "model": "bench",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": json.dumps({"scenes": scenes})}}],
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, served
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency_s = (float(sys.argv[2]) if len(sys.argv) > 2 else 500) / 1000
+    server, served = serve(latency_s)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+    events = [
+        {"start": float(i), "end": i + 0.9, "speaker_id": "alice", "text": f"segment {i}"}
+        for i in range(n)
+    ]
+    print(f"{n} segments, chunks of 20, {latency_s * 1000:.0f} ms simulated latency")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label in ("cold", "warm"):
+            monitor = PerformanceMonitor()
+            gen = SceneGenerator(model="bench", chunk_size=20, cache=LLMCache(cache_dir), monitor=monitor)
+            before = len(served)
+            start = time.perf_counter()
+            gen.generate(events)
+            elapsed = time.perf_counter() - start
+            print(
+                f"  {label}: {elapsed * 1000:8.1f} ms  requests {len(served) - before:3d}  "
+                f"cache hits {monitor.counters['llm_cache_hits']:3d}"
+            )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Request and response size of scene generation per prompt encoding.
+
+Usage: uv run python benchmarks/bench_prompt.py [segments] [requests]
+
+Compares the original pretty-printed whitelist prompt with the compact
+"names" and index-based "codes" encodings, for `requests` requests of
+`segments` segments each (stream mode sends one segment per request).
+Tokens are estimated as characters / 4; real counts from the API are
+reported as llm_prompt_tokens / llm_completion_tokens in performance.json.
+"""
+
+import json
+import sys
+
+from talk2scene.scene_gen import CATEGORIES, SYSTEM_PROMPT, SceneGenerator, format_segments, system_prompt
+from talk2scene.whitelist import get_whitelist
+
+
+def transcript(n: int) -> list[dict]:
+    return [
+        {"type": "transcript", "start": float(i), "end": i + 0.9, "speaker_id": "alice",
+         "text": f"This is spoken line number {i} of the conversation."}
+        for i in range(n)
+    ]
+
+
+def main():
+    segments = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    wl = get_whitelist()
+    events = transcript(segments)
+    user_chars = len(format_segments(events))
+    scenes = SceneGenerator()._fallback_scenes(events)
+    for s in scenes:
+        del s["type"], s["seq"]
+    names_reply = json.dumps({"scenes": scenes}, ensure_ascii=False)
+    rows = [[wl[cat].index(s[cat.lower()]) for cat in CATEGORIES] for s in scenes]
+    codes_reply = json.dumps({"scenes": rows})
+
+    variants = [
+        ("pretty whitelist", len(SYSTEM_PROMPT.format(whitelist=json.dumps(wl, indent=2))), len(names_reply)),
+        ("names (compact)", len(system_prompt(wl, "names")), len(names_reply)),
+        ("codes", len(system_prompt(wl, "codes")), len(codes_reply)),
+    ]
+    print(f"{requests} requests x {segments} segments")
+    print(f"{'encoding':<18}{'system chars':>14}{'reply chars':>13}{'est. tokens':>13}")
+    for name, system_chars, reply_chars in variants:
+        tokens = requests * (system_chars + user_chars + reply_chars) / 4
+        print(f"{name:<18}{system_chars:>14}{reply_chars:>13}{tokens:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
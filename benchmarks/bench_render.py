@@ -0,0 +1,60 @@
+"""Per-frame render time of the PIL and NumPy backends.
+
+Usage: uv run python benchmarks/bench_render.py [frames]
+
+Renders the same random sequence of whitelist scenes with each backend,
+with the prefix composite cache off and on, after warming the layer cache.
+"""
+
+import random
+import sys
+import time
+
+import yaml
+
+from talk2scene.render_cache import configure_layer_cache, configure_prefix_cache
+from talk2scene.renderer import render_scene_rgb
+
+ASSET_DIRS = {"sta": "assets/sta", "exp": "assets/exp", "act": "assets/act", "bg": "assets/bg", "cg": "assets/cg"}
+
+
+def scenes(n: int) -> list[dict]:
+    with open("conf/whitelist.yaml") as f:
+        wl = yaml.safe_load(f)
+    rng = random.Random(0)
+    return [
+        {
+            "bg": rng.choice(wl["BG"]),
+            "sta": rng.choice(wl["STA"]),
+            "act": rng.choice(wl["ACT"]),
+            "exp": rng.choice(wl["EXP"]),
+            "cg": "CG_None",
+        }
+        for _ in range(n)
+    ]
+
+
+def bench(backend: str, states: list[dict], prefix_entries: int) -> float:
+    configure_layer_cache(256 * 1024 * 1024)
+    configure_prefix_cache(prefix_entries)
+    for state in states[:50]:  # warm the layer cache
+        render_scene_rgb(state, ASSET_DIRS, (1024, 1024), backend)
+    start = time.perf_counter()
+    for state in states:
+        render_scene_rgb(state, ASSET_DIRS, (1024, 1024), backend)
+    return (time.perf_counter() - start) / len(states) * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    states = scenes(n)
+    print(f"{n} frames at 1024x1024, ms/frame")
+    for prefix_entries in (0, 32):
+        label = "prefix cache on " if prefix_entries else "prefix cache off"
+        pil = bench("pil", states, prefix_entries)
+        np_ = bench("numpy", states, prefix_entries)
+        print(f"  {label}: pil {pil:6.2f}  numpy {np_:6.2f}  ({pil / np_:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
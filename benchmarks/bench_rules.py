@@ -0,0 +1,60 @@
+"""Throughput of the offline rule-based scene generator.
+
+Usage: uv run python benchmarks/bench_rules.py [segments] [distinct_lines]
+
+Generates scenes for `segments` transcript segments with every text
+distinct, so each one goes through the rules (the engine memoizes by
+text), then again for segments drawn from `distinct_lines` distinct texts
+(dialogue repeats, mostly memo hits), and reports segments per second for
+both. Quote the first figure for throughput on new dialogue.
+"""
+
+import sys
+import time
+
+from talk2scene.rule_engine import RuleSceneGenerator
+
+LINES = [
+    "Hello everyone, welcome back to the lab!",
+    "Hmm, let me think about that for a second.",
+    "Haha, that is a funny one.",
+    "Actually, the data from the experiment says otherwise.",
+    "Wow, I did not expect that at all.",
+    "Because the model learns from examples, for example this one.",
+    "I'm a little worried about the risk here.",
+    "Let's grab a coffee and talk it over.",
+    "大家好，欢迎来到实验室。",
+    "哈哈，这个太好笑了。",
+    "其实数据显示的结果不一样。",
+    "That's all for today, goodbye!",
+]
+
+
+def transcript(segments: int, distinct: int) -> list[dict]:
+    events = []
+    for i in range(segments):
+        n = i % distinct if distinct else i
+        events.append({"type": "transcript", "start": float(i), "end": i + 0.9,
+                       "speaker_id": "alice", "text": f"{LINES[n % len(LINES)]} ({n})"})
+    return events
+
+
+def bench(label: str, events: list[dict]):
+    gen = RuleSceneGenerator()
+    t0 = time.perf_counter()
+    scenes = gen.generate(events)
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<32} {len(scenes)} segments in {elapsed:.2f}s: {len(scenes) / elapsed:>10,.0f} segments/s")
+
+
+def main():
+    segments = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    bench("all distinct (memo misses)", transcript(segments, 0))
+    if distinct:
+        bench(f"{distinct} distinct (memo hits)", transcript(segments, distinct))
+
+
+if __name__ == "__main__":
+    main()
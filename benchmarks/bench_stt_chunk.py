@@ -0,0 +1,76 @@
+"""Per-chunk audio preparation for Whisper: temp WAV file vs in-memory array.
+
+Usage: uv run python benchmarks/bench_stt_chunk.py [chunk_ms] [chunks] [model_size]
+
+"Before" is the old transcribe_chunk path: write the PCM to a temporary
+WAV file, then decode it back into float32 samples the way whisper's
+load_audio does (an ffmpeg subprocess; when ffmpeg is not installed, the
+WAV is read back with the wave module, which understates the cost).
+"After" is audio.pcm_to_float32 on the bytes as they came from Redis.
+With openai-whisper installed and a model_size given, whole transcriptions
+are timed both ways as well.
+"""
+
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from talk2scene.audio import pcm_to_float32
+
+
+def via_temp_wav(pcm: bytes, sample_rate: int) -> np.ndarray:
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=True) as tmp:
+        with wave.open(tmp.name, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(sample_rate)
+            wf.writeframes(pcm)
+        if shutil.which("ffmpeg"):
+            cmd = ["ffmpeg", "-nostdin", "-threads", "0", "-i", tmp.name,
+                   "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", "16000", "-"]
+            out = subprocess.run(cmd, capture_output=True, check=True).stdout
+        else:
+            with wave.open(tmp.name, "rb") as wf:
+                out = wf.readframes(wf.getnframes())
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+
+def timed(fn, chunks: int) -> float:
+    started = time.perf_counter()
+    for _ in range(chunks):
+        fn()
+    return (time.perf_counter() - started) / chunks * 1000
+
+
+def main():
+    chunk_ms = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    chunks = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    model_size = sys.argv[3] if len(sys.argv) > 3 else None
+    sample_rate = 16000
+
+    rng = np.random.default_rng(0)
+    pcm = rng.integers(-3000, 3000, sample_rate * chunk_ms // 1000, dtype=np.int16).tobytes()
+    assert np.allclose(via_temp_wav(pcm, sample_rate), pcm_to_float32(pcm, sample_rate))
+
+    decoder = "ffmpeg" if shutil.which("ffmpeg") else "wave module, ffmpeg not installed"
+    print(f"{chunks} chunks of {chunk_ms} ms")
+    print(f"before: temp WAV + decode ({decoder})  {timed(lambda: via_temp_wav(pcm, sample_rate), chunks):8.3f} ms/chunk")
+    print(f"after:  pcm_to_float32                  {timed(lambda: pcm_to_float32(pcm, sample_rate), chunks):8.3f} ms/chunk")
+
+    if model_size:
+        import whisper
+
+        model = whisper.load_model(model_size)
+        n = max(1, chunks // 10)
+        before = timed(lambda: model.transcribe(via_temp_wav(pcm, sample_rate)), n)
+        after = timed(lambda: model.transcribe(pcm_to_float32(pcm, sample_rate)), n)
+        print(f"transcribe ({model_size}): before {before:.1f} ms/chunk, after {after:.1f} ms/chunk")
+
+
+if __name__ == "__main__":
+    main()
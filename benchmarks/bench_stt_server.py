@@ -0,0 +1,49 @@
+"""Transcriber startup: loading Whisper per run vs connecting to mode=stt-server.
+
+Usage: uv run python benchmarks/bench_stt_server.py [model_size] [runs]
+
+"Cold" builds a Transcriber (loading the local Whisper model, as every
+batch run and stream worker did); "warm" connects a RemoteTranscriber to a
+server that loaded the model once. Without openai-whisper installed the
+Transcriber uses the API and there is no model to load, so both are fast.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from talk2scene.stt_server import RemoteTranscriber, STTServer
+from talk2scene.transcription import Transcriber
+
+
+def main():
+    model_size = sys.argv[1] if len(sys.argv) > 1 else "base"
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    cold = []
+    transcriber = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        transcriber = Transcriber(model_size=model_size)
+        cold.append(time.perf_counter() - started)
+
+    socket_path = os.path.join(tempfile.mkdtemp(), "stt.sock")
+    server = STTServer(transcriber, socket_path, {"model_size": model_size})
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    warm = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        RemoteTranscriber(socket_path).close()
+        warm.append(time.perf_counter() - started)
+    server.shutdown()
+    server.server_close()
+
+    print(f"model {model_size} ({'local' if transcriber.model is not None else 'API, no local model'}), {runs} runs")
+    print(f"cold start (load model)     {sum(cold) / runs * 1000:10.1f} ms avg")
+    print(f"warm start (connect server) {sum(warm) / runs * 1000:10.1f} ms avg")
+
+
+if __name__ == "__main__":
+    main()
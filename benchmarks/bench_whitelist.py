@@ -0,0 +1,60 @@
+"""Whitelist validation throughput over many scene events.
+
+Usage: uv run python benchmarks/bench_whitelist.py [events] [invalid_pct]
+
+Validates `events` scene events, `invalid_pct` percent of which carry a
+near-miss code, three ways: the original per-event list lookups,
+validate_scene_event per event, and the batch validate_scene_events.
+"""
+
+import random
+import sys
+import time
+
+from talk2scene.whitelist import CATEGORIES, get_whitelist, validate_scene_event, validate_scene_events
+
+
+def list_lookup_validate(event: dict, wl: dict) -> dict:
+    """Validation as implemented before the compiled whitelist."""
+    repaired = dict(event)
+    for cat in CATEGORIES:
+        codes = wl.get(cat.upper(), [])
+        if cat in repaired and repaired[cat] not in codes:
+            repaired[cat] = codes[0]
+    return repaired
+
+
+def make_events(n: int, invalid_pct: float) -> list[dict]:
+    wl = get_whitelist()
+    rng = random.Random(0)
+    events = []
+    for i in range(n):
+        ev = {"type": "scene", "seq": i, "text": "line"}
+        for cat in CATEGORIES:
+            ev[cat] = rng.choice(wl[cat.upper()])
+        if rng.random() * 100 < invalid_pct:
+            ev["exp"] = ev["exp"].lower()
+        events.append(ev)
+    return events
+
+
+def timed(label: str, fn, n: int):
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<24}{elapsed:>8.2f}s {n / elapsed:>14,.0f} events/s")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    invalid_pct = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    wl = get_whitelist()
+    events = make_events(n, invalid_pct)
+    print(f"{n:,} events, {invalid_pct:g}% invalid")
+    timed("list lookups", lambda: [list_lookup_validate(ev, wl) for ev in events], n)
+    timed("validate_scene_event", lambda: [validate_scene_event(ev) for ev in events], n)
+    timed("validate_scene_events", lambda: validate_scene_events(events), n)
+
+
+if __name__ == "__main__":
+    main()
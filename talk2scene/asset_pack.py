@@ -0,0 +1,103 @@
+"""Pre-decoded asset pack, memory-mapped at load time.
+
+PNG decoding and resizing dominate startup and first-render latency.
+`mode=pack-assets` decodes every asset listed in assets/manifest.json once,
+at one canvas size, and writes the raw layers to a single binary file plus
+a JSON index:
+
+    assets/pack/assets_{W}x{H}.bin    layers, 64-byte aligned
+    assets/pack/assets_{W}x{H}.json   version, canvas size, manifest mtime,
+                                      per-layer source mtime, bbox and offsets
+
+Each layer is stored as straight-alpha RGBA (what PIL composites) plus the
+NumPy backend's pre-multiplied terms, so either backend renders the exact
+same pixels as from the PNGs. The loader maps the file read-only, which
+also lets every render process share it through the page cache.
+
+A pack is ignored when manifest.json changed after it was written, and a
+single layer is ignored when its PNG did; those layers are decoded from the
+PNG as usual.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from talk2scene.atlas import PackedLayers, decode_layers, layout_layers, manifest_asset_paths
+
+logger = logging.getLogger(__name__)
+
+PACK_VERSION = 1
+
+
+def pack_paths(pack_dir: str, canvas_size: tuple[int, int]) -> tuple[Path, Path]:
+    """(binary, index) paths of the pack for canvas_size."""
+    stem = f"assets_{canvas_size[0]}x{canvas_size[1]}"
+    return Path(pack_dir) / f"{stem}.bin", Path(pack_dir) / f"{stem}.json"
+
+
+def write_pack(manifest_path: str, canvas_size: tuple[int, int], pack_dir: str) -> Path:
+    """Decode every manifest asset at canvas_size into a pack. Returns the binary path."""
+    canvas_size = tuple(canvas_size)
+    layers = decode_layers(manifest_asset_paths(manifest_path), canvas_size, numpy_terms=True)
+    entries, size = layout_layers(layers)
+
+    bin_path, index_path = pack_paths(pack_dir, canvas_size)
+    bin_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = bin_path.with_name(bin_path.name + ".tmp")
+    data = np.memmap(tmp_path, dtype=np.uint8, mode="w+", shape=(max(size, 1),))
+    PackedLayers(data, entries, canvas_size)._fill(layers)
+    data.flush()
+    del data
+    os.replace(tmp_path, bin_path)
+
+    # The index goes last: a pack without a matching index is never loaded
+    index = {
+        "version": PACK_VERSION,
+        "canvas_size": list(canvas_size),
+        "manifest_mtime_ns": os.stat(manifest_path).st_mtime_ns,
+        "size": size,
+        "entries": entries,
+    }
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
+
+    logger.info(f"Asset pack written: {bin_path} ({len(entries)} layers, {size / (1024 * 1024):.1f} MB)")
+    return bin_path
+
+
+def load_pack(manifest_path: str, canvas_size: tuple[int, int], pack_dir: str) -> Optional[PackedLayers]:
+    """Memory-map the pack for canvas_size, or None when it is missing or stale."""
+    canvas_size = tuple(canvas_size)
+    bin_path, index_path = pack_paths(pack_dir, canvas_size)
+    if not bin_path.exists() or not index_path.exists():
+        logger.debug(f"No asset pack at {index_path}")
+        return None
+
+    with open(index_path) as f:
+        index = json.load(f)
+    if index.get("version") != PACK_VERSION or tuple(index.get("canvas_size", ())) != canvas_size:
+        logger.warning(f"Asset pack {index_path} has an incompatible format, using PNG assets")
+        return None
+    if not Path(manifest_path).exists() or os.stat(manifest_path).st_mtime_ns != index["manifest_mtime_ns"]:
+        logger.warning(f"Asset pack {index_path} is older than {manifest_path}, using PNG assets")
+        return None
+    if bin_path.stat().st_size < index["size"]:
+        logger.warning(f"Asset pack {bin_path} is truncated, using PNG assets")
+        return None
+
+    stale = [
+        e["path"] for e in index["entries"]
+        if not Path(e["path"]).exists() or os.stat(e["path"]).st_mtime_ns != e["mtime_ns"]
+    ]
+    if stale:
+        logger.warning(f"{len(stale)} packed assets changed since packing; they are decoded from PNG")
+
+    data = np.memmap(bin_path, dtype=np.uint8, mode="r")
+    return PackedLayers(data, index["entries"], canvas_size)
@@ -0,0 +1,238 @@
+"""Shared-memory atlas of decoded asset layers for multi-process rendering.
+
+Every video render worker would otherwise decode and hold its own copy of
+each layer (4 MB per 1024x1024 RGBA layer, more with the NumPy backend's
+pre-multiplied terms). The parent decodes the assets listed in
+assets/manifest.json once into a single multiprocessing.shared_memory
+block; workers attach to it by name and composite from zero-copy views, so
+layer memory stays constant as the worker count grows.
+
+Entries are keyed like the layer cache, by (path, mtime, canvas_size), so an
+asset edited after the atlas was built simply misses and is decoded as usual.
+The same layout backs the on-disk asset pack (see talk2scene.asset_pack).
+"""
+
+import json
+import logging
+import os
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+from PIL import Image
+
+from talk2scene.render_cache import LayerArray, decode_layer
+
+logger = logging.getLogger(__name__)
+
+# Offsets of the arrays inside the block are aligned to this many bytes
+_ALIGN = 64
+
+
+def manifest_asset_paths(manifest_path: str) -> list[str]:
+    """Asset file paths listed in an asset manifest, in manifest order."""
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    return [
+        entry["path"]
+        for codes in manifest.get("assets", {}).values()
+        for entry in codes.values()
+    ]
+
+
+def decode_layers(
+    paths: Iterable[str],
+    canvas_size: tuple[int, int],
+    numpy_terms: bool,
+) -> list[tuple[str, int, dict, Optional[tuple], bool]]:
+    """Decode assets for packing: (path, mtime_ns, arrays, bbox, opaque) each.
+
+    arrays always holds the straight-alpha RGBA "array"; numpy_terms adds
+    the NumPy backend's rgb / premul / inv_alpha. Missing files are skipped.
+    """
+    canvas_size = tuple(canvas_size)
+    layers = []
+    for path in dict.fromkeys(paths):
+        if not Path(path).exists():
+            logger.warning(f"Asset not found: {path}")
+            continue
+        mtime_ns = os.stat(path).st_mtime_ns
+        layer = LayerArray.from_image(decode_layer(path, canvas_size))
+        arrays = {"array": layer.array}
+        if numpy_terms:
+            arrays.update(rgb=layer.rgb, premul=layer.premul, inv_alpha=layer.inv_alpha)
+        arrays = {name: arr for name, arr in arrays.items() if arr is not None}
+        layers.append((path, mtime_ns, arrays, layer.bbox, layer.opaque))
+    return layers
+
+
+def layout_layers(layers: list[tuple]) -> tuple[list[dict], int]:
+    """Assign aligned byte offsets to decoded layers.
+
+    Returns (entries, total_size); each entry records path, mtime_ns, bbox,
+    opaque and fields, a {name: (offset, shape, dtype)} map into the block.
+    """
+    entries = []
+    offset = 0
+    for path, mtime_ns, arrays, bbox, opaque in layers:
+        fields = {}
+        for name, arr in arrays.items():
+            fields[name] = (offset, tuple(arr.shape), arr.dtype.str)
+            offset += -(-arr.nbytes // _ALIGN) * _ALIGN
+        entries.append({"path": path, "mtime_ns": mtime_ns, "bbox": bbox, "opaque": opaque, "fields": fields})
+    return entries, offset
+
+
+class PackedLayers:
+    """Decoded layers laid out in one flat buffer, served as zero-copy views.
+
+    buffer is anything exposing the buffer protocol (a shared memory block,
+    a read-only np.memmap); entries come from layout_layers(). lookup()
+    matches the layer source interface of talk2scene.render_cache.
+    """
+
+    def __init__(self, buffer, entries: list[dict], canvas_size: tuple[int, int]):
+        self._buffer = buffer
+        self.entries = entries
+        self.canvas_size = tuple(canvas_size)
+        self.index = {
+            (os.path.realpath(e["path"]), e["mtime_ns"], self.canvas_size): e for e in entries
+        }
+        self._views: dict[tuple, object] = {}
+        self._realpaths: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _field(self, entry: dict, name: str, writeable: bool = False) -> np.ndarray:
+        offset, shape, dtype = entry["fields"][name]
+        arr = np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=self._buffer, offset=offset)
+        arr.flags.writeable = writeable
+        return arr
+
+    def _fill(self, layers: list[tuple]):
+        """Copy decoded layers into the (writable) buffer, in entries order."""
+        for entry, (_, _, arrays, _, _) in zip(self.entries, layers):
+            for name, arr in arrays.items():
+                self._field(entry, name, writeable=True)[...] = arr
+
+    def lookup(self, path: str, canvas_size: tuple[int, int], kind: str):
+        """Zero-copy view of a layer: a PIL image ("image") or LayerArray ("array").
+
+        Returns None when the layer is not packed (or lacks its NumPy
+        terms), or the file changed since it was packed.
+        """
+        if tuple(canvas_size) != self.canvas_size:
+            return None
+        real = self._realpaths.get(path)
+        if real is None:
+            real = self._realpaths[path] = os.path.realpath(path)
+        key = (real, os.stat(path).st_mtime_ns, self.canvas_size)
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        view = self._views.get(key + (kind,))
+        if view is not None:
+            return view
+
+        fields = entry["fields"]
+        if entry["opaque"]:
+            has_numpy_terms = "rgb" in fields
+        else:
+            has_numpy_terms = "premul" in fields or entry["bbox"] is None
+        if kind == "image":
+            view = Image.fromarray(self._field(entry, "array"), "RGBA")
+        elif has_numpy_terms:
+            view = LayerArray.from_parts(
+                self._field(entry, "array"),
+                tuple(entry["bbox"]) if entry["bbox"] is not None else None,
+                entry["opaque"],
+                rgb=self._field(entry, "rgb") if "rgb" in fields else None,
+                premul=self._field(entry, "premul") if "premul" in fields else None,
+                inv_alpha=self._field(entry, "inv_alpha") if "inv_alpha" in fields else None,
+            )
+        else:
+            # Packed for the PIL backend only: no pre-multiplied terms
+            return None
+        self._views[key + (kind,)] = view
+        return view
+
+
+class AssetAtlas(PackedLayers):
+    """Decoded layers packed into one shared memory block.
+
+    The process that builds an atlas owns the block and unlinks it on
+    close(); other processes attach() to it through handle(), which is a
+    small picklable tuple suitable for Pool initargs.
+    """
+
+    def __init__(
+        self,
+        shm: shared_memory.SharedMemory,
+        entries: list[dict],
+        canvas_size: tuple[int, int],
+        owner: bool,
+    ):
+        super().__init__(shm.buf, entries, canvas_size)
+        self._shm = shm
+        self._owner = owner
+
+    @classmethod
+    def build(
+        cls,
+        paths: Iterable[str],
+        canvas_size: tuple[int, int],
+        backend: str = "pil",
+    ) -> "AssetAtlas":
+        """Decode paths at canvas_size and copy them into a new shared block.
+
+        The NumPy backend's pre-multiplied terms are stored alongside the
+        RGBA pixels when backend is "numpy". Missing files are skipped.
+        """
+        layers = decode_layers(paths, canvas_size, numpy_terms=backend == "numpy")
+        entries, size = layout_layers(layers)
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        atlas = cls(shm, entries, canvas_size, owner=True)
+        atlas._fill(layers)
+        return atlas
+
+    @classmethod
+    def from_manifest(
+        cls,
+        manifest_path: str,
+        canvas_size: tuple[int, int],
+        backend: str = "pil",
+        include: Optional[Iterable[str]] = None,
+    ) -> "AssetAtlas":
+        """Build an atlas of the manifest's assets, optionally only those in include."""
+        paths = manifest_asset_paths(manifest_path)
+        if include is not None:
+            wanted = {os.path.realpath(p) for p in include}
+            paths = [p for p in paths if os.path.realpath(p) in wanted]
+        return cls.build(paths, canvas_size, backend)
+
+    def handle(self) -> tuple:
+        return self._shm.name, self.entries, self.canvas_size
+
+    @classmethod
+    def attach(cls, handle: tuple) -> "AssetAtlas":
+        name, entries, canvas_size = handle
+        return cls(shared_memory.SharedMemory(name=name), entries, canvas_size, owner=False)
+
+    @property
+    def nbytes(self) -> int:
+        return self._shm.size
+
+    def close(self):
+        """Detach from the block; the owning process also frees it."""
+        self._views.clear()
+        self._buffer = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # A view handed out by lookup() is still alive; the mapping goes
+            # away with the process
+            pass
+        if self._owner:
+            self._shm.unlink()
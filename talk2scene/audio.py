@@ -1,4 +1,4 @@
-"""Audio input: batch file loading and Redis stream consumer."""
+"""Audio input: batch file loading, Redis stream consumer, and voice activity detection."""
 
 import io
 import logging
@@ -7,8 +7,13 @@ import wave
 from pathlib import Path
 from typing import Iterator, Optional
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# Sample rate Whisper models take input arrays at
+WHISPER_SAMPLE_RATE = 16000
+
 
 def normalize_audio(input_path: str, output_path: str, sample_rate: int = 16000) -> str:
     from pydub import AudioSegment
@@ -109,3 +114,185 @@ def chunks_to_wav(chunks: list[bytes], sample_rate: int = 16000) -> bytes:
         for chunk in chunks:
             wf.writeframes(chunk)
     return buf.getvalue()
+
+
+def pcm_to_float32(audio_bytes: bytes, sample_rate: int = WHISPER_SAMPLE_RATE) -> np.ndarray:
+    """Mono 16-bit PCM as float32 samples in [-1, 1) at Whisper's 16 kHz.
+
+    The bytes are read in place with np.frombuffer; the only copy is the
+    float conversion itself. Other sample rates are resampled linearly.
+    """
+    samples = np.frombuffer(audio_bytes, dtype="<i2", count=len(audio_bytes) // 2)
+    audio = np.multiply(samples, np.float32(1 / 32768), dtype=np.float32)
+    if sample_rate != WHISPER_SAMPLE_RATE and len(audio):
+        n = round(len(audio) * WHISPER_SAMPLE_RATE / sample_rate)
+        positions = np.arange(n, dtype=np.float64) * (sample_rate / WHISPER_SAMPLE_RATE)
+        audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+    return audio
+
+
+class EnergyVAD:
+    """Frame-level speech detection from RMS energy and zero-crossing rate.
+
+    A frame is speech when its RMS level (full scale = 1.0) reaches
+    energy_threshold and its zero-crossing rate stays at or below max_zcr;
+    broadband hiss crosses zero on about half its samples, voiced speech on
+    far fewer.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 30,
+        energy_threshold: float = 0.01,
+        max_zcr: float = 0.35,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_len = max(2, sample_rate * frame_ms // 1000)
+        self.energy_threshold = energy_threshold
+        self.max_zcr = max_zcr
+
+    def features(self, samples: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """(RMS, zero-crossing rate) of each whole frame of float32 samples."""
+        n = len(samples) // self.frame_len
+        frames = samples[:n * self.frame_len].reshape(n, self.frame_len)
+        rms = np.sqrt(np.mean(np.square(frames), axis=1))
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_len - 1)
+        return rms, zcr
+
+    def is_speech(self, samples: np.ndarray) -> np.ndarray:
+        rms, zcr = self.features(samples)
+        return (rms >= self.energy_threshold) & (zcr <= self.max_zcr)
+
+
+class SpeechGate:
+    """Cuts a PCM16 stream into speech segments, dropping the silence between them.
+
+    feed() returns (pcm, start_s, closed) pieces: a segment is closed after
+    min_silence_ms of silence and keeps padding_ms of audio on either side;
+    a segment reaching max_segment_s is passed on unclosed, and continues
+    in the next piece at the time the previous one ended. start_s is the
+    stream time of the piece's first sample. skipped_s of total_s seconds
+    were silence that was never passed on.
+    """
+
+    def __init__(
+        self,
+        vad: EnergyVAD,
+        min_silence_ms: int = 500,
+        padding_ms: int = 200,
+        max_segment_s: float = 10.0,
+    ):
+        self.vad = vad
+        self.frame_s = vad.frame_len / vad.sample_rate
+        self._frame_bytes = vad.frame_len * 2
+        self.min_silence_frames = max(1, round(min_silence_ms / 1000 / self.frame_s))
+        self.padding_frames = round(padding_ms / 1000 / self.frame_s)
+        self.max_segment_frames = max(1, round(max_segment_s / self.frame_s))
+        self.total_s = 0.0
+        self.skipped_s = 0.0
+        # Stream time of the next frame
+        self._time = 0.0
+        self._carry = b""
+        # Silent frames kept while idle, to lead into the next segment
+        self._preroll: list[bytes] = []
+        self._segment: Optional[list[bytes]] = None
+        self._segment_start = 0.0
+        self._silent_run = 0
+
+    @property
+    def skipped_fraction(self) -> float:
+        return self.skipped_s / self.total_s if self.total_s else 0.0
+
+    def feed(self, audio_bytes: bytes) -> list[tuple[bytes, float, bool]]:
+        data = self._carry + audio_bytes
+        n = len(data) // self._frame_bytes
+        self._carry = data[n * self._frame_bytes:]
+        speech = self.vad.is_speech(pcm_to_float32(data[:n * self._frame_bytes], self.vad.sample_rate))
+        pieces = []
+        for i in range(n):
+            frame = data[i * self._frame_bytes:(i + 1) * self._frame_bytes]
+            self._frame(frame, bool(speech[i]), pieces)
+            self._time += self.frame_s
+            self.total_s += self.frame_s
+        return pieces
+
+    def flush(self) -> list[tuple[bytes, float, bool]]:
+        """Close the open segment at the end of the stream."""
+        pieces = []
+        if self._segment is not None:
+            self._close(pieces, keep=len(self._segment))
+        self.skipped_s += len(self._preroll) * self.frame_s
+        self._preroll = []
+        return pieces
+
+    def _frame(self, frame: bytes, speech: bool, pieces: list):
+        if self._segment is None:
+            if not speech:
+                self._preroll.append(frame)
+                if len(self._preroll) > self.padding_frames:
+                    self._preroll.pop(0)
+                    self.skipped_s += self.frame_s
+                return
+            self._segment = self._preroll + [frame]
+            self._segment_start = self._time - len(self._preroll) * self.frame_s
+            self._preroll = []
+            self._silent_run = 0
+        else:
+            self._segment.append(frame)
+            self._silent_run = 0 if speech else self._silent_run + 1
+
+        if self._silent_run >= self.min_silence_frames:
+            self._close(pieces, keep=len(self._segment) - self._silent_run + self.padding_frames)
+        elif len(self._segment) >= self.max_segment_frames:
+            pieces.append((b"".join(self._segment), self._segment_start, False))
+            self._segment_start += len(self._segment) * self.frame_s
+            self._segment = []
+
+    def _close(self, pieces: list, keep: int):
+        """Emit the segment's first keep frames as closed; the rest is silence."""
+        # The silent run may have begun before the last max_segment_s cut
+        keep = max(0, min(keep, len(self._segment)))
+        pieces.append((b"".join(self._segment[:keep]), self._segment_start, True))
+        self.skipped_s += (len(self._segment) - keep) * self.frame_s
+        self._segment = None
+        self._silent_run = 0
+
+
+def split_at_silence(
+    wav_path: str,
+    chunk_s: float = 120.0,
+    search_s: float = 10.0,
+    vad: Optional[EnergyVAD] = None,
+) -> list[tuple[int, int]]:
+    """Frame ranges of about chunk_s covering a mono 16-bit WAV, cut at pauses.
+
+    Each cut is placed at the quietest frame of the search_s seconds before
+    the chunk_s mark, so no cut lands inside a word when there is a pause
+    nearby. Only those search windows are read, never the whole file.
+    """
+    with wave.open(wav_path, "rb") as wf:
+        if wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+            raise ValueError(f"Expected mono 16-bit PCM: {wav_path}")
+        sample_rate = wf.getframerate()
+        total = wf.getnframes()
+        vad = vad or EnergyVAD(sample_rate)
+        chunk = max(1, int(chunk_s * sample_rate))
+        search = min(chunk - 1, int(search_s * sample_rate))
+
+        ranges = []
+        start = 0
+        while total - start > chunk:
+            low = start + chunk - search
+            wf.setpos(low)
+            # Only levels are compared here, so the samples are not resampled
+            rms, _ = vad.features(pcm_to_float32(wf.readframes(search)))
+            if len(rms):
+                cut = low + int(np.argmin(rms)) * vad.frame_len + vad.frame_len // 2
+            else:
+                cut = start + chunk
+            ranges.append((start, cut))
+            start = cut
+        ranges.append((start, total))
+    return ranges
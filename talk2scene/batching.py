@@ -0,0 +1,136 @@
+"""Micro-batching of stream-mode scene generation.
+
+Each STT "final" message carries one short utterance. Generating scenes
+for each on its own turns a burst of utterances into a burst of serial
+LLM round-trips. MicroBatcher collects submitted segments for up to
+max_delay_ms after the first one (or until max_segments are waiting),
+processes them with a single call on a background thread, and hands each
+submission its own slice of the results, in submission order.
+
+While a batch is being processed new submissions keep accumulating, so
+the batch size grows with the load and the consumer loop is never blocked
+on the LLM. process may return a lazy iterable (a streamed completion);
+each submission is then delivered as soon as its own results are in.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Batch submissions for process(items) -> iterable of results, one per item.
+
+    deliver(items, results) is called once per submission, in submission
+    order, on the batcher thread; a submission's results line up with its
+    items. With indexed=True process yields (item index, result) pairs
+    instead, in item order, any number per item. Call close() to flush what
+    is pending and stop the thread.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[list], Iterable],
+        deliver: Callable[[list, list], None],
+        max_delay_ms: float = 250,
+        max_segments: int = 8,
+        indexed: bool = False,
+    ):
+        self.process = process
+        self.deliver = deliver
+        self.max_delay_s = max(0.0, max_delay_ms / 1000.0)
+        self.max_segments = max(1, max_segments)
+        self.indexed = indexed
+        self.batches = 0
+        # (submitted at, items) per waiting submission
+        self._pending: list[tuple[float, list]] = []
+        self._pending_items = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, items: list):
+        if not items:
+            return
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._pending.append((time.monotonic(), list(items)))
+            self._pending_items += len(items)
+            self._cond.notify()
+
+    def _take(self) -> list[list]:
+        """Wait for a full or expired batch (or close) and take it (lock held)."""
+        while True:
+            if self._pending:
+                wait = self._pending[0][0] + self.max_delay_s - time.monotonic()
+                if self._closed or self._pending_items >= self.max_segments or wait <= 0:
+                    break
+                self._cond.wait(wait)
+            elif self._closed:
+                return []
+            else:
+                self._cond.wait()
+        # Whole submissions only, so a submission is never split across batches
+        batch, n = [], 0
+        while self._pending and (not batch or n + len(self._pending[0][1]) <= self.max_segments):
+            items = self._pending.pop(0)[1]
+            n += len(items)
+            batch.append(items)
+        self._pending_items -= n
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                batch = self._take()
+            if not batch:
+                return
+            items = [item for submission in batch for item in submission]
+            try:
+                self._process_batch(batch, items)
+            except Exception as e:
+                logger.error(f"Batch of {len(items)} items failed: {e}")
+            self.batches += 1
+
+    def _process_batch(self, batch: list[list], items: list):
+        # Item index one past the end of each submission
+        ends, n = [], 0
+        for submission in batch:
+            n += len(submission)
+            ends.append(n)
+        last = len(batch) - 1
+        current, results = 0, []
+        for i, result in enumerate(self.process(items)):
+            index = i
+            if self.indexed:
+                index, result = result
+            # A result for a later submission's item completes the ones before it
+            while current < last and index >= ends[current]:
+                self._deliver(batch[current], results)
+                current, results = current + 1, []
+            results.append(result)
+            if not self.indexed and current < last and i + 1 >= ends[current]:
+                self._deliver(batch[current], results)
+                current, results = current + 1, []
+        # Extra results stay with the last submission; missing ones leave the rest short
+        self._deliver(batch[current], results)
+        for submission in batch[current + 1:]:
+            self._deliver(submission, [])
+
+    def _deliver(self, submission: list, results: list):
+        try:
+            self.deliver(submission, results)
+        except Exception as e:
+            logger.error(f"Delivering batch results failed: {e}")
+
+    def close(self):
+        """Process everything submitted so far, then stop the batcher thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
@@ -1,18 +1,38 @@
 """Talk2Scene CLI entry point with Hydra configuration."""
 
+import bisect
+import contextlib
+import functools
 import json
 import logging
 import signal
 import sys
+import time
 from pathlib import Path
+from typing import Iterator
 
 import hydra
 from omegaconf import DictConfig, OmegaConf
 
 from talk2scene.session import SessionManager
-from talk2scene.whitelist import load_whitelist
+from talk2scene.whitelist import (
+    CATEGORIES as SCENE_FIELDS,
+    load_whitelist,
+    on_whitelist_change,
+    remove_whitelist_listener,
+)
 from talk2scene.outputs import OutputWriter
 from talk2scene.performance import PerformanceMonitor
+from talk2scene.pipeline import ordered_imap
+from talk2scene.subtitles import find_subtitle_font
+from talk2scene.render_cache import (
+    cache_stats,
+    configure_layer_cache,
+    configure_prefix_cache,
+    get_layer_source,
+    invalidate_asset_dirs,
+    set_layer_source,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -26,14 +46,228 @@ def _signal_handler(signum, frame):
 
 
 def _validate_config(cfg: DictConfig):
-    load_whitelist(cfg.assets.whitelist_path)
+    load_whitelist(cfg.assets.whitelist_path, cfg.assets.whitelist_reload_s)
     logger.info("Configuration validated successfully")
 
 
+def _configure_render_caches(layer_max_mb: int, prefix_entries: int):
+    configure_layer_cache(layer_max_mb * 1024 * 1024)
+    configure_prefix_cache(prefix_entries)
+
+
+def _install_asset_pack(cfg: DictConfig, monitor: PerformanceMonitor):
+    """Serve layers from the mode=pack-assets pack when it is up to date."""
+    if not cfg.render.pack.enabled:
+        return
+    from talk2scene.asset_pack import load_pack
+
+    monitor.start("asset_pack_load")
+    canvas_size = (cfg.render.canvas.width, cfg.render.canvas.height)
+    pack = load_pack(cfg.assets.manifest_path, canvas_size, cfg.render.pack.dir)
+    monitor.stop("asset_pack_load")
+    if pack is not None:
+        set_layer_source(pack)
+        logger.info(f"Using asset pack: {len(pack)} layers at {canvas_size[0]}x{canvas_size[1]}")
+
+
+def _record_render_caches(monitor: PerformanceMonitor, stats_list: list[dict]):
+    """Add render cache counts (one cache_stats() snapshot per process) to the report."""
+    for stats in stats_list:
+        for key in ("hits", "misses", "evictions", "shared_hits"):
+            monitor.count(f"layer_cache_{key}", stats["layer"][key])
+        for depth, counts in stats["prefix"].items():
+            monitor.count(f"prefix_cache_{depth}_hits", counts["hits"])
+            monitor.count(f"prefix_cache_{depth}_misses", counts["misses"])
+
+    # Per-depth hit rates over all processes
+    for name in list(monitor.counters):
+        if name.startswith("prefix_cache_") and name.endswith("_hits"):
+            depth = name[len("prefix_cache_"):-len("_hits")]
+            hits = monitor.counters[name]
+            total = hits + monitor.counters[f"prefix_cache_{depth}_misses"]
+            if total:
+                monitor.gauge(f"prefix_cache_{depth}_hit_rate", hits / total)
+
+
+def _make_scene_generator(cfg: DictConfig, monitor: PerformanceMonitor):
+    from talk2scene.llm_cache import LLMCache
+    from talk2scene.rule_engine import RuleEngine, RuleSceneGenerator
+    from talk2scene.scene_gen import SceneGenerator
+
+    llm = cfg.model.llm
+    if llm.provider == "rules":
+        return RuleSceneGenerator(llm.rules_path, monitor=monitor)
+    if llm.provider != "openai":
+        raise ValueError(f"Unknown scene generation provider: {llm.provider} (expected openai or rules)")
+    cache = LLMCache(llm.cache.dir, llm.cache.max_mb * 1024 * 1024) if llm.cache.enabled else None
+    return SceneGenerator(
+        model=llm.model,
+        temperature=llm.temperature,
+        max_tokens=llm.max_tokens,
+        chunk_size=llm.chunk_size,
+        chunk_overlap=llm.chunk_overlap,
+        concurrency=llm.concurrency,
+        cache=cache,
+        monitor=monitor,
+        http=OmegaConf.to_container(cfg.model.http, resolve=True),
+        encoding=llm.encoding,
+        fallback_engine=RuleEngine.from_file(llm.rules_path) if llm.fallback == "rules" else None,
+    )
+
+
+def _connect_stt_server(cfg: DictConfig, monitor: PerformanceMonitor):
+    """A RemoteTranscriber when a mode=stt-server worker serves this model and language, else None."""
+    whisper = cfg.model.whisper
+    if not whisper.server.enabled:
+        return None
+    from talk2scene.stt_server import RemoteTranscriber
+
+    try:
+        remote = RemoteTranscriber(whisper.server.socket, whisper.server.timeout_s, monitor)
+    except OSError as e:
+        logger.warning(f"No STT server on {whisper.server.socket} ({e}), loading Whisper locally")
+        return None
+    served = (remote.server_info.get("model_size"), remote.server_info.get("language"))
+    if served == (whisper.model_size, whisper.language):
+        logger.info(f"Using STT server on {whisper.server.socket} ({whisper.model_size})")
+        return remote
+    logger.warning(
+        f"STT server on {whisper.server.socket} serves {served[0]} (language {served[1]}), "
+        f"not {whisper.model_size} (language {whisper.language}); loading Whisper locally"
+    )
+    remote.close()
+    return None
+
+
+def _make_transcriber(cfg: DictConfig, monitor: PerformanceMonitor, local: bool = True):
+    """The STT server's client when it serves this model and language, else a local Transcriber (None unless local)."""
+    from talk2scene.transcription import Transcriber
+
+    whisper = cfg.model.whisper
+    started = time.time()
+    remote = _connect_stt_server(cfg, monitor)
+    if remote is not None:
+        monitor.record("transcriber_startup", time.time() - started)
+        monitor.gauge("transcriber_warm", 1)
+        return remote
+    if not local:
+        return None
+
+    transcriber = Transcriber(
+        model_size=whisper.model_size,
+        language=whisper.language,
+        device=whisper.device,
+        http=OmegaConf.to_container(cfg.model.http, resolve=True),
+        monitor=monitor,
+    )
+    monitor.record("transcriber_startup", time.time() - started)
+    monitor.gauge("transcriber_warm", 0)
+    return transcriber
+
+
+def _find_audio_files(cfg: DictConfig) -> list[Path]:
+    """Audio files of the supported formats in io.input.audio_dir, sorted by name."""
+    audio_dir = Path(cfg.io.input.audio_dir)
+    audio_files = set()
+    for fmt in cfg.io.input.supported_formats:
+        audio_files.update(audio_dir.glob(f"*.{fmt}"))
+    return sorted(audio_files)
+
+
+# The transcriber of a batch transcription worker, set by _init_stt_worker
+_stt_worker: dict = {}
+
+
+def _init_stt_worker(transcriber_kwargs: dict):
+    """Pool initializer: reset inherited signal handlers and load this worker's model."""
+    from talk2scene.transcription import Transcriber
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _stt_worker["transcriber"] = Transcriber(**transcriber_kwargs)
+
+
+def _transcribe_range_task(task: tuple) -> tuple[list[dict], float]:
+    """Worker function: transcribe one (wav_path, start, end) range; returns (events, seconds)."""
+    from talk2scene.transcription import transcribe_wav_range
+
+    started = time.time()
+    events = transcribe_wav_range(_stt_worker["transcriber"], *task)
+    return events, time.time() - started
+
+
+def _stt_pool(cfg: DictConfig, workers: int):
+    """A pool of batch transcription workers, each loading its own model."""
+    import multiprocessing
+
+    whisper = cfg.model.whisper
+    transcriber_kwargs = {
+        "model_size": whisper.model_size,
+        "language": whisper.language,
+        "device": whisper.device,
+        "http": OmegaConf.to_container(cfg.model.http, resolve=True),
+    }
+    # Spawned, not forked: other threads (scene generation, batch-all
+    # stages) are running and may hold locks a forked child would inherit
+    ctx = multiprocessing.get_context("spawn")
+    return ctx.Pool(workers, initializer=_init_stt_worker, initargs=(transcriber_kwargs,))
+
+
+def _transcribe_batch(
+    cfg: DictConfig,
+    wav_path: str,
+    monitor: PerformanceMonitor,
+    pool=None,
+) -> Iterator[list[dict]]:
+    """Yield the transcript events of wav_path chunk by chunk, in order, cutting chunks at pauses."""
+    import os
+
+    from talk2scene.audio import split_at_silence
+    from talk2scene.transcription import transcribe_wav_range
+
+    batch = cfg.model.whisper.batch
+    if batch.chunk_s <= 0:
+        transcriber = _make_transcriber(cfg, monitor)
+        try:
+            yield transcriber.transcribe_file(wav_path)
+        finally:
+            transcriber.close()
+        return
+
+    ranges = split_at_silence(wav_path, batch.chunk_s, batch.search_s)
+    workers = min(batch.workers or os.cpu_count() or 1, len(ranges))
+    # A warm STT server takes every chunk; a local model is only loaded here for a single worker
+    transcriber = _make_transcriber(cfg, monitor, local=workers <= 1) if pool is None else None
+    if transcriber is not None:
+        workers = 1
+    monitor.gauge("transcription_chunks", len(ranges))
+    monitor.gauge("transcription_workers", workers)
+    logger.info(f"Transcribing {len(ranges)} chunks with {workers} worker(s)")
+
+    if transcriber is not None:
+        try:
+            for start, end in ranges:
+                started = time.time()
+                events = transcribe_wav_range(transcriber, wav_path, start, end)
+                monitor.observe("transcription_chunk", time.time() - started)
+                yield events
+        finally:
+            transcriber.close()
+        return
+
+    tasks = [(wav_path, start, end) for start, end in ranges]
+    with contextlib.ExitStack() as stack:
+        if pool is None:
+            pool = stack.enter_context(_stt_pool(cfg, workers))
+        for events, elapsed in ordered_imap(pool, _transcribe_range_task, tasks, 2 * max(1, workers)):
+            monitor.observe("transcription_chunk", elapsed)
+            yield events
+
+
 def run_batch(cfg: DictConfig, session: SessionManager, monitor: PerformanceMonitor):
     from talk2scene.audio import load_batch_audio
-    from talk2scene.transcription import Transcriber, append_transcript_events, build_transcript_snapshot
-    from talk2scene.scene_gen import SceneGenerator
+    from talk2scene.batching import MicroBatcher
+    from talk2scene.transcription import append_transcript_events, build_transcript_snapshot
     from talk2scene.state_machine import StateManager
 
     writer = OutputWriter(session.session_dir)
@@ -44,14 +278,15 @@ def run_batch(cfg: DictConfig, session: SessionManager, monitor: PerformanceMoni
     )
 
     # Find audio file
-    audio_dir = Path(cfg.io.input.audio_dir)
-    audio_files = []
-    for fmt in cfg.io.input.supported_formats:
-        audio_files.extend(audio_dir.glob(f"*.{fmt}"))
-
+    audio_files = _find_audio_files(cfg)
     if not audio_files:
-        logger.error(f"No audio files found in {audio_dir}")
+        logger.error(f"No audio files found in {cfg.io.input.audio_dir}")
         return
+    if len(audio_files) > 1:
+        logger.warning(
+            f"{len(audio_files)} audio files in {cfg.io.input.audio_dir}, processing only the first; "
+            "use mode=batch-all to process every file"
+        )
 
     audio_path = str(audio_files[0])
     logger.info(f"Processing audio: {audio_path}")
@@ -61,48 +296,264 @@ def run_batch(cfg: DictConfig, session: SessionManager, monitor: PerformanceMoni
     wav_path = load_batch_audio(audio_path, str(session.session_dir))
     monitor.stop("audio_normalize")
 
-    # Transcribe
+    scene_gen = _make_scene_generator(cfg, monitor)
+    started = time.time()
+
+    def generate_chunks(chunks: list[list[dict]]):
+        for transcript_events in chunks:
+            monitor.start("scene_generation")
+            scene_events = scene_gen.generate(transcript_events)
+            monitor.stop("scene_generation")
+            yield scene_events
+
+    def write_scenes(chunks: list[list[dict]], results: list[list[dict]]):
+        if "time_to_first_scene" not in monitor.timers:
+            monitor.record("time_to_first_scene", time.time() - started)
+        # Apply state machine and write events
+        for scene_events in results:
+            for event in scene_events:
+                if _shutdown_requested:
+                    return
+                transition = state_mgr.apply_event(event)
+                writer.append_event(event)
+                if transition.get("changes"):
+                    writer.append_event(transition)
+
+    # Scenes for a chunk are generated while later chunks are transcribed;
+    # each chunk is one submission, so chunks are written in order
+    batcher = MicroBatcher(generate_chunks, write_scenes, max_delay_ms=0, max_segments=1)
+    transcript_jsonl = session.get_path("transcript.jsonl")
     monitor.start("transcription")
-    transcriber = Transcriber(
-        model_size=cfg.model.whisper.model_size,
-        language=cfg.model.whisper.language,
-        device=cfg.model.whisper.device,
+    try:
+        for transcript_events in _transcribe_batch(cfg, wav_path, monitor):
+            if _shutdown_requested:
+                break
+            append_transcript_events(transcript_events, transcript_jsonl)
+            if transcript_events:
+                batcher.submit([transcript_events])
+    finally:
+        monitor.stop("transcription")
+        batcher.close()
+        scene_gen.close()
+    build_transcript_snapshot(transcript_jsonl, session.get_path("transcript.json"))
+
+    writer.finalize()
+    logger.info(f"Batch processing complete: {writer.event_count} events written")
+
+
+def _batch_session_id(audio_path: Path) -> str:
+    """Stable session ID for an input file, so a re-run finds its earlier outputs."""
+    import hashlib
+    import re
+
+    stem = re.sub(r"[^\w.-]+", "_", audio_path.stem)
+    digest = hashlib.sha1(str(audio_path.resolve()).encode()).hexdigest()[:8]
+    return f"{stem}_{digest}"
+
+
+def _audio_source(audio_path: Path) -> dict:
+    stat = audio_path.stat()
+    return {"path": str(audio_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _batch_job_complete(session_dir: Path, source: dict, render_video: bool) -> bool:
+    """Whether session_dir holds complete outputs for this exact input file."""
+    job_path = session_dir / "job.json"
+    if not job_path.exists():
+        return False
+    try:
+        with open(job_path) as f:
+            record = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return False
+    return (
+        record.get("status") == "done"
+        and record.get("source") == source
+        and (record.get("rendered") or not render_video)
+        and (session_dir / "events.jsonl").exists()
     )
-    transcript_events = transcriber.transcribe_file(wav_path)
-    monitor.stop("transcription")
 
-    # Write transcript
-    transcript_jsonl = session.get_path("transcript.jsonl")
-    append_transcript_events(transcript_events, transcript_jsonl)
-    build_transcript_snapshot(transcript_jsonl, session.get_path("transcript.json"))
 
-    # Generate scenes
-    monitor.start("scene_generation")
-    scene_gen = SceneGenerator(
-        model=cfg.model.llm.model,
-        temperature=cfg.model.llm.temperature,
-        max_tokens=cfg.model.llm.max_tokens,
+def run_batch_all(cfg: DictConfig):
+    """Process every audio file in io.input.audio_dir as its own session, skipping completed ones."""
+    import os
+    import wave
+
+    from talk2scene.audio import load_batch_audio
+    from talk2scene.jobs import Job, JobPipeline
+    from talk2scene.state_machine import StateManager
+    from talk2scene.transcription import append_transcript_events, build_transcript_snapshot
+
+    batch = cfg.io.batch
+    base_dir = Path(cfg.io.output.base_dir)
+    audio_files = _find_audio_files(cfg)
+    if not audio_files:
+        logger.error(f"No audio files found in {cfg.io.input.audio_dir}")
+        return
+    video_cfg = OmegaConf.merge(cfg, {"render": {"video": {"preview": False}}})
+
+    jobs = []
+    for audio_path in audio_files:
+        source = _audio_source(audio_path)
+        job = Job(_batch_session_id(audio_path), {"source": source})
+        if _batch_job_complete(base_dir / job.key, source, batch.render_video):
+            job.status = "skipped"
+        jobs.append(job)
+    pending = sum(job.status == "pending" for job in jobs)
+    logger.info(f"Batch: {len(jobs)} audio files, {len(jobs) - pending} already complete")
+
+    def normalize(job: Job):
+        session = SessionManager(base_dir=str(base_dir), session_id=job.key)
+        # Outputs of an earlier, incomplete or outdated run are appended to; start over
+        for name in ("job.json", "events.jsonl", "transcript.jsonl"):
+            session.get_path(name).unlink(missing_ok=True)
+        monitor = PerformanceMonitor()
+        job.data.update(session=session, monitor=monitor)
+        monitor.start("audio_normalize")
+        wav_path = load_batch_audio(job.data["source"]["path"], str(session.session_dir))
+        monitor.stop("audio_normalize")
+        with wave.open(wav_path, "rb") as wf:
+            job.data["audio_s"] = wf.getnframes() / wf.getframerate()
+        job.data["wav_path"] = wav_path
+
+    def transcribe(job: Job):
+        session, monitor = job.data["session"], job.data["monitor"]
+        monitor.start("transcription")
+        transcript_events = [
+            ev for chunk in _transcribe_batch(cfg, job.data["wav_path"], monitor, stt_pool) for ev in chunk
+        ]
+        monitor.stop("transcription")
+        transcript_jsonl = session.get_path("transcript.jsonl")
+        append_transcript_events(transcript_events, transcript_jsonl)
+        build_transcript_snapshot(transcript_jsonl, session.get_path("transcript.json"))
+        job.data["transcript_events"] = transcript_events
+
+    def generate(job: Job):
+        session, monitor = job.data["session"], job.data["monitor"]
+        monitor.start("scene_generation")
+        scene_gen = _make_scene_generator(cfg, monitor)
+        try:
+            scene_events = scene_gen.generate(job.data["transcript_events"])
+        finally:
+            scene_gen.close()
+        monitor.stop("scene_generation")
+
+        writer = OutputWriter(session.session_dir)
+        state_mgr = StateManager(
+            cooldown_ms=cfg.character.characters.default.transition.cooldown_ms,
+            hold_frames=cfg.character.characters.default.transition.hold_frames,
+            fade_ms=cfg.character.characters.default.transition.fade_ms,
+        )
+        for event in scene_events:
+            transition = state_mgr.apply_event(event)
+            writer.append_event(event)
+            if transition.get("changes"):
+                writer.append_event(transition)
+        writer.finalize()
+        job.data["events"] = writer.event_count
+
+    def render(job: Job):
+        if not run_video(video_cfg, job.data["session"], job.data["monitor"]):
+            raise RuntimeError("video rendering failed")
+
+    stages = [
+        ("normalize", normalize, batch.workers.normalize),
+        ("transcribe", transcribe, batch.workers.transcribe),
+        ("generate", generate, batch.workers.generate),
+    ]
+    if batch.render_video:
+        stages.append(("render", render, batch.workers.render))
+
+    # One transcription pool for every file, so each worker loads its model once;
+    # none when the STT server takes the chunks
+    whisper_batch = cfg.model.whisper.batch
+    stt_workers = whisper_batch.workers or os.cpu_count() or 1
+    stt_pool = None
+    if pending and whisper_batch.chunk_s > 0 and stt_workers > 1:
+        remote = _connect_stt_server(cfg, PerformanceMonitor())
+        if remote is not None:
+            remote.close()
+        else:
+            stt_pool = _stt_pool(cfg, stt_workers)
+
+    started = time.time()
+    try:
+        JobPipeline(stages, should_stop=lambda: _shutdown_requested).run(jobs)
+    finally:
+        if stt_pool is not None:
+            stt_pool.close()
+            stt_pool.join()
+    wall_s = time.time() - started
+
+    for job in jobs:
+        session = job.data.get("session")
+        if session is None:
+            continue
+        session.finalize()
+        job.data["monitor"].save(session.get_path("performance.json"))
+        with open(session.get_path("job.json"), "w") as f:
+            json.dump({
+                "source": job.data["source"],
+                "status": job.status,
+                "error": job.error,
+                "rendered": job.status == "done" and batch.render_video,
+                "audio_s": round(job.data.get("audio_s", 0.0), 3),
+                "events": job.data.get("events", 0),
+                "stage_s": job.stage_s,
+            }, f, indent=2)
+
+    report = _batch_report(jobs, stages, wall_s)
+    report_path = base_dir / batch.report
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    logger.info(
+        f"Batch complete: {report['done']} done, {report['skipped']} skipped, {report['failed']} failed "
+        f"in {wall_s:.1f}s ({report['realtime_factor']}x realtime). Report: {report_path}"
     )
-    scene_events = scene_gen.generate(transcript_events)
-    monitor.stop("scene_generation")
 
-    # Apply state machine and write events
-    for event in scene_events:
-        if _shutdown_requested:
-            break
-        transition = state_mgr.apply_event(event)
-        writer.append_event(event)
-        if transition.get("changes"):
-            writer.append_event(transition)
 
-    writer.finalize()
-    logger.info(f"Batch processing complete: {writer.event_count} events written")
+def _batch_report(jobs: list, stages: list[tuple], wall_s: float) -> dict:
+    """Aggregate throughput of a batch-all run."""
+    ran = [job for job in jobs if job.status == "done"]
+    audio_s = sum(job.data.get("audio_s", 0.0) for job in ran)
+    report = {status: sum(job.status == status for job in jobs) for status in ("done", "skipped", "failed", "cancelled")}
+    report.update({
+        "files": len(jobs),
+        "wall_s": round(wall_s, 3),
+        "audio_s": round(audio_s, 3),
+        "realtime_factor": round(audio_s / wall_s, 2) if wall_s else 0,
+        "files_per_hour": round(len(ran) * 3600 / wall_s, 1) if wall_s else 0,
+        "stages": {},
+        "jobs": [],
+    })
+    for name, _, workers in stages:
+        busy = [job.stage_s[name] for job in jobs if name in job.stage_s]
+        # As in JobPipeline, a stage configured with 0 workers runs one
+        workers = max(1, workers)
+        report["stages"][name] = {
+            "workers": workers,
+            "jobs": len(busy),
+            "busy_s": round(sum(busy), 3),
+            "avg_s": round(sum(busy) / len(busy), 3) if busy else 0,
+            # Share of the stage's worker time spent busy; the lowest-utilized
+            # stages can give workers to the busiest
+            "utilization": round(sum(busy) / (wall_s * workers), 3) if wall_s else 0,
+        }
+    for job in jobs:
+        report["jobs"].append({
+            "file": job.data["source"]["path"],
+            "session_id": job.key,
+            "status": job.status,
+            "error": job.error,
+            "audio_s": round(job.data.get("audio_s", 0.0), 3),
+            "stage_s": job.stage_s,
+        })
+    return report
 
 
 def run_text(cfg: DictConfig, session: SessionManager, monitor: PerformanceMonitor):
     """Process a transcript JSONL file directly into scene events (skip audio/transcription)."""
     from talk2scene.transcription import append_transcript_events, build_transcript_snapshot
-    from talk2scene.scene_gen import SceneGenerator
     from talk2scene.state_machine import StateManager
 
     text_file = cfg.io.input.text_file
@@ -139,12 +590,9 @@ def run_text(cfg: DictConfig, session: SessionManager, monitor: PerformanceMonit
 
     # Generate scenes
     monitor.start("scene_generation")
-    scene_gen = SceneGenerator(
-        model=cfg.model.llm.model,
-        temperature=cfg.model.llm.temperature,
-        max_tokens=cfg.model.llm.max_tokens,
-    )
+    scene_gen = _make_scene_generator(cfg, monitor)
     scene_events = scene_gen.generate(transcript_events)
+    scene_gen.close()
     monitor.stop("scene_generation")
 
     # Apply state machine and write events
@@ -160,12 +608,21 @@ def run_text(cfg: DictConfig, session: SessionManager, monitor: PerformanceMonit
     logger.info(f"Text processing complete: {writer.event_count} events written")
 
 
-def run_stream(cfg: DictConfig, session: SessionManager, monitor: PerformanceMonitor):
-    import tempfile
+def _segment_index(starts: list[float], scene: dict, position: int) -> int:
+    """Index of the transcript segment a scene belongs to: the one starting nearest to it."""
+    start = scene.get("start")
+    if not isinstance(start, (int, float)):
+        return min(position, len(starts) - 1)
+    i = bisect.bisect_right(starts, start)
+    if i == len(starts) or (i > 0 and start - starts[i - 1] <= starts[i] - start):
+        return max(0, i - 1)
+    return i
 
-    from talk2scene.audio import RedisAudioConsumer, chunks_to_wav
-    from talk2scene.transcription import Transcriber, append_transcript_events
-    from talk2scene.scene_gen import SceneGenerator
+
+def run_stream(cfg: DictConfig, session: SessionManager, monitor: PerformanceMonitor):
+    from talk2scene.audio import EnergyVAD, RedisAudioConsumer, SpeechGate
+    from talk2scene.batching import MicroBatcher
+    from talk2scene.transcription import IncrementalTranscriber, append_transcript_events
     from talk2scene.state_machine import StateManager
 
     writer = OutputWriter(session.session_dir)
@@ -176,25 +633,96 @@ def run_stream(cfg: DictConfig, session: SessionManager, monitor: PerformanceMon
     )
 
     consumer = RedisAudioConsumer(cfg.stream)
-    transcriber = Transcriber(
-        model_size=cfg.model.whisper.model_size,
-        language=cfg.model.whisper.language,
-        device=cfg.model.whisper.device,
-    )
-    scene_gen = SceneGenerator(
-        model=cfg.model.llm.model,
-        temperature=cfg.model.llm.temperature,
-    )
+    transcriber = _make_transcriber(cfg, monitor)
+    scene_gen = _make_scene_generator(cfg, monitor)
 
     stt_stream_key = cfg.stream.redis.stt_stream_key
-    rolling_chunks: list[bytes] = []
-    rolling_window = cfg.stream.audio.rolling_window_s
-    chunk_duration = cfg.stream.audio.chunk_duration_ms / 1000.0
+    incremental = IncrementalTranscriber(
+        transcriber,
+        sample_rate=cfg.stream.audio.sample_rate,
+        max_window_s=cfg.stream.audio.rolling_window_s,
+        overlap_s=cfg.stream.audio.overlap_s,
+        settle_s=cfg.stream.audio.settle_s,
+        monitor=monitor,
+    )
+    vad = cfg.stream.vad
+    gate = None
+    if vad.enabled:
+        gate = SpeechGate(
+            EnergyVAD(cfg.stream.audio.sample_rate, vad.frame_ms, vad.energy_threshold, vad.max_zcr),
+            min_silence_ms=vad.min_silence_ms,
+            padding_ms=vad.padding_ms,
+            max_segment_s=vad.max_segment_s,
+        )
+
+    def transcribe_speech(pieces: list[tuple[bytes, float, bool]]) -> list[dict]:
+        events = []
+        for pcm, start_s, closed in pieces:
+            monitor.start("transcription")
+            events.extend(incremental.feed(pcm, start_s, final=closed))
+            monitor.stop("transcription")
+        return events
 
     render_on_event = cfg.render.get("scene_on_event", False)
     asset_dirs = OmegaConf.to_container(cfg.assets.asset_dirs, resolve=True) if render_on_event else None
     canvas_size = (cfg.render.canvas.width, cfg.render.canvas.height) if render_on_event else None
 
+    def invalidate_render_caches(old, new, changed: frozenset):
+        dirs = [asset_dirs[cat.lower()] for cat in changed if cat.lower() in asset_dirs]
+        dropped = invalidate_asset_dirs(dirs)
+        logger.info(f"Whitelist v{new.version}: dropped {dropped} cached layers/composites for {', '.join(sorted(changed))}")
+
+    if render_on_event:
+        on_whitelist_change(invalidate_render_caches)
+
+    def generate_batch(transcript_events: list[dict]):
+        monitor.count("stream_batches")
+        monitor.count("stream_batched_segments", len(transcript_events))
+        monitor.start("scene_generation")
+        started = time.time()
+        if cfg.model.llm.stream:
+            scene_events = scene_gen.generate_stream(transcript_events)
+        else:
+            scene_events = scene_gen.generate(transcript_events)
+        starts = [ev["start"] for ev in transcript_events]
+        index = 0
+        for i, event in enumerate(scene_events):
+            if i == 0:
+                monitor.record("time_to_first_scene", time.time() - started)
+            # The LLM may answer with more or fewer scenes than segments
+            index = max(index, _segment_index(starts, event, i))
+            yield index, event
+        monitor.stop("scene_generation")
+
+    def write_scenes(transcript_events: list[dict], scene_events: list[dict]):
+        for event in scene_events:
+            transition = state_mgr.apply_event(event)
+            writer.append_event(event)
+            if transition.get("changes"):
+                writer.append_event(transition)
+
+        # Optionally render front page on each scene event batch
+        if render_on_event and scene_events:
+            from talk2scene.renderer import render_scene_to_file
+            last = scene_events[-1]
+            scene_state = {k: last[k] for k in ("sta", "exp", "act", "bg", "cg") if k in last}
+            render_scene_to_file(
+                scene_state,
+                str(session.session_dir / "front_page.png"),
+                asset_dirs,
+                canvas_size,
+                cfg.render.backend,
+            )
+
+    # Scene generation and output run on the batcher thread, in message order
+    batcher = MicroBatcher(
+        generate_batch,
+        write_scenes,
+        max_delay_ms=cfg.stream.batching.max_delay_ms,
+        max_segments=cfg.stream.batching.max_segments,
+        indexed=True,
+    )
+
     logger.info("Starting Redis dual-stream consumer (stt + mic)...")
     try:
         for msg_id, stream_name, data in consumer.consume():
@@ -215,53 +743,46 @@ def run_stream(cfg: DictConfig, session: SessionManager, monitor: PerformanceMon
                     "speaker_id": "unknown",
                 }]
             else:
-                # Mic path: rolling window + Whisper
+                # Mic path: Whisper on the uncommitted tail of the stream
                 audio_bytes = data.get(b"audio", b"")
-                rolling_chunks.append(audio_bytes)
-                max_chunks = int(rolling_window / chunk_duration)
-                if len(rolling_chunks) > max_chunks:
-                    rolling_chunks = rolling_chunks[-max_chunks:]
-
-                monitor.start("transcription")
-                wav_data = chunks_to_wav(rolling_chunks, cfg.stream.audio.sample_rate)
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=True) as tmp:
-                    tmp.write(wav_data)
-                    tmp.flush()
-                    transcript_events = transcriber.transcribe_file(tmp.name)
-                monitor.stop("transcription")
+                if gate is None:
+                    monitor.start("transcription")
+                    transcript_events = incremental.feed(audio_bytes)
+                    monitor.stop("transcription")
+                else:
+                    # Only speech, once a segment closes or reaches max_segment_s
+                    transcript_events = transcribe_speech(gate.feed(audio_bytes))
 
             if transcript_events:
                 append_transcript_events(
                     transcript_events, session.get_path("transcript.jsonl")
                 )
-
-                monitor.start("scene_generation")
-                scene_events = scene_gen.generate(transcript_events)
-                monitor.stop("scene_generation")
-
-                for event in scene_events:
-                    transition = state_mgr.apply_event(event)
-                    writer.append_event(event)
-                    if transition.get("changes"):
-                        writer.append_event(transition)
-
-                # Optionally render front page on each scene event batch
-                if render_on_event and scene_events:
-                    from talk2scene.renderer import render_scene_to_file
-                    last = scene_events[-1]
-                    scene_state = {k: last[k] for k in ("sta", "exp", "act", "bg", "cg") if k in last}
-                    render_scene_to_file(
-                        scene_state,
-                        str(session.session_dir / "front_page.png"),
-                        asset_dirs,
-                        canvas_size,
-                    )
+                batcher.submit(transcript_events)
 
     except KeyboardInterrupt:
         logger.info("Stream interrupted by user")
     finally:
         consumer.close()
+        try:
+            # Speech still in the window when the stream stopped
+            transcript_events = transcribe_speech(gate.flush()) if gate is not None else []
+            transcript_events += incremental.flush()
+            if transcript_events:
+                append_transcript_events(transcript_events, session.get_path("transcript.jsonl"))
+                batcher.submit(transcript_events)
+        except Exception as e:
+            logger.error(f"Transcribing the end of the stream failed: {e}")
+        batcher.close()
+        transcriber.close()
+        scene_gen.close()
         writer.finalize()
+        if gate is not None:
+            monitor.count("vad_audio_ms", round(gate.total_s * 1000))
+            monitor.count("vad_skipped_ms", round(gate.skipped_s * 1000))
+            monitor.gauge("vad_skipped_fraction", round(gate.skipped_fraction, 3))
+        if render_on_event:
+            remove_whitelist_listener(invalidate_render_caches)
+            _record_render_caches(monitor, [cache_stats()])
         logger.info(f"Stream processing ended: {writer.event_count} events")
 
 
@@ -299,8 +820,9 @@ def run_render(cfg: DictConfig, session: SessionManager, monitor: PerformanceMon
 
     monitor.start("render")
     output_path = str(session.get_path("scene_render.png"))
-    render_scene_to_file(scene_state, output_path, asset_dirs, canvas)
+    render_scene_to_file(scene_state, output_path, asset_dirs, canvas, cfg.render.backend)
     monitor.stop("render")
+    _record_render_caches(monitor, [cache_stats()])
     logger.info(f"Scene rendered to: {output_path}")
 
 
@@ -319,8 +841,10 @@ def run_eval(cfg: DictConfig, monitor: PerformanceMonitor):
         asset_dirs=asset_dirs,
         canvas_size=canvas,
         tolerance=cfg.eval.tolerance,
+        backend=cfg.render.backend,
     )
     monitor.stop("evaluation")
+    _record_render_caches(monitor, [cache_stats()])
 
     total = results["summary"]["total"]
     passed = results["summary"]["passed"]
@@ -336,78 +860,309 @@ def run_eval(cfg: DictConfig, monitor: PerformanceMonitor):
         print(f"  [{status}] {case['name']}{detail}")
 
 
-def _find_subtitle_font() -> str | None:
-    """Return the path string of the first available subtitle font, or None."""
-    for fp in [
-        "/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc",
-        "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
-        "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
-        "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
-        "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-    ]:
-        if Path(fp).exists():
-            return fp
-    return None
+# Per-worker render settings, set once by _init_render_worker
+_render_ctx: dict = {}
 
 
-def _render_scene_frame(args: tuple) -> tuple[int, str, float]:
-    """Worker function for multiprocessing: render one scene to a PNG file.
+def _init_render_worker(
+    layer_max_mb: int,
+    prefix_entries: int,
+    render_ctx: dict | None = None,
+    preload_states: tuple = (),
+):
+    """Pool initializer: reset signal handlers and set up the render state from render_ctx.
 
-    Args is a tuple of:
-        (idx, event_dict, asset_dirs, canvas_size, burn_subs, font_path, font_size, output_path)
+    The layer source (atlas or asset pack) comes from render_ctx, never from the parent.
+    """
+    # Pool.terminate() sends SIGTERM; the parent handles SIGINT and shuts the pool down
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _configure_render_caches(layer_max_mb, prefix_entries)
+    if render_ctx is None:
+        return
 
-    Returns (idx, output_path, duration).
+    from talk2scene.renderer import preload_scene_assets
+    from talk2scene.subtitles import load_font
+
+    _render_ctx.clear()
+    _render_ctx.update(render_ctx)
+    _flattened_scene.cache_clear()
+    source = None
+    if render_ctx.get("atlas") is not None:
+        from talk2scene.atlas import AssetAtlas
+
+        source = AssetAtlas.attach(render_ctx["atlas"])
+    elif render_ctx.get("pack") is not None:
+        from talk2scene.asset_pack import load_pack
+
+        pack = render_ctx["pack"]
+        source = load_pack(pack["manifest_path"], render_ctx["canvas_size"], pack["pack_dir"])
+    set_layer_source(source)
+    if render_ctx["burn_subs"]:
+        load_font(render_ctx["font_path"], render_ctx["font_size"])
+    states = [dict(zip(SCENE_FIELDS, state)) for state in preload_states]
+    preload_scene_assets(states, render_ctx["asset_dirs"], render_ctx["canvas_size"], render_ctx["backend"])
+
+
+def _frame_key(event: dict, burn_subs: bool) -> tuple:
+    """Identity of the image a scene event renders to: its state, plus the subtitle if burned in."""
+    state = tuple(event.get(k) for k in SCENE_FIELDS)
+    text = event.get("text", "") if burn_subs else ""
+    return state, text
+
+
+def _unique_frames(scene_events: list[dict], burn_subs: bool) -> tuple[list[int], list[dict]]:
+    """Map scenes onto distinct frames: returns (frame index of each scene, first event of each frame)."""
+    frame_ids: dict[tuple, int] = {}
+    scene_frames = []
+    unique_events = []
+    for ev in scene_events:
+        key = _frame_key(ev, burn_subs)
+        if key not in frame_ids:
+            frame_ids[key] = len(unique_events)
+            unique_events.append(ev)
+        scene_frames.append(frame_ids[key])
+    return scene_frames, unique_events
+
+
+@functools.lru_cache(maxsize=16)
+def _flattened_scene(state: tuple):
+    """Render a scene state flattened onto white, memoized per worker process.
+
+    Scenes with the same state but different subtitles share this composite.
+    The returned image is shared; copy it before drawing on it.
     """
-    from PIL import Image, ImageDraw, ImageFont
-    from talk2scene.renderer import render_scene
+    from talk2scene.renderer import render_scene_rgb
 
-    idx, event, asset_dirs, canvas_size, burn_subs, font_path, font_size, output_path = args
+    return render_scene_rgb(
+        dict(zip(SCENE_FIELDS, state)),
+        _render_ctx["asset_dirs"],
+        _render_ctx["canvas_size"],
+        _render_ctx["backend"],
+    )
 
-    scene_state = {k: event[k] for k in ("sta", "exp", "act", "bg", "cg")}
-    img = render_scene(scene_state, asset_dirs, canvas_size)
 
-    # Flatten alpha onto white
-    bg = Image.new("RGBA", canvas_size, (255, 255, 255, 255))
-    final = Image.alpha_composite(bg, img).convert("RGB")
+def _render_scene_frame(task: tuple) -> tuple[int, str | bytes, dict]:
+    """Worker function for multiprocessing: render one unique frame from task (idx, state, text).
 
-    # Burn subtitle
-    if burn_subs and event.get("text"):
-        if font_path:
-            font = ImageFont.truetype(font_path, font_size)
-        else:
-            font = ImageFont.load_default()
-        draw = ImageDraw.Draw(final)
-        text = event["text"]
-        bbox = draw.textbbox((0, 0), text, font=font)
-        tw, th = bbox[2] - bbox[0], bbox[3] - bbox[1]
-        sx = (canvas_size[0] - tw) // 2
-        sy = canvas_size[1] - 80
-        pad = 10
-        draw.rectangle(
-            [sx - pad, sy - pad, sx + tw + pad, sy + th + pad],
-            fill=(0, 0, 0, 180),
-        )
-        draw.text((sx, sy), text, fill=(255, 255, 255), font=font)
+    Returns (idx, PNG path under frames_dir or raw RGB24 bytes, cache_stats).
+    """
+    import os
+
+    from talk2scene.subtitles import burn_subtitle
+
+    idx, state, text = task
+    final = _flattened_scene(state).copy()
 
+    # Burn subtitle (rendered once per distinct line, then pasted)
+    if text:
+        burn_subtitle(final, text, _render_ctx["font_path"], _render_ctx["font_size"])
+
+    stats = cache_stats()
+    stats["pid"] = os.getpid()
+    frames_dir = _render_ctx["frames_dir"]
+    if frames_dir is None:
+        return idx, final.tobytes(), stats
+    output_path = str(Path(frames_dir) / f"frame_{idx:05d}.png")
     final.save(output_path)
-    duration = event["end"] - event["start"]
-    return idx, output_path, duration
+    return idx, output_path, stats
 
 
-def _build_ffmpeg_cmd(concat_path: str, fps: int, crf: int, fmt: str, output_path: str) -> list[str]:
-    """Build ffmpeg command using concat demuxer for per-scene durations."""
-    base = ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", concat_path, "-r", str(fps)]
+def _ffmpeg_codec_args(crf: int, fmt: str, output_path: str) -> list[str]:
     if fmt == "webm":
-        return base + ["-c:v", "libvpx-vp9", "-crf", str(crf), "-b:v", "0", "-pix_fmt", "yuv420p", output_path]
+        return ["-c:v", "libvpx-vp9", "-crf", str(crf), "-b:v", "0", "-pix_fmt", "yuv420p", output_path]
     elif fmt == "avi":
-        return base + ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-crf", str(crf), output_path]
+        return ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-crf", str(crf), output_path]
     else:  # mp4
-        return base + ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-crf", str(crf), "-preset", "fast", output_path]
+        return ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-crf", str(crf), "-preset", "fast", output_path]
+
+
+def _build_ffmpeg_cmd(concat_path: str, fps: int, crf: int, fmt: str, output_path: str) -> list[str]:
+    """Build ffmpeg command using concat demuxer for per-scene durations."""
+    base = ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", concat_path, "-r", str(fps)]
+    return base + _ffmpeg_codec_args(crf, fmt, output_path)
+
+
+def _build_ffmpeg_pipe_cmd(
+    canvas_size: tuple[int, int], fps: int, crf: int, fmt: str, output_path: str
+) -> list[str]:
+    """Build ffmpeg command reading raw RGB24 frames at a constant rate from stdin."""
+    base = [
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{canvas_size[0]}x{canvas_size[1]}",
+        "-r", str(fps), "-i", "-",
+    ]
+    return base + _ffmpeg_codec_args(crf, fmt, output_path)
+
+
+def _scene_frame_counts(scene_events: list[dict], fps: int) -> list[int]:
+    """Number of video frames per scene, rounded cumulatively so the video never drifts."""
+    counts = []
+    elapsed = 0.0
+    emitted = 0
+    for ev in scene_events:
+        elapsed += ev["end"] - ev["start"]
+        total = max(emitted, round(elapsed * fps))
+        counts.append(total - emitted)
+        emitted = total
+    return counts
+
+
+def _cache_lookups(stats: dict) -> int:
+    """Total lookups in a cache_stats() snapshot; only ever grows within a process."""
+    layer = stats["layer"]
+    total = layer["hits"] + layer["misses"] + layer["shared_hits"]
+    return total + sum(counts["hits"] + counts["misses"] for counts in stats["prefix"].values())
+
+
+def _track_worker_stats(worker_stats: dict[int, dict], stats: dict):
+    """Keep each worker's latest cache_stats() snapshot: the one with the most lookups."""
+    prev = worker_stats.get(stats["pid"])
+    if prev is None or _cache_lookups(stats) > _cache_lookups(prev):
+        worker_stats[stats["pid"]] = stats
+
+
+def _write_concat_list(
+    concat_path: str, scene_events: list[dict], scene_frames: list[int], frame_paths: dict[int, str]
+):
+    """Write the concat demuxer list: one entry per scene, pointing at its shared frame."""
+    with open(concat_path, "w") as cf:
+        for ev, frame_idx in zip(scene_events, scene_frames):
+            # Use basename only; ffmpeg resolves relative to concat.txt location
+            cf.write(f"file '{Path(frame_paths[frame_idx]).name}'\n")
+            cf.write(f"duration {ev['end'] - ev['start']:.6f}\n")
+        # ffmpeg concat needs last file repeated without duration
+        cf.write(f"file '{Path(frame_paths[scene_frames[-1]]).name}'\n")
+
+
+def _encode_concat(
+    results: Iterator[tuple],
+    scene_events: list[dict],
+    scene_frames: list[int],
+    frames_dir: Path,
+    cmd_args: tuple,
+    monitor: PerformanceMonitor,
+    worker_stats: dict[int, dict],
+) -> bool:
+    """Render unique frames to PNG files, then encode them via the concat demuxer."""
+    import subprocess
+
+    monitor.start("video_render")
+    frame_paths = {}
+    for idx, frame_path, stats in results:
+        _track_worker_stats(worker_stats, stats)
+        frame_paths[idx] = frame_path
+    monitor.stop("video_render")
+
+    concat_path = str(frames_dir / "concat.txt")
+    _write_concat_list(concat_path, scene_events, scene_frames, frame_paths)
+
+    # Encode with ffmpeg
+    monitor.start("video_encode")
+    cmd = _build_ffmpeg_cmd(concat_path, *cmd_args)
+    logger.info(f"Encoding video: {' '.join(cmd)}")
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    monitor.stop("video_encode")
+
+    if result.returncode != 0:
+        logger.error(f"ffmpeg failed:\n{result.stderr}")
+        return False
+    return True
+
+
+def _write_scene_frames(
+    results: Iterator[tuple],
+    scene_frames: list[int],
+    counts: list[int],
+    write,
+    worker_stats: dict[int, dict],
+) -> int | None:
+    """Write each scene's frame counts[i] times, in scene order, as frames arrive.
+
+    Returns the number of frames written, or None when stopped by a shutdown request.
+    """
+    last_use = {frame_idx: i for i, frame_idx in enumerate(scene_frames)}
+    frames: dict[int, bytes] = {}
+    next_scene = 0
+    written = 0
+    for idx, frame, stats in results:
+        if _shutdown_requested:
+            return None
+        _track_worker_stats(worker_stats, stats)
+        frames[idx] = frame
+        # Unique frames arrive in first-use order: write every scene now unblocked
+        while next_scene < len(scene_frames) and scene_frames[next_scene] in frames:
+            frame_idx = scene_frames[next_scene]
+            for _ in range(counts[next_scene]):
+                write(frames[frame_idx])
+            written += counts[next_scene]
+            if last_use[frame_idx] == next_scene:
+                del frames[frame_idx]
+            next_scene += 1
+    return written
+
+
+def _encode_pipe(
+    results: Iterator[tuple],
+    scene_events: list[dict],
+    scene_frames: list[int],
+    canvas_size: tuple[int, int],
+    cmd_args: tuple,
+    monitor: PerformanceMonitor,
+    worker_stats: dict[int, dict],
+) -> bool:
+    """Stream raw RGB frames into ffmpeg's stdin as they are rendered; False if stopped early."""
+    import subprocess
+    import tempfile
+
+    fps, output_path = cmd_args[0], cmd_args[-1]
+    counts = _scene_frame_counts(scene_events, fps)
+    cmd = _build_ffmpeg_pipe_cmd(canvas_size, *cmd_args)
+    logger.info(f"Encoding video: {' '.join(cmd)}")
+
+    with tempfile.TemporaryFile() as errlog:
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=errlog)
+        written = None
+        monitor.start("video_render")
+        try:
+            written = _write_scene_frames(results, scene_frames, counts, proc.stdin.write, worker_stats)
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass  # ffmpeg exited; its log says why
+        finally:
+            monitor.stop("video_render")
+            if written is None:
+                proc.kill()
+                with contextlib.suppress(OSError):
+                    proc.stdin.close()
+                proc.wait()
+                Path(output_path).unlink(missing_ok=True)
+
+        if written is None:
+            if _shutdown_requested:
+                logger.warning("Shutdown requested: video encoding stopped, no video written")
+            else:
+                errlog.seek(0)
+                logger.error(f"ffmpeg exited early:\n{errlog.read().decode(errors='replace')}")
+            return False
+
+        monitor.start("video_encode")
+        returncode = proc.wait()
+        monitor.stop("video_encode")
+        monitor.count("video_frames_written", written)
+
+        if returncode != 0:
+            errlog.seek(0)
+            logger.error(f"ffmpeg failed:\n{errlog.read().decode(errors='replace')}")
+            return False
+    return True
 
 
-def run_video(cfg: DictConfig, session: SessionManager, monitor: PerformanceMonitor):
-    """Render events.jsonl into a video with subtitles using parallel rendering."""
+def run_video(cfg: DictConfig, session: SessionManager, monitor: PerformanceMonitor) -> bool:
+    """Render events.jsonl into a video with subtitles using parallel rendering.
+
+    Returns whether a complete video was written.
+    """
     import multiprocessing
     import os
     import subprocess
@@ -415,17 +1170,23 @@ def run_video(cfg: DictConfig, session: SessionManager, monitor: PerformanceMoni
     events_path = session.get_path("events.jsonl")
     if not events_path.exists():
         logger.error("No events.jsonl in session. Run text/batch mode first.")
-        return
+        return False
 
     asset_dirs = OmegaConf.to_container(cfg.assets.asset_dirs, resolve=True)
     canvas_size = (cfg.render.canvas.width, cfg.render.canvas.height)
     fps = cfg.render.video.fps
     crf = cfg.render.video.crf
     fmt = cfg.render.video.format
+    encoder = cfg.render.video.encoder
+    backend = cfg.render.backend
     burn_subs = cfg.render.video.subtitle
     font_size = cfg.render.video.subtitle_font_size
     preview = cfg.render.video.preview
 
+    if encoder not in ("pipe", "concat"):
+        logger.error(f"Unknown video encoder: {encoder} (expected pipe or concat)")
+        return False
+
     # Load scene events
     scene_events = []
     with open(events_path) as f:
@@ -436,56 +1197,101 @@ def run_video(cfg: DictConfig, session: SessionManager, monitor: PerformanceMoni
 
     if not scene_events:
         logger.error("No scene events found in events.jsonl")
-        return
+        return False
 
     total_duration = max(ev["end"] for ev in scene_events)
     logger.info(
-        f"Rendering video: {len(scene_events)} scenes, {total_duration:.1f}s, format={fmt} (parallel)"
+        f"Rendering video: {len(scene_events)} scenes, {total_duration:.1f}s, format={fmt}, "
+        f"encoder={encoder} (parallel)"
     )
 
-    # Resolve font path (picklable string, not PIL object)
-    font_path = _find_subtitle_font() if burn_subs else None
+    # Resolve font path (picklable string; each worker loads the font once)
+    font_path = find_subtitle_font() if burn_subs else None
 
-    # Prepare frames directory and task tuples
+    # Prepare frames directory (concat only)
     frames_dir = session.session_dir / "frames"
-    frames_dir.mkdir(exist_ok=True)
-
-    tasks = []
-    for idx, ev in enumerate(scene_events):
-        out = str(frames_dir / f"scene_{idx:05d}.png")
-        tasks.append((idx, ev, asset_dirs, canvas_size, burn_subs, font_path, font_size, out))
-
-    # Render scenes in parallel
-    monitor.start("video_render")
-    workers = min(os.cpu_count() or 1, len(tasks))
-    logger.info(f"Rendering {len(tasks)} scene images with {workers} workers...")
-    with multiprocessing.Pool(workers) as pool:
-        results = pool.map(_render_scene_frame, tasks)
-    monitor.stop("video_render")
-
-    # Sort results by index and build concat file
-    results.sort(key=lambda r: r[0])
-    concat_path = str(frames_dir / "concat.txt")
-    with open(concat_path, "w") as cf:
-        for idx, frame_path, duration in results:
-            # Use basename only; ffmpeg resolves relative to concat.txt location
-            cf.write(f"file '{Path(frame_path).name}'\n")
-            cf.write(f"duration {duration:.6f}\n")
-        # ffmpeg concat needs last file repeated without duration
-        if results:
-            cf.write(f"file '{Path(results[-1][1]).name}'\n")
-
-    # Encode with ffmpeg
+    if encoder == "concat":
+        frames_dir.mkdir(exist_ok=True)
+
+    scene_frames, unique_events = _unique_frames(scene_events, burn_subs)
+    monitor.count("video_frames_rendered", len(unique_events))
+    monitor.count("video_frames_reused", len(scene_events) - len(unique_events))
+
+    # Settings shared by every frame go to the workers once, at startup;
+    # tasks carry only the frame index, scene codes and subtitle, and are
+    # built lazily as the pipeline window advances
+    render_ctx = {
+        "asset_dirs": asset_dirs,
+        "canvas_size": canvas_size,
+        "backend": backend,
+        "burn_subs": burn_subs,
+        "font_path": font_path,
+        "font_size": font_size,
+        "frames_dir": str(frames_dir) if encoder == "concat" else None,
+    }
+    unique_states = tuple(dict.fromkeys(_frame_key(ev, burn_subs)[0] for ev in unique_events))
+    tasks = ((idx, *_frame_key(ev, burn_subs)) for idx, ev in enumerate(unique_events))
+
+    # Render unique frames in parallel; at most max_inflight frames are
+    # queued or finished-but-unconsumed at any time, and results come back
+    # in order so encoding starts as soon as frame 0 is ready
     output_path = str(session.session_dir / f"scene_video.{fmt}")
-    monitor.start("video_encode")
-    cmd = _build_ffmpeg_cmd(concat_path, fps, crf, fmt, output_path)
-    logger.info(f"Encoding video: {' '.join(cmd)}")
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    monitor.stop("video_encode")
+    workers = min(cfg.render.video.workers or os.cpu_count() or 1, len(unique_events))
+    max_inflight = cfg.render.video.max_inflight or 2 * workers
+    logger.info(
+        f"Rendering {len(unique_events)} unique frames for {len(scene_events)} scenes "
+        f"with {workers} workers (max {max_inflight} in flight)..."
+    )
+    # With several workers, decode the session's layers once into shared
+    # memory instead of once per worker. A memory-mapped asset pack is
+    # already shared through the page cache, so it needs no atlas: when
+    # this process serves from one, workers map it too.
+    atlas = None
+    manifest_path = Path(cfg.assets.manifest_path)
+    if cfg.render.pack.enabled and get_layer_source() is not None:
+        render_ctx["pack"] = {"manifest_path": str(manifest_path), "pack_dir": cfg.render.pack.dir}
+    elif cfg.render.video.shared_atlas and workers > 1:
+        if manifest_path.exists():
+            from talk2scene.atlas import AssetAtlas
+            from talk2scene.renderer import scene_asset_paths
+
+            monitor.start("video_atlas_build")
+            states = [dict(zip(SCENE_FIELDS, state)) for state in unique_states]
+            atlas = AssetAtlas.from_manifest(
+                str(manifest_path), canvas_size, backend, include=scene_asset_paths(states, asset_dirs)
+            )
+            monitor.stop("video_atlas_build")
+            monitor.gauge("video_atlas_mb", atlas.nbytes / (1024 * 1024))
+            logger.info(f"Shared asset atlas: {len(atlas)} layers, {atlas.nbytes / (1024 * 1024):.1f} MB")
+            render_ctx["atlas"] = atlas.handle()
+        else:
+            logger.warning(f"Asset manifest not found: {manifest_path}, workers decode layers themselves")
 
-    if result.returncode != 0:
-        logger.error(f"ffmpeg failed:\n{result.stderr}")
-        return
+    init_args = (cfg.render.cache.layer_max_mb, cfg.render.cache.prefix_entries, render_ctx, unique_states)
+    worker_stats: dict[int, dict] = {}
+    cmd_args = (fps, crf, fmt, output_path)
+    try:
+        # Spawned, not forked: batch-all calls this from a stage thread while
+        # other stages may hold locks a forked child would inherit. Workers
+        # get all their state from init_args.
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(workers, initializer=_init_render_worker, initargs=init_args) as pool:
+            results = ordered_imap(pool, _render_scene_frame, tasks, max_inflight)
+            if encoder == "pipe":
+                ok = _encode_pipe(
+                    results, scene_events, scene_frames, canvas_size, cmd_args, monitor, worker_stats
+                )
+            else:
+                ok = _encode_concat(
+                    results, scene_events, scene_frames, frames_dir, cmd_args, monitor, worker_stats
+                )
+    finally:
+        if atlas is not None:
+            atlas.close()
+    _record_render_caches(monitor, list(worker_stats.values()))
+
+    if not ok:
+        return False
 
     logger.info(f"Video saved to: {output_path}")
     print(f"Video: {output_path}")
@@ -493,6 +1299,7 @@ def run_video(cfg: DictConfig, session: SessionManager, monitor: PerformanceMoni
     if preview:
         logger.info("Opening video preview...")
         subprocess.Popen(["xdg-open", output_path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return True
 
 
 def run_generate_assets(cfg: DictConfig):
@@ -508,6 +1315,41 @@ def run_generate_assets(cfg: DictConfig):
     print("Placeholder assets generated successfully")
 
 
+def run_pack_assets(cfg: DictConfig):
+    from talk2scene.asset_pack import write_pack
+
+    canvas = (cfg.render.canvas.width, cfg.render.canvas.height)
+    bin_path = write_pack(cfg.assets.manifest_path, canvas, cfg.render.pack.dir)
+    print(f"Asset pack written: {bin_path}")
+
+
+def run_stt_server(cfg: DictConfig):
+    from talk2scene.stt_server import STTServer
+    from talk2scene.transcription import Transcriber
+
+    whisper = cfg.model.whisper
+    started = time.time()
+    transcriber = Transcriber(
+        model_size=whisper.model_size,
+        language=whisper.language,
+        device=whisper.device,
+        http=OmegaConf.to_container(cfg.model.http, resolve=True),
+    )
+    load_s = time.time() - started
+    info = {"model_size": whisper.model_size, "language": whisper.language, "load_s": round(load_s, 3)}
+    server = STTServer(transcriber, whisper.server.socket, info)
+    # Wake up regularly to notice a shutdown request
+    server.timeout = 0.5
+    logger.info(f"STT server ({whisper.model_size}, loaded in {load_s:.2f}s) listening on {whisper.server.socket}")
+    try:
+        while not _shutdown_requested:
+            server.handle_request()
+    finally:
+        server.server_close()
+        transcriber.close()
+        logger.info(f"STT server stopped after {server.requests} requests")
+
+
 def _find_config_dir() -> str:
     """Find the conf directory relative to the project root."""
     # Check relative to CWD first
@@ -528,10 +1370,13 @@ Usage: uv run talk2scene [OVERRIDES...]
 
 Modes:
   mode=batch              Process audio file end-to-end
+  mode=batch-all          Process every audio file, one session each
   mode=text               Process transcript JSONL into scene events
   mode=stream             Consume audio from Redis stream
   mode=video              Render session events into video (webm/mp4/avi)
   mode=generate-assets    Generate placeholder assets
+  mode=pack-assets        Pre-decode assets into a memory-mapped pack
+  mode=stt-server         Keep a Whisper model loaded for other runs
   render.scene=true       Render a scene to PNG
   eval.run=true           Run scene evaluation
 
@@ -581,6 +1426,16 @@ def _app_main(cfg: DictConfig):
     _validate_config(cfg)
 
     monitor = PerformanceMonitor()
+    _configure_render_caches(cfg.render.cache.layer_max_mb, cfg.render.cache.prefix_entries)
+
+    if cfg.mode == "pack-assets":
+        run_pack_assets(cfg)
+        return
+    if cfg.mode == "stt-server":
+        run_stt_server(cfg)
+        return
+    if cfg.mode != "generate-assets":
+        _install_asset_pack(cfg, monitor)
 
     # Handle special modes
     if cfg.eval.run:
@@ -600,6 +1455,10 @@ def _app_main(cfg: DictConfig):
         run_generate_assets(cfg)
         return
 
+    if cfg.mode == "batch-all":
+        run_batch_all(cfg)
+        return
+
     # Main pipeline modes
     session = SessionManager(
         base_dir=cfg.io.output.base_dir,
@@ -7,7 +7,7 @@ from pathlib import Path
 import numpy as np
 from PIL import Image
 
-from talk2scene.renderer import render_scene
+from talk2scene.renderer import render_scene_rgb
 
 logger = logging.getLogger(__name__)
 
@@ -51,11 +51,14 @@ def run_evaluation(
     asset_dirs: dict | None = None,
     canvas_size: tuple[int, int] = (1024, 1024),
     tolerance: float = 5.0,
+    backend: str = "pil",
 ) -> dict:
     """Run evaluation on all cases.
 
     Each case is a JSON file in cases_dir with scene state.
     Expected PNGs are in expected_dir with matching filenames (.png).
+    With backend="numpy" the NumPy compositor is checked against the same
+    expected images.
     """
     if asset_dirs is None:
         asset_dirs = {
@@ -92,9 +95,8 @@ def run_evaluation(
         with open(case_file) as f:
             scene_state = json.load(f)
 
-        # Render
-        rendered = render_scene(scene_state, asset_dirs, canvas_size)
-        rendered_rgb = rendered.convert("RGB")
+        # Render, flattened onto white the same way for every backend
+        rendered_rgb = render_scene_rgb(scene_state, asset_dirs, canvas_size, backend)
         rendered_path = output_path / f"{case_name}.png"
         rendered_rgb.save(str(rendered_path))
 
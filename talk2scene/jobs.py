@@ -0,0 +1,102 @@
+"""Staged job queue for processing many input files.
+
+Each job (one input file) goes through the same stages in order, such as
+normalize -> transcribe -> generate -> render. Every stage has its own
+worker threads and input queue, so while one file is being transcribed
+the next is already normalizing and the previous one generating scenes;
+a stage's worker count bounds how many jobs it holds at once. Stages that
+do CPU-heavy work are expected to hand it to processes themselves.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Queue sentinel: no more jobs will arrive for this stage
+_DONE = object()
+
+
+class Job:
+    """One input moving through the pipeline; stages share state through data.
+
+    status is "pending" until the job leaves the pipeline as "done",
+    "failed" (error holds the message) or "cancelled", or is set to
+    "skipped" before it enters. stage_s records seconds spent per stage.
+    """
+
+    def __init__(self, key: str, data: Optional[dict] = None):
+        self.key = key
+        self.data = dict(data or {})
+        self.status = "pending"
+        self.error: Optional[str] = None
+        self.stage_s: dict[str, float] = {}
+
+
+class JobPipeline:
+    """Runs jobs through stages given as (name, func(job), workers).
+
+    A stage raising marks the job failed and it skips the remaining
+    stages. Once should_stop() returns true, jobs still waiting for a
+    stage are cancelled instead of run.
+    """
+
+    def __init__(
+        self,
+        stages: list[tuple[str, Callable[[Job], None], int]],
+        should_stop: Callable[[], bool] = lambda: False,
+    ):
+        self.stages = [(name, func, max(1, workers)) for name, func, workers in stages]
+        self.should_stop = should_stop
+
+    def run(self, jobs: Iterable[Job]) -> list[Job]:
+        """Process jobs (those not pending pass straight through); returns them in input order."""
+        jobs = list(jobs)
+        queues = [queue.Queue() for _ in self.stages]
+        threads = []
+        for i, (name, func, workers) in enumerate(self.stages):
+            out = queues[i + 1] if i + 1 < len(queues) else None
+            threads.append([
+                threading.Thread(target=self._work, args=(name, func, queues[i], out), name=f"{name}-{n}", daemon=True)
+                for n in range(workers)
+            ])
+        for stage_threads in threads:
+            for t in stage_threads:
+                t.start()
+
+        for job in jobs:
+            if job.status == "pending":
+                queues[0].put(job)
+        # A stage is finished once every job has left the stage before it
+        for i, stage_threads in enumerate(threads):
+            for _ in stage_threads:
+                queues[i].put(_DONE)
+            for t in stage_threads:
+                t.join()
+
+        for job in jobs:
+            if job.status == "pending":
+                job.status = "done"
+        return jobs
+
+    def _work(self, name: str, func: Callable[[Job], None], inbox: queue.Queue, out: Optional[queue.Queue]):
+        while True:
+            job = inbox.get()
+            if job is _DONE:
+                return
+            if job.status == "pending" and self.should_stop():
+                job.status = "cancelled"
+            if job.status == "pending":
+                started = time.time()
+                try:
+                    func(job)
+                except Exception as e:
+                    logger.error(f"Job {job.key} failed in {name}: {e}")
+                    job.status = "failed"
+                    job.error = f"{name}: {type(e).__name__}: {e}"
+                job.stage_s[name] = round(time.time() - started, 3)
+            if out is not None:
+                out.put(job)
@@ -0,0 +1,114 @@
+"""Content-addressed on-disk cache of LLM scene generation results.
+
+Re-running text mode on the same transcript (common while tuning the
+renderer) should not re-bill and re-wait for the LLM. Results are stored
+under the sha256 of the full request body: model, temperature, max tokens
+and both messages, i.e. the system prompt with its embedded whitelist and
+the transcript chunk with its context. Any change to one of them is a miss.
+
+Entries are JSON files fanned out by the first two hex digits of the key.
+A hit refreshes the file's mtime, and the least recently used entries are
+deleted once the directory exceeds its size budget.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def request_key(request_body: dict) -> str:
+    """sha256 of the canonical JSON form of a chat completion request."""
+    canonical = json.dumps(request_body, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, cache_dir: str, max_bytes: int = 64 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bytes = sum(p.stat().st_size for p in self._entries())
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _entries(self) -> list[Path]:
+        if not self.cache_dir.exists():
+            return []
+        return list(self.cache_dir.glob("*/*.json"))
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[list[dict]]:
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                scenes = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return scenes
+
+    def put(self, key: str, scenes: list[dict]):
+        path = self._path(key)
+        data = json.dumps(scenes, ensure_ascii=False).encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so concurrent readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        with self._lock:
+            old = path.stat().st_size if path.exists() else 0
+            os.replace(tmp, path)
+            self._bytes += len(data) - old
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Delete least recently used entries until under budget (lock held)."""
+        entries = []
+        for p in self._entries():
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, p))
+        entries.sort()
+        self._bytes = sum(size for _, size, _ in entries)
+        for _, size, p in entries:
+            if self._bytes <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            self._bytes -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            for p in self._entries():
+                p.unlink(missing_ok=True)
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bytes": self._bytes,
+        }
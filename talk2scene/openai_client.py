@@ -0,0 +1,109 @@
+"""Long-lived, connection-pooled OpenAI clients.
+
+Building openai.OpenAI() per call creates a new HTTP client each time, so
+every request pays for DNS, TCP and TLS again. The scene generator and the
+transcriber each keep one client for their lifetime instead, with a
+bounded keep-alive pool and explicit timeouts from model.http.
+
+Async clients are bound to the event loop they first run on, so owners
+that need one across several synchronous calls run it on a LoopThread.
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Optional
+
+try:
+    import httpx
+except ImportError:  # newer openai releases depend on httpx2 instead
+    import httpx2 as httpx
+
+if TYPE_CHECKING:
+    from talk2scene.performance import PerformanceMonitor
+
+DEFAULT_HTTP = {
+    "pool_size": 10,
+    "connect_timeout_s": 5.0,
+    "read_timeout_s": 60.0,
+    "max_retries": 2,
+}
+
+
+def _http_options(http: Optional[dict]) -> dict:
+    opts = dict(DEFAULT_HTTP)
+    opts.update(http or {})
+    return {
+        "limits": httpx.Limits(
+            max_connections=opts["pool_size"],
+            max_keepalive_connections=opts["pool_size"],
+        ),
+        "timeout": httpx.Timeout(opts["read_timeout_s"], connect=opts["connect_timeout_s"]),
+        "max_retries": opts["max_retries"],
+    }
+
+
+def make_client(http: Optional[dict] = None):
+    """A pooled synchronous client; http overrides keys of DEFAULT_HTTP."""
+    import openai
+
+    opts = _http_options(http)
+    return openai.OpenAI(
+        http_client=openai.DefaultHttpxClient(limits=opts["limits"], timeout=opts["timeout"]),
+        timeout=opts["timeout"],
+        max_retries=opts["max_retries"],
+    )
+
+
+def make_async_client(http: Optional[dict] = None):
+    """A pooled async client; must be created and used on a single event loop."""
+    import openai
+
+    opts = _http_options(http)
+    return openai.AsyncOpenAI(
+        http_client=openai.DefaultAsyncHttpxClient(limits=opts["limits"], timeout=opts["timeout"]),
+        timeout=opts["timeout"],
+        max_retries=opts["max_retries"],
+    )
+
+
+@contextmanager
+def timed_call(monitor: Optional["PerformanceMonitor"], name: str):
+    """Record the latency of the enclosed API call into monitor's histogram name."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if monitor is not None:
+            monitor.observe(name, time.perf_counter() - start)
+
+
+class LoopThread:
+    """A private event loop on a daemon thread, for running coroutines from sync code.
+
+    Unlike asyncio.run(), the loop outlives each call, so async clients
+    (and their pooled connections) created on it can be reused.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def run(self, coro):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+                self._thread.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def close(self):
+        with self._lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = self._thread = None
@@ -6,10 +6,43 @@ from collections import defaultdict
 from pathlib import Path
 
 
+# Upper bounds (ms) of latency histogram buckets; the last bucket is open-ended
+HISTOGRAM_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def _histogram_report(values: list[float]) -> dict:
+    ms = sorted(v * 1000 for v in values)
+    buckets = {f"le_{b}ms": 0 for b in HISTOGRAM_BUCKETS_MS}
+    buckets["gt_{}ms".format(HISTOGRAM_BUCKETS_MS[-1])] = 0
+    for v in ms:
+        for b in HISTOGRAM_BUCKETS_MS:
+            if v <= b:
+                buckets[f"le_{b}ms"] += 1
+                break
+        else:
+            buckets["gt_{}ms".format(HISTOGRAM_BUCKETS_MS[-1])] += 1
+    return {
+        "count": len(ms),
+        "p50_ms": round(_percentile(ms, 0.5), 1),
+        "p90_ms": round(_percentile(ms, 0.9), 1),
+        "p99_ms": round(_percentile(ms, 0.99), 1),
+        "max_ms": round(ms[-1], 1),
+        "buckets": buckets,
+    }
+
+
 class PerformanceMonitor:
     def __init__(self):
         self.timers: dict[str, list[float]] = defaultdict(list)
         self._active: dict[str, float] = {}
+        self.counters: dict[str, int] = defaultdict(int)
+        self.gauges: dict[str, float] = {}
+        self.histograms: dict[str, list[float]] = defaultdict(list)
 
     def start(self, name: str):
         self._active[name] = time.time()
@@ -24,6 +57,16 @@ class PerformanceMonitor:
     def record(self, name: str, value: float):
         self.timers[name].append(value)
 
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def gauge(self, name: str, value: float):
+        self.gauges[name] = value
+
+    def observe(self, name: str, seconds: float):
+        """Add a latency sample to histogram name (thread-safe for list appends)."""
+        self.histograms[name].append(seconds)
+
     def report(self) -> dict:
         result = {}
         for name, values in self.timers.items():
@@ -34,6 +77,14 @@ class PerformanceMonitor:
                 "min_s": round(min(values), 3) if values else 0,
                 "max_s": round(max(values), 3) if values else 0,
             }
+        if self.counters:
+            result["counters"] = dict(self.counters)
+        if self.gauges:
+            result["gauges"] = {name: round(v, 4) for name, v in self.gauges.items()}
+        if self.histograms:
+            result["histograms"] = {
+                name: _histogram_report(values) for name, values in self.histograms.items() if values
+            }
         return result
 
     def save(self, path: Path):
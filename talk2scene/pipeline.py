@@ -0,0 +1,41 @@
+"""Bounded, order-preserving fan-out over a multiprocessing pool.
+
+Pool.map submits every task and holds every result until the last one is
+done; Pool.imap submits every task up front and buffers finished results
+without limit when the consumer is slower than the workers. ordered_imap
+keeps at most max_inflight tasks submitted-but-unconsumed, so memory stays
+bounded by that window while the consumer starts on result 0 as soon as it
+is ready.
+"""
+
+from collections import deque
+from typing import Callable, Iterable, Iterator
+
+
+def ordered_imap(pool, func: Callable, tasks: Iterable, max_inflight: int) -> Iterator:
+    """Yield func(task) for each task, in task order, with a bounded window.
+
+    Up to max_inflight tasks run (or wait, finished) ahead of the consumer;
+    results that finish out of order sit in the window until their turn.
+    Exceptions raised by func propagate when their result is reached.
+    """
+    max_inflight = max(1, max_inflight)
+    window: deque = deque()
+    task_iter = iter(tasks)
+
+    def submit() -> bool:
+        try:
+            task = next(task_iter)
+        except StopIteration:
+            return False
+        window.append(pool.apply_async(func, (task,)))
+        return True
+
+    while len(window) < max_inflight and submit():
+        pass
+    while window:
+        result = window.popleft().get()
+        # Refill before handing the result over, so workers stay busy while
+        # the consumer works on it
+        submit()
+        yield result
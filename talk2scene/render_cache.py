@@ -0,0 +1,309 @@
+"""Process-wide caches for the scene renderer.
+
+Decoding, resizing and converting a 1024x1024 PNG costs far more than
+compositing it, and the whitelist only has a few dozen codes, so decoded
+layers are kept in a bounded LRU and shared by every render in the process.
+Partial composites (BG, BG+STA, BG+STA+ACT) are cached the same way, so a
+scene that only changes its top layer costs a single alpha_composite.
+
+A layer source (see talk2scene.atlas) can be installed to serve layers
+that are already decoded elsewhere, such as in shared memory; the layer
+cache consults it before decoding and does not count its layers against
+the budget.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+from PIL import Image
+
+from talk2scene.compositing import premultiply
+
+
+def layer_key(path: str, canvas_size: tuple[int, int]) -> tuple:
+    """Cache identity of an asset: changes whenever the file is modified."""
+    return (path, os.stat(path).st_mtime_ns, tuple(canvas_size))
+
+
+def decode_layer(path: str, canvas_size: tuple[int, int]) -> Image.Image:
+    """Open an asset and return it as a canvas-sized RGBA image."""
+    img = Image.open(path)
+    img.load()
+    if img.size != canvas_size:
+        img = img.resize(canvas_size, Image.LANCZOS)
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    return img
+
+
+class LayerArray:
+    """A decoded layer as read-only uint8 arrays plus compositing hints.
+
+    array is the straight-alpha RGBA layer. bbox is the (left, upper, right,
+    lower) box of pixels with non-zero alpha (None when fully transparent)
+    and opaque is True when every pixel has alpha 255. Opaque layers carry a
+    contiguous RGB copy in rgb; the others carry their bbox pre-multiplied
+    for blending onto an opaque canvas (see talk2scene.compositing).
+    """
+
+    __slots__ = ("array", "bbox", "opaque", "rgb", "premul", "inv_alpha")
+
+    def __init__(self, array: np.ndarray, bbox: Optional[tuple], opaque: bool):
+        self.array = array
+        self.bbox = bbox
+        self.opaque = opaque
+        self.rgb = None
+        self.premul = self.inv_alpha = None
+        if opaque:
+            self.rgb = np.ascontiguousarray(array[..., :3])
+        elif bbox is not None:
+            self.premul, self.inv_alpha = premultiply(array, bbox)
+        for arr in (self.array, self.rgb, self.premul, self.inv_alpha):
+            if arr is not None:
+                arr.flags.writeable = False
+
+    @classmethod
+    def from_image(cls, img: Image.Image) -> "LayerArray":
+        alpha = img.getchannel("A")
+        return cls(np.asarray(img), alpha.getbbox(), alpha.getextrema()[0] == 255)
+
+    @classmethod
+    def from_parts(
+        cls,
+        array: np.ndarray,
+        bbox: Optional[tuple],
+        opaque: bool,
+        rgb: Optional[np.ndarray] = None,
+        premul: Optional[np.ndarray] = None,
+        inv_alpha: Optional[np.ndarray] = None,
+    ) -> "LayerArray":
+        """Wrap arrays computed elsewhere (e.g. views into shared memory) without copying."""
+        layer = cls.__new__(cls)
+        layer.array, layer.bbox, layer.opaque = array, bbox, opaque
+        layer.rgb, layer.premul, layer.inv_alpha = rgb, premul, inv_alpha
+        return layer
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.array, self.rgb, self.premul, self.inv_alpha)
+        return sum(arr.nbytes for arr in arrays if arr is not None)
+
+
+class LayerCache:
+    """LRU cache of ready-to-composite RGBA layers.
+
+    Entries are keyed by (path, mtime, canvas_size), so an asset edited on
+    disk is decoded again on its next use. Layers are cached as PIL images
+    for the PIL backend and as LayerArray for the NumPy backend. Cached
+    values are shared between renders and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, tuple] = OrderedDict()
+        self._latest: dict[tuple, tuple] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.shared_hits = 0
+
+    def get(self, path: str, canvas_size: tuple[int, int]) -> Image.Image:
+        return self._get(path, canvas_size, "image")
+
+    def get_array(self, path: str, canvas_size: tuple[int, int]) -> LayerArray:
+        return self._get(path, canvas_size, "array")
+
+    def _get(self, path: str, canvas_size: tuple[int, int], kind: str):
+        key = layer_key(path, canvas_size) + (kind,)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        if _layer_source is not None:
+            value = _layer_source.lookup(path, canvas_size, kind)
+            if value is not None:
+                self.shared_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        img = decode_layer(path, canvas_size)
+        if kind == "image":
+            self._put(key, img, img.width * img.height * 4)
+            return img
+        value = LayerArray.from_image(img)
+        self._put(key, value, value.nbytes)
+        return value
+
+    def _put(self, key: tuple, value, size: int):
+        if size > self.max_bytes:
+            return
+        # (path, canvas_size, kind): identifies the asset regardless of mtime
+        asset = key[::2]
+        with self._lock:
+            # Drop the entry for an older mtime of the same asset
+            stale = self._latest.get(asset)
+            if stale is not None and stale != key:
+                self._remove(stale)
+            if key in self._entries:
+                return
+            self._entries[key] = (value, size)
+            self._latest[asset] = key
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry[1]
+        if self._latest.get(key[::2]) == key:
+            del self._latest[key[::2]]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._latest.clear()
+            self._bytes = 0
+
+    def invalidate(self, match: Callable[[str], bool]) -> int:
+        """Drop the layers whose path satisfies match; returns how many."""
+        with self._lock:
+            stale = [key for key in self._entries if match(key[0])]
+            for key in stale:
+                self._remove(key)
+        return len(stale)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "shared_hits": self.shared_hits,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+
+class PrefixCache:
+    """LRU cache of partial composites keyed by the layers composited so far.
+
+    A key is the tuple of layer_key() values from the bottom layer up, so
+    depth 1 is BG alone, depth 2 is BG+STA, and so on. Hits and misses are
+    counted per depth.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, object] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits: dict[int, int] = {}
+        self.misses: dict[int, int] = {}
+
+    def get(self, key: tuple):
+        depth = len(key)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses[depth] = self.misses.get(depth, 0) + 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits[depth] = self.hits.get(depth, 0) + 1
+            return value
+
+    def put(self, key: tuple, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def invalidate(self, match: Callable[[str], bool]) -> int:
+        """Drop the composites containing a layer whose path satisfies match."""
+        with self._lock:
+            stale = [key for key in self._entries if any(match(layer[0]) for layer in key)]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def stats(self) -> dict:
+        depths = sorted(set(self.hits) | set(self.misses))
+        return {
+            f"depth{d}": {"hits": self.hits.get(d, 0), "misses": self.misses.get(d, 0)}
+            for d in depths
+        }
+
+
+_layer_cache: Optional[LayerCache] = None
+_prefix_cache: Optional[PrefixCache] = None
+_layer_source = None
+
+
+def set_layer_source(source):
+    """Install an object whose lookup(path, canvas_size, kind) serves layers, or None."""
+    global _layer_source
+    _layer_source = source
+
+
+def get_layer_source():
+    return _layer_source
+
+
+def configure_layer_cache(max_bytes: int) -> LayerCache:
+    """Replace the process-wide layer cache with one of the given budget."""
+    global _layer_cache
+    _layer_cache = LayerCache(max_bytes)
+    return _layer_cache
+
+
+def get_layer_cache() -> LayerCache:
+    if _layer_cache is None:
+        return configure_layer_cache(256 * 1024 * 1024)
+    return _layer_cache
+
+
+def configure_prefix_cache(max_entries: int) -> PrefixCache:
+    """Replace the process-wide prefix composite cache."""
+    global _prefix_cache
+    _prefix_cache = PrefixCache(max_entries)
+    return _prefix_cache
+
+
+def get_prefix_cache() -> PrefixCache:
+    if _prefix_cache is None:
+        return configure_prefix_cache(32)
+    return _prefix_cache
+
+
+def invalidate_asset_dirs(dirs: Iterable[str]) -> int:
+    """Drop cached layers and composites using assets under any of dirs."""
+    roots = tuple(os.path.join(os.path.abspath(d), "") for d in dirs)
+    if not roots:
+        return 0
+
+    def match(path: str) -> bool:
+        return os.path.abspath(path).startswith(roots)
+
+    return get_layer_cache().invalidate(match) + get_prefix_cache().invalidate(match)
+
+
+def cache_stats() -> dict:
+    """Snapshot of both render caches in this process."""
+    return {"layer": get_layer_cache().stats(), "prefix": get_prefix_cache().stats()}
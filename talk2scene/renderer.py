@@ -2,6 +2,10 @@
 
 Layer order for normal scenes: BG -> STA -> ACT -> EXP
 When CG is active: CG replaces the entire scene (full-screen illustration).
+
+Two backends produce identical pixels: "pil" chains Image.alpha_composite,
+"numpy" replays the same integer arithmetic on cached layer arrays and
+fuses the white flatten into the same pass (see talk2scene.compositing).
 """
 
 import json
@@ -9,47 +13,42 @@ import logging
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
 from PIL import Image
 
+from talk2scene.compositing import alpha_composite, blend_premultiplied, flatten_on_white
+from talk2scene.render_cache import get_layer_cache, get_prefix_cache, layer_key
+
 logger = logging.getLogger(__name__)
 
+BACKENDS = ("pil", "numpy")
+
 
 def load_asset(path: str) -> Image.Image:
     img = Image.open(path)
     return img.copy()
 
 
-def render_scene(
-    scene_state: dict,
-    asset_dirs: dict,
-    canvas_size: tuple[int, int] = (1024, 1024),
-) -> Image.Image:
-    """Render a scene state dict into a composed PNG.
+def _scene_layer_paths(scene_state: dict, asset_dirs: dict) -> tuple[list[str], bool]:
+    """Resolve the asset files to composite, bottom first.
 
-    If CG is set (not CG_None), the CG illustration replaces the entire
-    layered composition — just like a CG scene in a visual novel.
-    Otherwise, normal layering: BG -> STA -> ACT -> EXP.
+    Returns (paths, is_cg): a single CG path when a CG illustration is
+    active, otherwise the existing BG -> STA -> ACT -> EXP layers.
     """
-    canvas = Image.new("RGBA", canvas_size, (0, 0, 0, 0))
-
     cg_code = scene_state.get("cg")
     if cg_code and cg_code != "CG_None":
         # CG mode: full-scene illustration replaces everything
         cat_dir = Path(asset_dirs.get("cg", "assets/cg"))
         asset_path = cat_dir / f"{cg_code}.png"
         if asset_path.exists():
-            cg_img = load_asset(str(asset_path))
-            if cg_img.size != canvas_size:
-                cg_img = cg_img.resize(canvas_size, Image.LANCZOS)
-            if cg_img.mode != "RGBA":
-                cg_img = cg_img.convert("RGBA")
-            return cg_img
+            return [str(asset_path)], True
         else:
             logger.warning(f"CG asset not found: {asset_path}, falling back to normal layers")
 
     # Normal layering: BG -> STA -> ACT -> EXP
     normal_layers = ["bg", "sta", "act", "exp"]
 
+    layer_paths = []
     for layer in normal_layers:
         code = scene_state.get(layer)
         if not code or code.endswith("_None"):
@@ -62,34 +61,170 @@ def render_scene(
             logger.warning(f"Asset not found: {asset_path}")
             continue
 
-        layer_img = load_asset(str(asset_path))
+        layer_paths.append(str(asset_path))
+
+    return layer_paths, False
 
-        # Resize to canvas if needed
-        if layer_img.size != canvas_size:
-            layer_img = layer_img.resize(canvas_size, Image.LANCZOS)
 
-        # Ensure RGBA
-        if layer_img.mode != "RGBA":
-            layer_img = layer_img.convert("RGBA")
+def scene_asset_paths(scene_states: list[dict], asset_dirs: dict) -> list[str]:
+    """Unique asset files used by the given scene states, in first-use order."""
+    paths = {}
+    for state in scene_states:
+        for path in _scene_layer_paths(state, asset_dirs)[0]:
+            paths[path] = None
+    return list(paths)
+
+
+def preload_scene_assets(
+    scene_states: list[dict],
+    asset_dirs: dict,
+    canvas_size: tuple[int, int] = (1024, 1024),
+    backend: str = "pil",
+) -> int:
+    """Decode every layer the given scene states use into the layer cache.
+
+    Meant for render worker startup, so the first frames do not pay for PNG
+    decoding. Stops early once the cache starts evicting, since anything
+    loaded past its budget would only push out earlier layers. Returns the
+    number of layers loaded.
+    """
+    canvas_size = tuple(canvas_size)
+    cache = get_layer_cache()
+    loaded = 0
+    for path in scene_asset_paths(scene_states, asset_dirs):
+        evictions = cache.evictions
+        if backend == "numpy":
+            cache.get_array(path, canvas_size)
+        else:
+            cache.get(path, canvas_size)
+        loaded += 1
+        if cache.evictions > evictions:
+            break
+    return loaded
+
+
+def _deepest_prefix(keys: list[tuple]) -> tuple[int, Optional[object]]:
+    """Find the deepest cached partial composite for a layer stack.
+
+    Only proper prefixes are looked up, so a scene that only changes its
+    top layer resumes one alpha_composite from the end.
+    """
+    prefix_cache = get_prefix_cache()
+    for depth in range(len(keys) - 1, 0, -1):
+        cached = prefix_cache.get(tuple(keys[:depth]))
+        if cached is not None:
+            return depth, cached
+    return 0, None
+
+
+def render_scene(
+    scene_state: dict,
+    asset_dirs: dict,
+    canvas_size: tuple[int, int] = (1024, 1024),
+) -> Image.Image:
+    """Render a scene state dict into a composed PNG.
+
+    If CG is set (not CG_None), the CG illustration replaces the entire
+    layered composition — just like a CG scene in a visual novel.
+    Otherwise, normal layering: BG -> STA -> ACT -> EXP.
+    """
+    layer_paths, is_cg = _scene_layer_paths(scene_state, asset_dirs)
+    if is_cg:
+        # Copy so callers may modify the result without touching the cache
+        return get_layer_cache().get(layer_paths[0], canvas_size).copy()
+
+    # Resume from the deepest cached partial composite (BG, BG+STA, ...),
+    # so a scene that only changes its top layer costs one alpha_composite
+    keys = [layer_key(p, canvas_size) for p in layer_paths]
+    start, canvas = _deepest_prefix(keys)
+    if canvas is None:
+        canvas = Image.new("RGBA", canvas_size, (0, 0, 0, 0))
+
+    prefix_cache = get_prefix_cache()
+    for depth in range(start, len(layer_paths)):
+        # Decoded, resized RGBA layer (shared; alpha_composite never mutates it)
+        layer_img = get_layer_cache().get(layer_paths[depth], canvas_size)
 
         # Composite
         canvas = Image.alpha_composite(canvas, layer_img)
+        if depth + 1 < len(layer_paths):
+            prefix_cache.put(tuple(keys[:depth + 1]), canvas)
 
     return canvas
 
 
+def _render_scene_array(
+    scene_state: dict,
+    asset_dirs: dict,
+    canvas_size: tuple[int, int],
+) -> np.ndarray:
+    """NumPy backend: the scene flattened onto white as an (H, W, 3) uint8 array.
+
+    The working canvas is an (opaque, array) pair: while opaque it holds RGB
+    only and each layer is blended inside its visible bbox; otherwise it is
+    RGBA and composited with the general formula.
+    """
+    canvas_size = tuple(canvas_size)
+    cache = get_layer_cache()
+    layer_paths, is_cg = _scene_layer_paths(scene_state, asset_dirs)
+    if is_cg:
+        layer = cache.get_array(layer_paths[0], canvas_size)
+        return layer.rgb.copy() if layer.opaque else flatten_on_white(layer.array)
+
+    # Same prefix scheme as render_scene; the backend tag keeps entries apart
+    keys = [layer_key(p, canvas_size) + ("numpy",) for p in layer_paths]
+    start, cached = _deepest_prefix(keys)
+    if cached is None:
+        opaque, canvas = False, np.zeros((canvas_size[1], canvas_size[0], 4), dtype=np.uint8)
+    else:
+        opaque, canvas = cached[0], cached[1].copy()
+
+    prefix_cache = get_prefix_cache()
+    for depth in range(start, len(layer_paths)):
+        layer = cache.get_array(layer_paths[depth], canvas_size)
+        if layer.opaque:
+            # Compositing an opaque layer onto anything yields the layer itself
+            opaque, canvas = True, layer.rgb.copy()
+        elif opaque:
+            blend_premultiplied(canvas, layer.premul, layer.inv_alpha, layer.bbox)
+        else:
+            canvas = alpha_composite(canvas, layer.array)
+        if depth + 1 < len(layer_paths):
+            frozen = canvas.copy()
+            frozen.flags.writeable = False
+            prefix_cache.put(tuple(keys[:depth + 1]), (opaque, frozen))
+
+    return canvas if opaque else flatten_on_white(canvas)
+
+
+def render_scene_rgb(
+    scene_state: dict,
+    asset_dirs: dict,
+    canvas_size: tuple[int, int] = (1024, 1024),
+    backend: str = "pil",
+) -> Image.Image:
+    """Render a scene flattened onto white as an RGB image."""
+    if backend == "numpy":
+        return Image.fromarray(_render_scene_array(scene_state, asset_dirs, canvas_size), "RGB")
+    if backend != "pil":
+        raise ValueError(f"Unknown render backend: {backend} (expected one of {BACKENDS})")
+
+    img = render_scene(scene_state, asset_dirs, canvas_size)
+    bg = Image.new("RGBA", canvas_size, (255, 255, 255, 255))
+    return Image.alpha_composite(bg, img).convert("RGB")
+
+
 def render_scene_to_file(
     scene_state: dict,
     output_path: str,
     asset_dirs: dict,
     canvas_size: tuple[int, int] = (1024, 1024),
+    backend: str = "pil",
 ) -> str:
-    img = render_scene(scene_state, asset_dirs, canvas_size)
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
 
     # Convert to RGB for PNG output (flatten alpha onto white)
-    bg = Image.new("RGBA", canvas_size, (255, 255, 255, 255))
-    final = Image.alpha_composite(bg, img)
-    final.convert("RGB").save(output_path)
+    final = render_scene_rgb(scene_state, asset_dirs, canvas_size, backend)
+    final.save(output_path)
     logger.info(f"Rendered scene to: {output_path}")
     return output_path
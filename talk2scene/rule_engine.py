@@ -0,0 +1,179 @@
+"""Offline keyword/regex scene generation.
+
+Selected with model.llm.provider=rules: maps transcript text to whitelist
+codes locally, with no network, at tens of thousands of segments per
+second. Useful for bulk backfills, benchmarks, and as a less uniform
+fallback than the neutral scene when the LLM is unavailable.
+
+Rules come from config/composition_rules.json:
+
+    default_components   code per category when no rule matches
+    keyword_rules        [{"keywords": [...], "pattern": regex,
+                           "exp": ..., "act": ...}, ...]
+                         checked in order; a rule matches when any keyword
+                         or its (case-insensitive) pattern does, and the
+                         first matching rule that sets a category wins it
+    recommended_pairs    {ACT code: [EXP codes]}; the first EXP is used when
+                         a rule picked the action but no rule the expression
+
+Keywords are case-insensitive whole words or phrases, except CJK ones,
+which match anywhere since CJK text has no spaces. They are plain
+substring tests on a normalized copy of the text, much cheaper than
+regular expressions; use pattern only for what keywords cannot express.
+
+The background is sticky: it changes only when a rule names a new one.
+"""
+
+import json
+import logging
+import re
+import unicodedata
+from typing import TYPE_CHECKING, Iterator, Optional
+
+from talk2scene.whitelist import CATEGORIES, get_compiled_whitelist, repair_code, validate_code
+
+if TYPE_CHECKING:
+    from talk2scene.performance import PerformanceMonitor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMPONENTS = {
+    "sta": "STA_Stand_Front",
+    "exp": "EXP_Neutral",
+    "act": "ACT_None",
+    "bg": "BG_Lab_Modern",
+    "cg": "CG_None",
+}
+
+# Distinct texts whose matches are remembered; dialogue repeats itself
+_MEMO_ENTRIES = 65536
+
+_NON_WORD = re.compile(r"[^\w']+")
+
+
+def _normalize(text: str) -> str:
+    """Lowercased words separated by single spaces, padded with a space."""
+    return f" {_NON_WORD.sub(' ', text.lower()).strip()} "
+
+
+def _needle(keyword: str) -> str:
+    """Substring to look for in normalized text."""
+    keyword = _normalize(keyword)
+    if any(unicodedata.east_asian_width(ch) in ("W", "F") for ch in keyword):
+        return keyword.strip()
+    return keyword
+
+
+class RuleEngine:
+    """Keyword rules compiled for matching.
+
+    Codes are checked against the whitelist once, here: non-whitelisted
+    rule codes are dropped and defaults repaired, so the scenes produced
+    need no further validation.
+    """
+
+    def __init__(self, rules: dict):
+        self.path: Optional[str] = None
+        self.wl_version = get_compiled_whitelist().version
+        defaults = {**DEFAULT_COMPONENTS, **rules.get("default_components", {})}
+        self.defaults = {cat: repair_code(cat.upper(), code) for cat, code in defaults.items()}
+        self.pairs = {
+            act: exps[0]
+            for act, exps in rules.get("recommended_pairs", {}).items()
+            if exps and validate_code("EXP", exps[0])
+        }
+        self.rules: list[tuple[tuple[str, ...], Optional[re.Pattern], dict]] = []
+        for i, rule in enumerate(rules.get("keyword_rules", [])):
+            codes = {}
+            for cat in CATEGORIES:
+                if cat not in rule:
+                    continue
+                if validate_code(cat.upper(), rule[cat]):
+                    codes[cat] = rule[cat]
+                else:
+                    logger.warning(f"Keyword rule {i} uses non-whitelisted code {rule[cat]}, ignored")
+            needles = tuple(_needle(k) for k in rule.get("keywords", []))
+            pattern = re.compile(rule["pattern"], re.IGNORECASE) if rule.get("pattern") else None
+            self.rules.append((needles, pattern, codes))
+        self._memo: dict[str, dict] = {}
+
+    @classmethod
+    def from_file(cls, path: str = "config/composition_rules.json") -> "RuleEngine":
+        with open(path) as f:
+            engine = cls(json.load(f))
+        engine.path = path
+        return engine
+
+    def match(self, text: str) -> dict:
+        """Codes set by the rules matching text (no defaults applied)."""
+        codes = self._memo.get(text)
+        if codes is not None:
+            return codes
+        codes = {}
+        normalized = _normalize(text)
+        for needles, pattern, rule_codes in self.rules:
+            if any(n in normalized for n in needles) or (pattern is not None and pattern.search(text)):
+                for cat, code in rule_codes.items():
+                    codes.setdefault(cat, code)
+                if len(codes) == len(CATEGORIES):
+                    break
+        if "act" in codes and "exp" not in codes and codes["act"] in self.pairs:
+            codes["exp"] = self.pairs[codes["act"]]
+        if len(self._memo) >= _MEMO_ENTRIES:
+            self._memo.clear()
+        self._memo[text] = codes
+        return codes
+
+    def scene_for(self, ev: dict, bg: Optional[str] = None) -> dict:
+        """Scene event fields for transcript event ev; bg is the current background."""
+        codes = self.match(ev.get("text", ""))
+        return {
+            "type": "scene",
+            "speaker_id": ev.get("speaker_id", "unknown"),
+            "text": ev.get("text", ""),
+            "sta": codes.get("sta", self.defaults["sta"]),
+            "exp": codes.get("exp", self.defaults["exp"]),
+            "act": codes.get("act", self.defaults["act"]),
+            "bg": codes.get("bg", bg or self.defaults["bg"]),
+            "cg": codes.get("cg", self.defaults["cg"]),
+            "start": ev.get("start", 0),
+            "end": ev.get("end", 0),
+        }
+
+
+class RuleSceneGenerator:
+    """Drop-in for SceneGenerator backed by a RuleEngine."""
+
+    def __init__(
+        self,
+        rules_path: str = "config/composition_rules.json",
+        monitor: Optional["PerformanceMonitor"] = None,
+    ):
+        self.engine = RuleEngine.from_file(rules_path)
+        self.monitor = monitor
+        self._seq_idx = 0
+        self._bg: Optional[str] = None
+
+    def generate(self, transcript_events: list[dict]) -> list[dict]:
+        version = get_compiled_whitelist().version
+        if version != self.engine.wl_version:
+            # Rule codes were checked against an older whitelist
+            self.engine = RuleEngine.from_file(self.engine.path)
+            if self._bg is not None and not validate_code("BG", self._bg):
+                self._bg = None
+        result = []
+        for ev in transcript_events:
+            scene = self.engine.scene_for(ev, self._bg)
+            self._bg = scene["bg"]
+            scene = {"type": "scene", "seq": self._seq_idx, "wl_version": version, **scene}
+            self._seq_idx += 1
+            result.append(scene)
+        if self.monitor is not None:
+            self.monitor.count("rule_scenes", len(result))
+        return result
+
+    def generate_stream(self, transcript_events: list[dict]) -> Iterator[dict]:
+        yield from self.generate(transcript_events)
+
+    def close(self):
+        pass
@@ -1,10 +1,23 @@
 """LLM-based scene generation from transcript events."""
 
+import asyncio
 import json
 import logging
-from typing import Optional
+from typing import TYPE_CHECKING, Iterator, Optional
 
-from talk2scene.whitelist import validate_scene_event, get_whitelist
+from talk2scene.openai_client import LoopThread, make_async_client, make_client, timed_call
+from talk2scene.whitelist import (
+    CATEGORIES as SCENE_FIELDS,
+    get_compiled_whitelist,
+    get_whitelist,
+    on_whitelist_change,
+    validate_scene_events,
+)
+
+if TYPE_CHECKING:
+    from talk2scene.llm_cache import LLMCache
+    from talk2scene.performance import PerformanceMonitor
+    from talk2scene.rule_engine import RuleEngine
 
 logger = logging.getLogger(__name__)
 
@@ -36,101 +49,478 @@ Rules:
 - Return JSON object: {{"scenes": [...]}} with an array of scene events
 """
 
+# encoding="codes": the model only picks an index per category for each
+# segment; speaker, text and timestamps are copied from the transcript
+CODES_SYSTEM_PROMPT = """You are a scene event generator for Talk2Scene.
+Given transcript segments, choose the scene codes for each segment.
+
+Pick one code per category, by its index in the lists below:
+- STA: character half-body stance
+- EXP: facial expression overlay
+- ACT: arm/hand action overlay
+- BG: scene background
+- CG: full-scene illustration
+
+{codes}
+
+Rules:
+- Produce exactly one row per transcript segment, in segment order
+- Normal layering order: BG -> STA -> ACT -> EXP
+- CG REPLACES the entire layered scene. Use CG only for dramatic key moments.
+- If no action, use ACT_None; if no CG illustration, use CG_None (most segments)
+- Return JSON object: {{"scenes": [[sta, exp, act, bg, cg], ...]}} where each value is an integer index
+"""
+
+CATEGORIES = tuple(cat.upper() for cat in SCENE_FIELDS)
+ENCODINGS = ("names", "codes")
+
+# encoding -> (whitelist it was built from, system prompt)
+_system_prompts: dict[str, tuple[dict, str]] = {}
+
+
+def system_prompt(wl: dict, encoding: str = "names") -> str:
+    """The system prompt for whitelist wl, built once per whitelist load."""
+    cached = _system_prompts.get(encoding)
+    if cached is not None and cached[0] is wl:
+        return cached[1]
+    if encoding == "codes":
+        codes = "\n".join(
+            f"{cat}: " + " ".join(f"{i}={code}" for i, code in enumerate(wl.get(cat, [])))
+            for cat in CATEGORIES
+        )
+        prompt = CODES_SYSTEM_PROMPT.format(codes=codes)
+    else:
+        prompt = SYSTEM_PROMPT.format(whitelist=json.dumps(wl, ensure_ascii=False, separators=(",", ":")))
+    _system_prompts[encoding] = (wl, prompt)
+    return prompt
+
+
+def _drop_system_prompts(old, new, changed: frozenset):
+    # Every category is listed in the prompt, so any change invalidates it
+    _system_prompts.clear()
+
+
+on_whitelist_change(_drop_system_prompts)
+
+
+CONTEXT_HEADER = "Context (earlier segments, for continuity only; do not produce scenes for these):\n"
+SEGMENTS_HEADER = "Segments:\n"
+
+
+def format_segments(transcript_events: list[dict]) -> str:
+    text = ""
+    for ev in transcript_events:
+        text += f"[{ev.get('start', 0):.1f}s - {ev.get('end', 0):.1f}s] "
+        text += f"Speaker: {ev.get('speaker_id', 'unknown')}: {ev.get('text', '')}\n"
+    return text
+
+
+def parse_scenes(raw: str) -> list[dict]:
+    """Extract the list of scene objects from a completion."""
+    raw = raw.strip()
+    if raw.startswith("```"):
+        raw = raw.split("\n", 1)[1].rsplit("```", 1)[0]
+
+    parsed = json.loads(raw)
+    # Handle {"scenes": [...]} wrapper (JSON mode returns root object)
+    if isinstance(parsed, dict):
+        # Look for array value in the object
+        for key in ("scenes", "events", "data"):
+            if key in parsed and isinstance(parsed[key], list):
+                parsed = parsed[key]
+                break
+        else:
+            # Single scene object
+            parsed = [parsed]
+    return parsed
+
+
+class ScenesArrayParser:
+    """Incremental parser for the scenes array of a streamed completion.
+
+    feed() takes the next piece of completion text and returns the array
+    elements (scene objects or code index rows) whose closing bracket it
+    contained. The array is the first one in the text, so both the
+    {"scenes": [...]} wrapper and a bare [...] work.
+    """
+
+    def __init__(self):
+        self._in_array = False
+        self._done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._element: list[str] = []
+
+    def feed(self, text: str) -> list:
+        elements = []
+        for ch in text:
+            if self._done:
+                break
+            if self._in_string:
+                if self._depth:
+                    self._element.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+                if self._depth:
+                    self._element.append(ch)
+            elif not self._in_array:
+                self._in_array = ch == "["
+            elif ch in "{[":
+                self._depth += 1
+                self._element.append(ch)
+            elif ch in "}]":
+                if not self._depth:
+                    # End of the scenes array
+                    self._done = True
+                    continue
+                self._depth -= 1
+                self._element.append(ch)
+                if not self._depth:
+                    elements.append(json.loads("".join(self._element)))
+                    self._element = []
+            elif self._depth:
+                self._element.append(ch)
+        return elements
+
 
 class SceneGenerator:
-    def __init__(self, model: str = "gpt-4", temperature: float = 0.3, max_tokens: int = 4096):
+    """Turn transcript segments into whitelisted scene events with an LLM.
+
+    With chunk_size > 0, transcripts longer than one chunk are split into
+    windows of chunk_size segments. Each window is sent with the
+    chunk_overlap segments before it as read-only context, and up to
+    concurrency windows are in flight at once through the async client.
+    Results are stitched back in transcript order before seq numbers are
+    assigned, so numbering does not depend on completion order.
+
+    With a cache (see talk2scene.llm_cache), each request is first looked
+    up by the hash of its body, and only misses reach the network. Cache
+    hits and misses are counted on monitor when one is given, along with
+    an "llm_request" latency histogram.
+
+    With encoding="codes", the model returns one row of per-category code
+    indices per segment instead of full scene objects, which are mapped
+    back to whitelist codes; the prompt and completion are both smaller.
+    Token usage is counted on monitor as llm_prompt_tokens and
+    llm_completion_tokens.
+
+    generate_stream() streams the completion and yields each scene as soon
+    as its object is complete (see ScenesArrayParser), instead of waiting
+    for the whole response.
+
+    Segments whose request fails get the neutral scene, or the scene picked
+    by fallback_engine (see talk2scene.rule_engine) when one is given.
+
+    The generator owns pooled API clients (see talk2scene.openai_client)
+    that are reused across calls; http overrides their pool size, timeouts
+    and retries. Call close() when done.
+    """
+
+    def __init__(
+        self,
+        model: str = "gpt-4",
+        temperature: float = 0.3,
+        max_tokens: int = 4096,
+        chunk_size: int = 0,
+        chunk_overlap: int = 2,
+        concurrency: int = 4,
+        cache: Optional["LLMCache"] = None,
+        monitor: Optional["PerformanceMonitor"] = None,
+        http: Optional[dict] = None,
+        encoding: str = "names",
+        fallback_engine: Optional["RuleEngine"] = None,
+    ):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown scene encoding: {encoding} (expected one of {', '.join(ENCODINGS)})")
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.concurrency = concurrency
+        self.cache = cache
+        self.monitor = monitor
+        self.http = http
+        self.encoding = encoding
+        self.fallback_engine = fallback_engine
         self._seq_idx = 0
+        self._client = None
+        self._async_client = None
+        self._async_loop = None
+        self._loop_thread = LoopThread()
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = make_client(self.http)
+        return self._client
+
+    def _get_async_client(self):
+        """The pooled async client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = make_async_client(self.http)
+            self._async_loop = loop
+        return self._async_client
+
+    def close(self):
+        """Close the pooled clients and the private event loop."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+        if self._async_client is not None:
+            try:
+                self._loop_thread.run(self._async_client.close())
+            except RuntimeError:
+                # Created on a caller's own loop, which may already be closed
+                pass
+            self._async_client = self._async_loop = None
+        self._loop_thread.close()
+
+    def _request_body(self, transcript_events: list[dict], context_events: Optional[list[dict]] = None) -> dict:
+        if context_events:
+            prompt_text = CONTEXT_HEADER + format_segments(context_events)
+            prompt_text += SEGMENTS_HEADER + format_segments(transcript_events)
+        else:
+            prompt_text = format_segments(transcript_events)
+
+        messages = [
+            {"role": "system", "content": system_prompt(get_whitelist(), self.encoding)},
+            {"role": "user", "content": prompt_text},
+        ]
+
+        request_body = {
+            "model": self.model,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "messages": messages,
+            "response_format": {"type": "json_object"},
+        }
+        logger.debug("LLM request:\n%s", json.dumps(request_body, indent=2, ensure_ascii=False))
+        return request_body
+
+    def _parse_response(self, resp, segments: list[dict], trim: bool = False) -> list[dict]:
+        """Scenes for segments from a completion.
+
+        With trim, scenes produced for leading context segments are dropped.
+        """
+        raw = resp.choices[0].message.content.strip()
+        usage = resp.usage
+        if usage and self.monitor is not None:
+            self.monitor.count("llm_prompt_tokens", usage.prompt_tokens or 0)
+            self.monitor.count("llm_completion_tokens", usage.completion_tokens or 0)
+        logger.debug(
+            "LLM response (model=%s, prompt_tokens=%s, completion_tokens=%s, total_tokens=%s):\n%s",
+            resp.model,
+            usage.prompt_tokens if usage else "?",
+            usage.completion_tokens if usage else "?",
+            usage.total_tokens if usage else "?",
+            raw,
+        )
+        scenes = parse_scenes(raw)
+        if trim and len(scenes) > len(segments):
+            # Scenes were produced for context segments too; those come first
+            scenes = scenes[-len(segments):]
+        if self.encoding == "codes":
+            scenes = self._decode_rows(scenes, segments)
+        return scenes
+
+    def _decode_rows(self, rows: list, segments: list[dict]) -> list[dict]:
+        """Map [sta, exp, act, bg, cg] index rows back to scene events.
+
+        Invalid indices are left for whitelist repair; segments without a
+        row get the fallback scene.
+        """
+        wl = get_whitelist()
+        scenes = []
+        for i, ev in enumerate(segments):
+            if i >= len(rows):
+                scenes.append(self._fallback_scene(ev))
+                continue
+            row = rows[i]
+            if isinstance(row, dict):
+                # The model answered with a full scene object anyway
+                scenes.append(row)
+                continue
+            scene = {
+                "speaker_id": ev.get("speaker_id", "unknown"),
+                "text": ev.get("text", ""),
+                "start": ev.get("start", 0),
+                "end": ev.get("end", 0),
+            }
+            for j, cat in enumerate(CATEGORIES):
+                codes = wl.get(cat, [])
+                idx = row[j] if j < len(row) else None
+                valid = isinstance(idx, int) and 0 <= idx < len(codes)
+                scene[cat.lower()] = codes[idx] if valid else None
+            scenes.append(scene)
+        return scenes
+
+    def _cached(self, request_body: dict) -> tuple[Optional[str], Optional[list[dict]]]:
+        """(cache key, cached scenes or None); (None, None) without a cache."""
+        if self.cache is None:
+            return None, None
+        from talk2scene.llm_cache import request_key
+
+        key = request_key(request_body)
+        scenes = self.cache.get(key)
+        if self.monitor is not None:
+            self.monitor.count("llm_cache_hits" if scenes is not None else "llm_cache_misses")
+        return key, scenes
+
+    def _store(self, key: Optional[str], scenes: list[dict]):
+        if key is not None:
+            self.cache.put(key, scenes)
+
+    def _number_and_validate(self, scenes: list[dict]) -> list[dict]:
+        compiled = get_compiled_whitelist()
+        for scene in scenes:
+            scene["type"] = "scene"
+            scene["seq"] = self._seq_idx
+            scene["wl_version"] = compiled.version
+            self._seq_idx += 1
+        result = validate_scene_events(scenes, compiled)
+
+        logger.debug("Validated %d scene events", len(result))
+        return result
 
     def generate(self, transcript_events: list[dict]) -> list[dict]:
+        if self.chunk_size > 0 and len(transcript_events) > self.chunk_size:
+            return self._loop_thread.run(self.generate_async(transcript_events))
+
         try:
-            import openai
-
-            wl = get_whitelist()
-            wl_text = json.dumps(wl, indent=2)
-
-            prompt_text = ""
-            for ev in transcript_events:
-                prompt_text += f"[{ev.get('start', 0):.1f}s - {ev.get('end', 0):.1f}s] "
-                prompt_text += f"Speaker: {ev.get('speaker_id', 'unknown')}: {ev.get('text', '')}\n"
-
-            messages = [
-                {"role": "system", "content": SYSTEM_PROMPT.format(whitelist=wl_text)},
-                {"role": "user", "content": prompt_text},
-            ]
-
-            request_body = {
-                "model": self.model,
-                "temperature": self.temperature,
-                "max_tokens": self.max_tokens,
-                "messages": messages,
-                "response_format": {"type": "json_object"},
-            }
-            logger.debug("LLM request:\n%s", json.dumps(request_body, indent=2, ensure_ascii=False))
-
-            client = openai.OpenAI()
-            resp = client.chat.completions.create(**request_body)
-
-            raw = resp.choices[0].message.content.strip()
-            usage = resp.usage
-            logger.debug(
-                "LLM response (model=%s, prompt_tokens=%s, completion_tokens=%s, total_tokens=%s):\n%s",
-                resp.model,
-                usage.prompt_tokens if usage else "?",
-                usage.completion_tokens if usage else "?",
-                usage.total_tokens if usage else "?",
-                raw,
-            )
-
-            if raw.startswith("```"):
-                raw = raw.split("\n", 1)[1].rsplit("```", 1)[0]
-
-            parsed = json.loads(raw)
-            # Handle {"scenes": [...]} wrapper (JSON mode returns root object)
-            if isinstance(parsed, dict):
-                # Look for array value in the object
-                for key in ("scenes", "events", "data"):
-                    if key in parsed and isinstance(parsed[key], list):
-                        parsed = parsed[key]
-                        break
-                else:
-                    # Single scene object
-                    parsed = [parsed]
-            scenes = parsed
-
-            result = []
-            for scene in scenes:
-                scene["type"] = "scene"
-                scene["seq"] = self._seq_idx
-                self._seq_idx += 1
-                validated = validate_scene_event(scene)
-                result.append(validated)
-
-            logger.debug("Validated %d scene events", len(result))
-            return result
+            request_body = self._request_body(transcript_events)
+            key, scenes = self._cached(request_body)
+            if scenes is None:
+                with timed_call(self.monitor, "llm_request"):
+                    resp = self._get_client().chat.completions.create(**request_body)
+                scenes = self._parse_response(resp, transcript_events)
+                self._store(key, scenes)
+            return self._number_and_validate(scenes)
 
         except Exception as e:
             logger.error(f"Scene generation failed: {e}")
             return self._fallback_scenes(transcript_events)
 
+    def generate_stream(self, transcript_events: list[dict]) -> Iterator[dict]:
+        """Yield validated scenes one by one while the completion streams in.
+
+        Produces the same scenes as generate(). Chunked transcripts are
+        generated concurrently as usual and yielded once complete.
+        """
+        if self.chunk_size > 0 and len(transcript_events) > self.chunk_size:
+            yield from self.generate(transcript_events)
+            return
+
+        emitted = 0
+        try:
+            request_body = self._request_body(transcript_events)
+            key, scenes = self._cached(request_body)
+            if scenes is not None:
+                yield from self._number_and_validate(scenes)
+                return
+
+            scenes = []
+            parser = ScenesArrayParser()
+            with timed_call(self.monitor, "llm_request"):
+                stream = self._get_client().chat.completions.create(
+                    **request_body, stream=True, stream_options={"include_usage": True}
+                )
+                for chunk in stream:
+                    if chunk.usage and self.monitor is not None:
+                        self.monitor.count("llm_prompt_tokens", chunk.usage.prompt_tokens or 0)
+                        self.monitor.count("llm_completion_tokens", chunk.usage.completion_tokens or 0)
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    for element in parser.feed(chunk.choices[0].delta.content):
+                        if emitted >= len(transcript_events):
+                            continue
+                        if self.encoding == "codes":
+                            element = self._decode_rows([element], [transcript_events[emitted]])[0]
+                        scenes.append(dict(element))
+                        emitted += 1
+                        yield from self._number_and_validate([element])
+            if emitted < len(transcript_events):
+                # Truncated or short response: the rest fall back, but the
+                # incomplete result is not cached
+                logger.warning(f"Streamed {emitted} scenes for {len(transcript_events)} segments")
+                yield from self._fallback_scenes(transcript_events[emitted:])
+            else:
+                self._store(key, scenes)
+
+        except Exception as e:
+            logger.error(f"Scene generation failed: {e}")
+            yield from self._fallback_scenes(transcript_events[emitted:])
+
+    def _chunks(self, transcript_events: list[dict]) -> list[tuple[list[dict], list[dict]]]:
+        """Split into (context, chunk) windows of chunk_size segments."""
+        size = max(1, self.chunk_size)
+        windows = []
+        for i in range(0, len(transcript_events), size):
+            context = transcript_events[max(0, i - self.chunk_overlap):i] if self.chunk_overlap > 0 else []
+            windows.append((context, transcript_events[i:i + size]))
+        return windows
+
+    async def _generate_chunk(self, client, semaphore: asyncio.Semaphore, context: list[dict], chunk: list[dict]):
+        async with semaphore:
+            try:
+                request_body = self._request_body(chunk, context)
+                key, scenes = self._cached(request_body)
+                if scenes is None:
+                    with timed_call(self.monitor, "llm_request"):
+                        resp = await client.chat.completions.create(**request_body)
+                    scenes = self._parse_response(resp, chunk, trim=True)
+                    self._store(key, scenes)
+                return scenes
+            except Exception as e:
+                logger.error(f"Scene generation failed for chunk at {chunk[0].get('start', 0):.1f}s: {e}")
+                return [self._fallback_scene(ev) for ev in chunk]
+
+    async def generate_async(self, transcript_events: list[dict]) -> list[dict]:
+        """Generate scenes for all chunks concurrently, returned in transcript order."""
+        windows = self._chunks(transcript_events)
+        logger.info(
+            f"Generating scenes for {len(transcript_events)} segments in {len(windows)} chunks "
+            f"(concurrency {self.concurrency})"
+        )
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+        client = self._get_async_client()
+        chunk_scenes = await asyncio.gather(
+            *(self._generate_chunk(client, semaphore, context, chunk) for context, chunk in windows)
+        )
+
+        # gather keeps submission order, so seq follows the transcript
+        scenes = [scene for chunk in chunk_scenes for scene in chunk]
+        return self._number_and_validate(scenes)
+
+    def _fallback_scene(self, ev: dict) -> dict:
+        if self.fallback_engine is not None:
+            return self.fallback_engine.scene_for(ev)
+        return {
+            "type": "scene",
+            "speaker_id": ev.get("speaker_id", "unknown"),
+            "text": ev.get("text", ""),
+            "sta": "STA_Stand_Front",
+            "exp": "EXP_Neutral",
+            "act": "ACT_None",
+            "bg": "BG_Lab_Modern",
+            "cg": "CG_None",
+            "start": ev.get("start", 0),
+            "end": ev.get("end", 0),
+        }
+
     def _fallback_scenes(self, transcript_events: list[dict]) -> list[dict]:
         result = []
+        compiled = get_compiled_whitelist()
         for ev in transcript_events:
-            scene = {
-                "type": "scene",
-                "seq": self._seq_idx,
-                "speaker_id": ev.get("speaker_id", "unknown"),
-                "text": ev.get("text", ""),
-                "sta": "STA_Stand_Front",
-                "exp": "EXP_Neutral",
-                "act": "ACT_None",
-                "bg": "BG_Lab_Modern",
-                "cg": "CG_None",
-                "start": ev.get("start", 0),
-                "end": ev.get("end", 0),
-            }
+            scene = {"type": "scene", "seq": self._seq_idx, "wl_version": compiled.version, **self._fallback_scene(ev)}
             self._seq_idx += 1
             result.append(scene)
-        return result
+        return validate_scene_events(result, compiled)
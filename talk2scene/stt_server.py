@@ -0,0 +1,170 @@
+"""Long-lived local transcription worker.
+
+Loading a Whisper model takes seconds and hundreds of MB, and every
+Transcriber loads its own. `mode=stt-server` loads the model once and
+serves transcription requests over a Unix socket; with
+model.whisper.server.enabled, batch and stream runs connect to it instead
+of loading a model themselves, and fall back to a local Transcriber when
+no server is listening.
+
+The protocol is one JSON object per line each way:
+
+    {"op": "ping"}
+    {"op": "transcribe_file", "path": "/abs/audio.wav"}
+    {"op": "transcribe_chunk", "audio": "<base64 PCM16>", "sample_rate": 16000}
+
+answered with {"ok": true, ...} ({"events": [...]} for transcriptions) or
+{"ok": false, "error": "..."}. Files are passed by path, so client and
+server must share a filesystem, which a Unix socket implies. Requests are
+served one at a time per model; connections are kept open by the client.
+"""
+
+import base64
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from talk2scene.performance import PerformanceMonitor
+    from talk2scene.transcription import Transcriber
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = "/tmp/talk2scene-stt.sock"
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "STTServer"
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                reply = self.server.dispatch(json.loads(line))
+            except Exception as e:
+                reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(reply, ensure_ascii=False).encode() + b"\n")
+            self.wfile.flush()
+
+
+class STTServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serves a loaded Transcriber to local clients over a Unix socket."""
+
+    daemon_threads = True
+
+    def __init__(self, transcriber: "Transcriber", socket_path: str = DEFAULT_SOCKET, info: Optional[dict] = None):
+        if os.path.exists(socket_path):
+            if _listening(socket_path):
+                raise RuntimeError(f"An STT server is already listening on {socket_path}")
+            os.unlink(socket_path)  # Left behind by a server that died
+        self.transcriber = transcriber
+        self.info = dict(info or {})
+        self.requests = 0
+        # Whisper models are not safe to call from several threads at once
+        self._model_lock = threading.Lock()
+        super().__init__(socket_path, _Handler)
+
+    def dispatch(self, request: dict) -> dict:
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True, "requests": self.requests, **self.info}
+        if op == "transcribe_file":
+            path = request["path"]
+            with self._model_lock:
+                events = self.transcriber.transcribe_file(path)
+        elif op == "transcribe_chunk":
+            audio = base64.b64decode(request["audio"])
+            with self._model_lock:
+                events = self.transcriber.transcribe_chunk(audio, request.get("sample_rate", 16000))
+        else:
+            return {"ok": False, "error": f"Unknown op: {op}"}
+        self.requests += 1
+        return {"ok": True, "events": events}
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def _listening(socket_path: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        try:
+            s.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+class RemoteTranscriber:
+    """Drop-in for Transcriber that forwards requests to an STTServer.
+
+    Connecting raises OSError when no server is listening. server_info is
+    the server's ping reply (model, load_s, requests served).
+    """
+
+    def __init__(
+        self,
+        socket_path: str = DEFAULT_SOCKET,
+        timeout_s: Optional[float] = 600,
+        monitor: Optional["PerformanceMonitor"] = None,
+    ):
+        self.socket_path = socket_path
+        self.timeout_s = timeout_s
+        self.monitor = monitor
+        self._sock: Optional[socket.socket] = None
+        self._file = None
+        self._connect()
+        self.server_info = self._call({"op": "ping"})
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout_s)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+        self._file = sock.makefile("rwb")
+
+    def _call(self, request: dict) -> dict:
+        if self._sock is None:
+            self._connect()
+        started = time.time()
+        try:
+            self._file.write(json.dumps(request, ensure_ascii=False).encode() + b"\n")
+            self._file.flush()
+            line = self._file.readline()
+        except OSError:
+            self.close()
+            raise
+        if not line:
+            self.close()
+            raise ConnectionError(f"STT server on {self.socket_path} closed the connection")
+        if self.monitor is not None and request["op"] != "ping":
+            self.monitor.observe("stt_server_request", time.time() - started)
+        reply = json.loads(line)
+        if not reply.get("ok"):
+            raise RuntimeError(f"STT server error: {reply.get('error')}")
+        return reply
+
+    def transcribe_file(self, audio_path: str) -> list[dict]:
+        return self._call({"op": "transcribe_file", "path": os.path.abspath(audio_path)})["events"]
+
+    def transcribe_chunk(self, audio_bytes: bytes, sample_rate: int = 16000) -> list[dict]:
+        audio = base64.b64encode(audio_bytes).decode("ascii")
+        return self._call({"op": "transcribe_chunk", "audio": audio, "sample_rate": sample_rate})["events"]
+
+    def close(self):
+        if self._sock is not None:
+            self._file.close()
+            self._sock.close()
+            self._sock = None
+            self._file = None
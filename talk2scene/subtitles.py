@@ -0,0 +1,139 @@
+"""Subtitle rendering for video frames.
+
+Dialogue repeats the same lines and the font never changes within a run,
+so fonts are loaded once per process and each subtitle is rendered once
+into a ready-to-paste RGB patch (black box plus white text), kept in an LRU
+keyed by (text, font, canvas width). Burning a cached subtitle into a frame
+is a single paste.
+
+Lines wider than the canvas are wrapped: at spaces for space-separated
+text, and between any two characters of CJK text, which has no spaces.
+"""
+
+import functools
+import unicodedata
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image, ImageDraw, ImageFont
+
+SUBTITLE_FONTS = [
+    "/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+]
+
+# Box padding, gap between wrapped lines and distance of the box from the
+# bottom of the canvas, in pixels
+PAD = 10
+LINE_SPACING = 4
+BOTTOM_MARGIN = 40
+
+
+def find_subtitle_font() -> Optional[str]:
+    """Return the path string of the first available subtitle font, or None."""
+    for fp in SUBTITLE_FONTS:
+        if Path(fp).exists():
+            return fp
+    return None
+
+
+@functools.lru_cache(maxsize=8)
+def load_font(font_path: Optional[str], font_size: int):
+    """Load a subtitle font once per process (PIL's default font when font_path is None)."""
+    if font_path:
+        return ImageFont.truetype(font_path, font_size)
+    return ImageFont.load_default()
+
+
+def _is_wide(ch: str) -> bool:
+    """CJK and other full-width characters, which may wrap anywhere."""
+    return unicodedata.east_asian_width(ch) in ("W", "F")
+
+
+def _tokens(text: str) -> list[str]:
+    """Split text into wrap units: words, single wide characters and spaces."""
+    tokens = []
+    word = ""
+    for ch in text:
+        if ch.isspace() or _is_wide(ch):
+            if word:
+                tokens.append(word)
+                word = ""
+            tokens.append(ch)
+        else:
+            word += ch
+    if word:
+        tokens.append(word)
+    return tokens
+
+
+def wrap_text(text: str, font, max_width: int) -> list[str]:
+    """Greedily wrap text into lines no wider than max_width pixels.
+
+    A word wider than max_width on its own is broken between characters.
+    """
+    lines = []
+    line = ""
+    for token in _tokens(text):
+        if token == "\n":
+            lines.append(line.rstrip())
+            line = ""
+            continue
+        candidate = line + token
+        if font.getlength(candidate) <= max_width or not line.strip():
+            line = candidate.lstrip() if not line.strip() else candidate
+        else:
+            lines.append(line.rstrip())
+            line = token.lstrip()
+        # Break an over-long word between characters
+        while font.getlength(line) > max_width and len(line) > 1:
+            cut = len(line) - 1
+            while cut > 1 and font.getlength(line[:cut]) > max_width:
+                cut -= 1
+            lines.append(line[:cut])
+            line = line[cut:]
+    if line.strip():
+        lines.append(line.rstrip())
+    return lines
+
+
+@functools.lru_cache(maxsize=256)
+def subtitle_patch(text: str, font_path: Optional[str], font_size: int, canvas_width: int) -> Image.Image:
+    """Render text as an opaque RGB patch: wrapped white lines on a black box.
+
+    The result is shared between frames and must not be modified.
+    """
+    font = load_font(font_path, font_size)
+    lines = wrap_text(text, font, canvas_width - 4 * PAD) or [""]
+
+    probe = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+    boxes = [probe.textbbox((0, 0), line, font=font) for line in lines]
+    # Shared top and height, so baselines stay evenly spaced between lines
+    top = min(b[1] for b in boxes)
+    line_height = max(b[3] for b in boxes) - top
+    width = max(b[2] - b[0] for b in boxes) + 2 * PAD
+    height = len(lines) * line_height + (len(lines) - 1) * LINE_SPACING + 2 * PAD
+
+    patch = Image.new("RGB", (width, height), (0, 0, 0))
+    draw = ImageDraw.Draw(patch)
+    for i, (line, box) in enumerate(zip(lines, boxes)):
+        # Center each line; offset by the bbox so glyphs start inside the padding
+        x = (width - (box[2] - box[0])) // 2 - box[0]
+        y = PAD + i * (line_height + LINE_SPACING) - top
+        draw.text((x, y), line, fill=(255, 255, 255), font=font)
+    return patch
+
+
+def burn_subtitle(img: Image.Image, text: str, font_path: Optional[str], font_size: int):
+    """Paste the subtitle for text, centered near the bottom of img (in place).
+
+    Extra wrapped lines grow the box upwards.
+    """
+    patch = subtitle_patch(text, font_path, font_size, img.width)
+    x = (img.width - patch.width) // 2
+    y = max(0, img.height - BOTTOM_MARGIN - patch.height)
+    img.paste(patch, (x, y))
@@ -1,19 +1,32 @@
 """Whisper-based transcription with streaming support."""
 
+import contextlib
 import json
 import logging
-import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from talk2scene.performance import PerformanceMonitor
 
 logger = logging.getLogger(__name__)
 
 
 class Transcriber:
-    def __init__(self, model_size: str = "base", language: Optional[str] = None, device: str = "cpu"):
+    def __init__(
+        self,
+        model_size: str = "base",
+        language: Optional[str] = None,
+        device: str = "cpu",
+        http: Optional[dict] = None,
+        monitor: Optional["PerformanceMonitor"] = None,
+    ):
         self.language = language
         self.model = None
+        self.http = http
+        self.monitor = monitor
         self._use_api = False
+        self._client = None
 
         try:
             import whisper
@@ -28,12 +41,13 @@ class Transcriber:
             return self._transcribe_api(audio_path)
         return self._transcribe_local(audio_path)
 
-    def _transcribe_local(self, audio_path: str) -> list[dict]:
+    def _transcribe_local(self, audio) -> list[dict]:
+        """audio: a file path (decoded by Whisper through ffmpeg) or a float32 array."""
         opts = {"word_timestamps": True}
         if self.language:
             opts["language"] = self.language
 
-        result = self.model.transcribe(audio_path, **opts)
+        result = self.model.transcribe(audio, **opts)
         events = []
         for seg in result.get("segments", []):
             events.append({
@@ -45,20 +59,29 @@ class Transcriber:
             })
         return events
 
-    def _transcribe_api(self, audio_path: str) -> list[dict]:
-        import openai
+    def _transcribe_api(self, audio) -> list[dict]:
+        """audio: a file path or an in-memory (filename, bytes, content type) upload."""
+        from talk2scene.openai_client import make_client, timed_call
 
-        client = openai.OpenAI()
-        with open(audio_path, "rb") as f:
-            result = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=f,
-                response_format="verbose_json",
-                timestamp_granularities=["segment"],
-            )
+        # One pooled client for the transcriber's lifetime: stream mode calls
+        # this once per rolling window
+        if self._client is None:
+            self._client = make_client(self.http)
+        with contextlib.ExitStack() as stack:
+            f = stack.enter_context(open(audio, "rb")) if isinstance(audio, str) else audio
+            with timed_call(self.monitor, "stt_api_request"):
+                result = self._client.audio.transcriptions.create(
+                    model="whisper-1",
+                    file=f,
+                    response_format="verbose_json",
+                    timestamp_granularities=["segment"],
+                )
 
         events = []
-        for seg in getattr(result, "segments", []):
+        for seg in getattr(result, "segments", None) or []:
+            # Segment models in current SDKs, dicts in older ones
+            if not isinstance(seg, dict):
+                seg = seg.model_dump()
             events.append({
                 "type": "transcript",
                 "start": seg.get("start", 0),
@@ -79,15 +102,149 @@ class Transcriber:
 
         return events
 
+    def close(self):
+        """Close the pooled API client, if one was opened."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
     def transcribe_chunk(self, audio_bytes: bytes, sample_rate: int = 16000) -> list[dict]:
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=True) as tmp:
-            import wave
-            with wave.open(tmp.name, "wb") as wf:
-                wf.setnchannels(1)
-                wf.setsampwidth(2)
-                wf.setframerate(sample_rate)
-                wf.writeframes(audio_bytes)
-            return self.transcribe_file(tmp.name)
+        """Transcribe mono 16-bit PCM in memory, without a temporary WAV file."""
+        if self._use_api:
+            from talk2scene.audio import chunks_to_wav
+
+            return self._transcribe_api(("chunk.wav", chunks_to_wav([audio_bytes], sample_rate), "audio/wav"))
+        from talk2scene.audio import pcm_to_float32
+
+        return self._transcribe_local(pcm_to_float32(audio_bytes, sample_rate))
+
+
+def transcribe_wav_range(transcriber, wav_path: str, start: int, end: int) -> list[dict]:
+    """Transcribe frames [start, end) of a mono 16-bit WAV, with timestamps in the whole file."""
+    import wave
+
+    with wave.open(wav_path, "rb") as wf:
+        sample_rate = wf.getframerate()
+        wf.setpos(start)
+        pcm = wf.readframes(end - start)
+    offset = start / sample_rate
+    events = transcriber.transcribe_chunk(pcm, sample_rate)
+    for ev in events:
+        ev["start"] = round(ev["start"] + offset, 3)
+        ev["end"] = round(ev["end"] + offset, 3)
+    return events
+
+
+class IncrementalTranscriber:
+    """Stream transcription that decodes only the audio not yet committed.
+
+    PCM16 mono chunks are fed in as they arrive. Each feed decodes the
+    uncommitted tail of the stream plus overlap_s seconds of context before
+    it, instead of the whole rolling window. Segments ending more than
+    settle_s before the end of the received audio are final: they are
+    emitted once, with timestamps measured from the start of the stream,
+    and advance the commit watermark. Segments re-decoded in the overlap
+    are recognised by timestamp and dropped. When no segment settles within
+    max_window_s of audio, all but the last are committed anyway.
+    """
+
+    def __init__(
+        self,
+        transcriber,
+        sample_rate: int = 16000,
+        max_window_s: float = 30.0,
+        overlap_s: float = 1.0,
+        settle_s: float = 1.0,
+        monitor: Optional["PerformanceMonitor"] = None,
+    ):
+        self.transcriber = transcriber
+        self.sample_rate = sample_rate
+        self.max_window_s = max_window_s
+        self.overlap_s = overlap_s
+        self.settle_s = settle_s
+        self.monitor = monitor
+        self._bytes_per_s = sample_rate * 2
+        self._buffer = bytearray()
+        # Stream time of the first buffered sample
+        self._buffer_start = 0.0
+        # Stream time up to which segments have been emitted
+        self.watermark = 0.0
+
+    @property
+    def stream_end(self) -> float:
+        return self._buffer_start + len(self._buffer) / self._bytes_per_s
+
+    def feed(self, audio_bytes: bytes, start_s: Optional[float] = None, final: bool = False) -> list[dict]:
+        """Add a chunk; returns the segments that became final.
+
+        start_s is the chunk's stream time when audio before it was left
+        out (silence dropped by a SpeechGate); what is buffered is then
+        committed first, since it can no longer continue. With final, the
+        chunk ends a speech segment and everything is committed in a single
+        decode, as by a flush().
+        """
+        committed = []
+        if start_s is not None and start_s > self.stream_end + 1e-6:
+            committed = self.flush()
+            self._buffer.clear()
+            self._buffer_start = self.watermark = start_s
+        self._buffer += audio_bytes
+        if self.monitor is not None:
+            self.monitor.count("stt_audio_ms", round(len(audio_bytes) * 1000 / self._bytes_per_s))
+        return committed + (self.flush() if final else self._decode(final=False))
+
+    def flush(self) -> list[dict]:
+        """Commit everything not yet committed (end of stream or speech segment)."""
+        if self.watermark >= self.stream_end:
+            return []
+        return self._decode(final=True)
+
+    def _decode(self, final: bool) -> list[dict]:
+        end = self.stream_end
+        if self.monitor is not None:
+            self.monitor.count("stt_decoded_ms", round(len(self._buffer) * 1000 / self._bytes_per_s))
+        segments = self.transcriber.transcribe_chunk(bytes(self._buffer), self.sample_rate)
+
+        fresh = []
+        for seg in segments:
+            start = self._buffer_start + seg.get("start", 0)
+            stop = self._buffer_start + seg.get("end", 0)
+            # Centred before the watermark: emitted by an earlier decode
+            if not seg.get("text", "").strip() or (start + stop) / 2 < self.watermark:
+                continue
+            fresh.append({**seg, "start": round(max(start, self.watermark), 3), "end": round(stop, 3)})
+
+        if final:
+            settled = len(fresh)
+        else:
+            settled = 0
+            while settled < len(fresh) and fresh[settled]["end"] <= end - self.settle_s:
+                settled += 1
+            if not settled and fresh and end - self._buffer_start >= self.max_window_s:
+                settled = max(1, len(fresh) - 1)
+        committed = fresh[:settled]
+
+        if final:
+            self.watermark = end
+        elif committed:
+            self.watermark = max(self.watermark, committed[-1]["end"])
+        elif not fresh:
+            # Nothing spoken, apart from perhaps a word starting in the tail
+            self.watermark = max(self.watermark, end - self.settle_s)
+        self._trim(max(self.watermark - self.overlap_s, end - self.max_window_s))
+        if self.monitor is not None:
+            self.monitor.count("stt_segments_committed", len(committed))
+        return committed
+
+    def _trim(self, new_start: float):
+        """Drop buffered audio before stream time new_start."""
+        offset = int((new_start - self._buffer_start) * self.sample_rate) * 2
+        if offset <= 0:
+            return
+        offset = min(offset, len(self._buffer))
+        del self._buffer[:offset]
+        self._buffer_start += offset / self._bytes_per_s
+        self.watermark = max(self.watermark, self._buffer_start)
 
 
 def append_transcript_events(events: list[dict], output_path: Path):
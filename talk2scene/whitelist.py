@@ -1,47 +1,256 @@
-"""Whitelist validation for scene component codes."""
+"""Whitelist validation for scene component codes.
 
-from pathlib import Path
-from typing import Optional
+The loaded YAML is compiled once into a CompiledWhitelist: a frozenset of
+codes per category for O(1) membership, a code -> category index, and a
+repair index. A code that is not whitelisted is repaired to the closest
+valid code of its category (case and separator differences, a partial
+name such as EXP_smile, or a typo), and only to the category's first code
+when nothing is close. Repairs are memoised.
+
+Long-running processes pick up edits to the YAML without a restart:
+load_whitelist(path, reload_s) installs a WhitelistRegistry that checks
+the file's mtime at most every reload_s seconds (on the next lookup) and
+swaps in a newly compiled version. Every compiled version carries an
+increasing version number, which scene generators stamp on the events they
+produce as wl_version. Callbacks registered with on_whitelist_change() are
+told which categories changed, so dependent caches can drop only what is
+affected.
+"""
+
+import difflib
+import logging
+import os
+import re
+import threading
+import time
+from typing import Callable, Optional
 
 import yaml
 
+logger = logging.getLogger(__name__)
 
 _whitelist: Optional[dict] = None
+_compiled: Optional["CompiledWhitelist"] = None
+_registry: Optional["WhitelistRegistry"] = None
+_version = 0
+_swap_lock = threading.RLock()
+# Called as callback(old, new, changed categories) after each swap
+_subscribers: list[Callable] = []
 
+# Scene event fields that hold component codes
+CATEGORIES = ("sta", "exp", "act", "bg", "cg")
 
-def load_whitelist(path: str = "conf/whitelist.yaml") -> dict:
-    global _whitelist
-    with open(path, "r") as f:
-        _whitelist = yaml.safe_load(f)
-    return _whitelist
+# Minimum difflib similarity for a typo repair
+_FUZZY_CUTOFF = 0.75
+# Memoised repairs kept per whitelist; LLM output repeats the same mistakes
+_REPAIR_ENTRIES = 4096
 
+_CAMEL = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+_SEPARATORS = re.compile(r"[^A-Za-z0-9]+")
 
-def get_whitelist() -> dict:
+
+def _tokens(code: str, category: str) -> tuple[str, ...]:
+    """Lowercase name tokens of code without its category prefix."""
+    parts = _SEPARATORS.split(_CAMEL.sub("_", code).lower())
+    if parts and parts[0] == category.lower():
+        parts = parts[1:]
+    return tuple(p for p in parts if p)
+
+
+class CompiledWhitelist:
+    """Immutable lookup structures built from a loaded whitelist dict."""
+
+    def __init__(self, source: dict, version: int = 0):
+        self.source = source
+        self.version = version
+        self.codes = {cat: tuple(codes or ()) for cat, codes in source.items()}
+        self.sets = {cat: frozenset(codes) for cat, codes in self.codes.items()}
+        self.category_of = {code: cat for cat, codes in self.codes.items() for code in codes}
+        # (event field, category, valid codes) for checking scene events
+        self.fields = tuple((cat, cat.upper(), self.sets.get(cat.upper(), frozenset())) for cat in CATEGORIES)
+        # Per category: (code, name tokens, joined name) in whitelist order
+        self._names = {
+            cat: [(code, _tokens(code, cat), "".join(_tokens(code, cat))) for code in codes]
+            for cat, codes in self.codes.items()
+        }
+        self._repairs: dict[tuple[str, str], str] = {}
+
+    def is_valid(self, category: str, code) -> bool:
+        return isinstance(code, str) and code in self.sets.get(category, ())
+
+    def repair(self, category: str, code) -> str:
+        """code if valid, else the closest code of category (its first when none is close)."""
+        valid = self.sets.get(category)
+        if valid and isinstance(code, str) and code in valid:
+            return code
+        if not valid:
+            raise ValueError(f"No whitelist entries for category {category}")
+        key = (category, code if isinstance(code, str) else repr(code))
+        repaired = self._repairs.get(key)
+        if repaired is None:
+            repaired = self._closest(category, code) if isinstance(code, str) else None
+            repaired = repaired or self.codes[category][0]
+            if len(self._repairs) >= _REPAIR_ENTRIES:
+                self._repairs.clear()
+            self._repairs[key] = repaired
+        return repaired
+
+    def _closest(self, category: str, code: str) -> Optional[str]:
+        tokens = _tokens(code, category)
+        if not tokens:
+            return None
+        names = self._names[category]
+        joined = "".join(tokens)
+        # Same name up to case and separators: exp_smile_eyes_closed
+        for candidate, _, name in names:
+            if name == joined:
+                return candidate
+        # Partial name: EXP_smile -> EXP_Smile_EyesClosed, CG_Pandora -> CG_PandorasTech
+        for candidate, candidate_tokens, _ in names:
+            if all(any(ct.startswith(t) for ct in candidate_tokens) for t in tokens):
+                return candidate
+        # Typo: EXP_Thinkng -> EXP_Thinking
+        matches = difflib.get_close_matches(joined, [name for _, _, name in names], n=1, cutoff=_FUZZY_CUTOFF)
+        if matches:
+            return next(candidate for candidate, _, name in names if name == matches[0])
+        return None
+
+
+def changed_categories(old: Optional[CompiledWhitelist], new: CompiledWhitelist) -> frozenset[str]:
+    """Categories whose codes differ between two versions (all of new's when old is None)."""
+    if old is None:
+        return frozenset(new.codes)
+    return frozenset(
+        cat for cat in set(old.codes) | set(new.codes) if old.codes.get(cat) != new.codes.get(cat)
+    )
+
+
+def on_whitelist_change(callback: Callable[[Optional[CompiledWhitelist], CompiledWhitelist, frozenset], None]):
+    """Register callback(old, new, changed categories) for every later swap that changes codes."""
+    _subscribers.append(callback)
+
+
+def remove_whitelist_listener(callback: Callable):
+    if callback in _subscribers:
+        _subscribers.remove(callback)
+
+
+def _swap(source: dict) -> CompiledWhitelist:
+    """Compile source as the next version and make it current (swap lock held)."""
+    global _whitelist, _compiled, _version
+    old = _compiled
+    _version += 1
+    new = CompiledWhitelist(source, _version)
+    # A single reference assignment: readers see the old or the new version
+    _compiled = new
+    _whitelist = source
+    changed = changed_categories(old, new)
+    if old is not None and changed:
+        logger.info(f"Whitelist v{new.version} loaded, changed: {', '.join(sorted(changed))}")
+        for callback in list(_subscribers):
+            try:
+                callback(old, new, changed)
+            except Exception as e:
+                logger.error(f"Whitelist change listener failed: {e}")
+    return new
+
+
+class WhitelistRegistry:
+    """Watches a whitelist YAML file and swaps in new versions as it changes."""
+
+    def __init__(self, path: str, reload_s: float = 0):
+        self.path = path
+        self.reload_s = reload_s
+        self._mtime_ns: Optional[int] = None
+        self._checked_at = 0.0
+
+    def load(self) -> CompiledWhitelist:
+        """Read and swap in the file as it is now (swap lock held)."""
+        mtime_ns = os.stat(self.path).st_mtime_ns
+        with open(self.path, "r") as f:
+            source = yaml.safe_load(f)
+        self._mtime_ns = mtime_ns
+        self._checked_at = time.monotonic()
+        return _swap(source)
+
+    def maybe_reload(self) -> bool:
+        """Reload if watching, due for a check, and the file changed. Returns whether it did."""
+        if self.reload_s <= 0 or time.monotonic() - self._checked_at < self.reload_s:
+            return False
+        with _swap_lock:
+            if time.monotonic() - self._checked_at < self.reload_s:
+                return False
+            self._checked_at = time.monotonic()
+            try:
+                if os.stat(self.path).st_mtime_ns == self._mtime_ns:
+                    return False
+                self.load()
+            except (OSError, yaml.YAMLError) as e:
+                # Half-written or briefly missing file: keep the current version
+                logger.warning(f"Whitelist reload from {self.path} failed, keeping v{_version}: {e}")
+                return False
+            return True
+
+
+def load_whitelist(path: str = "conf/whitelist.yaml", reload_s: float = 0) -> dict:
+    """Load path as the current whitelist; with reload_s > 0, watch it for changes."""
+    global _registry
+    with _swap_lock:
+        _registry = WhitelistRegistry(path, reload_s)
+        _registry.load()
+        return _whitelist
+
+
+def get_compiled_whitelist() -> CompiledWhitelist:
+    """The current compiled whitelist, reloaded or rebuilt when its source changed."""
     if _whitelist is None:
-        return load_whitelist()
-    return _whitelist
+        load_whitelist()
+    elif _registry is not None:
+        _registry.maybe_reload()
+    compiled = _compiled
+    if compiled is None or compiled.source is not _whitelist:
+        # _whitelist was replaced directly
+        with _swap_lock:
+            if _compiled is None or _compiled.source is not _whitelist:
+                _swap(_whitelist)
+            compiled = _compiled
+    return compiled
+
+
+def get_whitelist() -> dict:
+    return get_compiled_whitelist().source
 
 
 def validate_code(category: str, code: str) -> bool:
-    wl = get_whitelist()
-    return code in wl.get(category, [])
+    return get_compiled_whitelist().is_valid(category, code)
 
 
 def repair_code(category: str, code: str) -> str:
-    wl = get_whitelist()
-    codes = wl.get(category, [])
-    if code in codes:
-        return code
-    # Return default (first) code for the category
-    if codes:
-        return codes[0]
-    raise ValueError(f"No whitelist entries for category {category}")
+    return get_compiled_whitelist().repair(category, code)
 
 
 def validate_scene_event(event: dict) -> dict:
-    repaired = dict(event)
-    for cat in ["sta", "exp", "act", "bg", "cg"]:
-        key = cat.upper()
-        if cat in repaired:
-            repaired[cat] = repair_code(key, repaired[cat])
-    return repaired
+    """A copy of event with every component code whitelisted."""
+    return validate_scene_events([dict(event)])[0]
+
+
+def validate_scene_events(events: list[dict], compiled: Optional[CompiledWhitelist] = None) -> list[dict]:
+    """Whitelist the component codes of many events at once.
+
+    Events that are already valid are returned as they are; only events
+    that need a repair are copied. compiled pins the whitelist version to use.
+    """
+    compiled = compiled or get_compiled_whitelist()
+    result = []
+    for event in events:
+        repaired = event
+        for cat, category, valid in compiled.fields:
+            if cat not in event:
+                continue
+            code = event[cat]
+            if not isinstance(code, str) or code not in valid:
+                if repaired is event:
+                    repaired = dict(event)
+                repaired[cat] = compiled.repair(category, code)
+        result.append(repaired)
+    return result
@@ -0,0 +1,171 @@
+"""Shared fixtures: fresh render caches and a local stand-in for the OpenAI chat completions API."""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from talk2scene.render_cache import configure_layer_cache, configure_prefix_cache, set_layer_source
+
+ASSET_DIRS = {
+    "sta": "assets/sta",
+    "exp": "assets/exp",
+    "act": "assets/act",
+    "bg": "assets/bg",
+    "cg": "assets/cg",
+}
+
+SEGMENT_RE = re.compile(r"^\[([\d.]+)s - ([\d.]+)s\] Speaker: (.*?): (.*)$")
+CODES_RE = re.compile(r"^(STA|EXP|ACT|BG|CG): (.*)$", re.M)
+
+
+@pytest.fixture
+def fresh_render_caches():
+    """Empty process-wide render caches; uninstalls any layer source afterwards."""
+    configure_layer_cache(256 * 1024 * 1024)
+    configure_prefix_cache(32)
+    yield
+    set_layer_source(None)
+
+
+class LLMStub:
+    """Answers chat completions with one scene per transcript segment.
+
+    The segments after a "Segments:" header (or every segment line when
+    there is none) each get a scene; text containing "haha" gets EXP_Laugh.
+    When the system prompt asks for code index rows (encoding="codes"),
+    scenes are answered as [sta, exp, act, bg, cg] rows instead.
+    A request whose segments mention FAIL gets a 400 (not retried). delay_s simulates
+    network latency; requests and max_concurrent record what was served,
+    and connections the distinct client connections (keep-alive is on).
+    Requests with stream=true are answered as server-sent events carrying
+    the same content in pieces of piece_chars, stream_delay_s apart.
+    """
+
+    def __init__(self):
+        self.delay_s = 0.0
+        self.piece_chars = 16
+        self.stream_delay_s = 0.0
+        self.requests: list[dict] = []
+        self.max_concurrent = 0
+        self.connections: set[tuple] = set()
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def scenes_for(self, body: dict) -> list[dict]:
+        prompt = body["messages"][-1]["content"]
+        if "Segments:\n" in prompt:
+            prompt = prompt.split("Segments:\n", 1)[1]
+        scenes = []
+        for line in prompt.splitlines():
+            m = SEGMENT_RE.match(line)
+            if not m:
+                continue
+            start, end, speaker, text = m.groups()
+            scenes.append({
+                "speaker_id": speaker,
+                "text": text,
+                "sta": "STA_Stand_Side",
+                "exp": "EXP_Laugh" if "haha" in text else "EXP_Neutral",
+                "act": "ACT_None",
+                "bg": "BG_Cafe_Starbucks",
+                "cg": "CG_None",
+                "start": float(start),
+                "end": float(end),
+            })
+        return scenes
+
+    def encode_rows(self, system: str, scenes: list[dict]) -> list[list[int]]:
+        index = {}
+        for _, listing in CODES_RE.findall(system):
+            for item in listing.split():
+                i, code = item.split("=", 1)
+                index[code] = int(i)
+        return [[index[s[cat]] for cat in ("sta", "exp", "act", "bg", "cg")] for s in scenes]
+
+    def handle(self, body: dict) -> tuple[int, dict]:
+        with self._lock:
+            self.requests.append(body)
+            self._active += 1
+            self.max_concurrent = max(self.max_concurrent, self._active)
+        try:
+            time.sleep(self.delay_s)
+            scenes = self.scenes_for(body)
+            if any("FAIL" in s["text"] for s in scenes):
+                return 400, {"error": {"message": "stub failure", "type": "invalid_request_error"}}
+            system = body["messages"][0]["content"]
+            if '"scenes": [[' in system:
+                scenes = self.encode_rows(system, scenes)
+            return 200, {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": json.dumps({"scenes": scenes})},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+            }
+        finally:
+            with self._lock:
+                self._active -= 1
+
+
+@pytest.fixture
+def llm_stub(monkeypatch):
+    """Run an LLMStub on localhost and point the OpenAI clients at it."""
+    stub = LLMStub()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            stub.connections.add(self.client_address)
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            status, payload = stub.handle(body)
+            if status == 200 and body.get("stream"):
+                self.stream(body, payload)
+                return
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def stream(self, body, payload):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            content = payload["choices"][0]["message"]["content"]
+            base = {"id": payload["id"], "object": "chat.completion.chunk", "created": 0, "model": payload["model"]}
+            for i in range(0, len(content), stub.piece_chars):
+                delta = {"content": content[i:i + stub.piece_chars]}
+                self.event({**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+                time.sleep(stub.stream_delay_s)
+            self.event({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+            if body.get("stream_options", {}).get("include_usage"):
+                self.event({**base, "choices": [], "usage": payload["usage"]})
+            self.wfile.write(b"data: [DONE]\n\n")
+
+        def event(self, data):
+            self.wfile.write(f"data: {json.dumps(data)}\n\n".encode())
+            self.wfile.flush()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_port}/v1")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    yield stub
+    server.shutdown()
+    server.server_close()
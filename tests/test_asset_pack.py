@@ -0,0 +1,125 @@
+"""Unit tests for the memory-mapped asset pack."""
+
+import json
+import os
+import signal
+import tempfile
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from talk2scene.asset_pack import load_pack, pack_paths, write_pack
+from talk2scene.atlas import PackedLayers
+from talk2scene.cli import _init_render_worker, _render_ctx
+from talk2scene.render_cache import (
+    configure_layer_cache,
+    configure_prefix_cache,
+    get_layer_cache,
+    get_layer_source,
+    set_layer_source,
+)
+from talk2scene.renderer import render_scene_rgb
+from tests.conftest import ASSET_DIRS
+
+pytestmark = pytest.mark.usefixtures("fresh_render_caches")
+
+
+def _touch_later(path: Path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def _write_manifest(tmpdir: str) -> tuple[Path, Path]:
+    """A one-asset manifest in tmpdir; returns (manifest, asset) paths."""
+    asset = Path(tmpdir) / "STA_Test.png"
+    Image.new("RGBA", (16, 16), (10, 20, 30, 128)).save(asset)
+    manifest = Path(tmpdir) / "manifest.json"
+    with open(manifest, "w") as f:
+        json.dump({"assets": {"STA": {"STA_Test": {"path": str(asset)}}}}, f)
+    return manifest, asset
+
+
+@pytest.mark.parametrize("backend", ["pil", "numpy"])
+def test_pack_renders_identically(backend):
+    states = [
+        {"bg": "BG_Garden_Rooftop", "sta": "STA_Stand_Lean", "act": "ACT_WaveGreeting", "exp": "EXP_Laugh"},
+        {"sta": "STA_Stand_Front", "exp": "EXP_Concerned"},
+        {"cg": "CG_PandorasTech"},
+    ]
+    expected = [render_scene_rgb(s, ASSET_DIRS, (96, 64), backend).tobytes() for s in states]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        write_pack("assets/manifest.json", (96, 64), tmpdir)
+        pack = load_pack("assets/manifest.json", (96, 64), tmpdir)
+        assert pack is not None
+
+        configure_layer_cache(256 * 1024 * 1024)
+        configure_prefix_cache(0)
+        set_layer_source(pack)
+        for state, pixels in zip(states, expected):
+            assert render_scene_rgb(state, ASSET_DIRS, (96, 64), backend).tobytes() == pixels
+        assert get_layer_cache().stats()["misses"] == 0
+
+
+def test_missing_pack():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manifest, _ = _write_manifest(tmpdir)
+        assert load_pack(str(manifest), (8, 8), tmpdir) is None
+
+
+def test_pack_stale_after_manifest_change():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manifest, _ = _write_manifest(tmpdir)
+        write_pack(str(manifest), (8, 8), tmpdir)
+        assert load_pack(str(manifest), (8, 8), tmpdir) is not None
+        _touch_later(manifest)
+        assert load_pack(str(manifest), (8, 8), tmpdir) is None
+
+
+def test_pack_skips_changed_asset():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manifest, asset = _write_manifest(tmpdir)
+        write_pack(str(manifest), (8, 8), tmpdir)
+        pack = load_pack(str(manifest), (8, 8), tmpdir)
+        assert pack.lookup(str(asset), (8, 8), "array") is not None
+        assert pack.lookup(str(asset), (16, 16), "image") is None
+
+        _touch_later(asset)
+        assert pack.lookup(str(asset), (8, 8), "image") is None
+
+
+def test_pack_paths_per_canvas_size():
+    bin_path, index_path = pack_paths("assets/pack", (1024, 768))
+    assert bin_path.name == "assets_1024x768.bin"
+    assert index_path.name == "assets_1024x768.json"
+
+
+def test_render_worker_maps_pack_from_context(monkeypatch):
+    # Keep the pool initializer's signal setup out of the test process
+    monkeypatch.setattr(signal, "signal", lambda signum, handler: None)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        write_pack("assets/manifest.json", (32, 32), tmpdir)
+        ctx = {
+            "asset_dirs": ASSET_DIRS,
+            "canvas_size": (32, 32),
+            "backend": "pil",
+            "burn_subs": False,
+            "font_path": None,
+            "font_size": 0,
+            "frames_dir": None,
+            "pack": {"manifest_path": "assets/manifest.json", "pack_dir": tmpdir},
+        }
+        # Nothing is inherited from the parent: the worker maps the pack itself
+        set_layer_source(None)
+        _init_render_worker(256, 0, ctx)
+        try:
+            assert isinstance(get_layer_source(), PackedLayers)
+            render_scene_rgb({"sta": "STA_Stand_Front"}, ASSET_DIRS, (32, 32))
+            assert get_layer_cache().stats()["misses"] == 0
+
+            # Without a pack or atlas in the context, an inherited source is dropped
+            _init_render_worker(256, 0, {**ctx, "pack": None})
+            assert get_layer_source() is None
+        finally:
+            _render_ctx.clear()
@@ -0,0 +1,81 @@
+"""Unit tests for the shared-memory asset atlas."""
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from talk2scene.atlas import AssetAtlas, manifest_asset_paths
+from talk2scene.render_cache import (
+    configure_layer_cache,
+    configure_prefix_cache,
+    get_layer_cache,
+    set_layer_source,
+)
+from talk2scene.renderer import render_scene_rgb, scene_asset_paths
+from tests.conftest import ASSET_DIRS
+
+pytestmark = pytest.mark.usefixtures("fresh_render_caches")
+
+STATES = [
+    {"bg": "BG_Cafe_Starbucks", "sta": "STA_Stand_Side", "act": "ACT_HeadTilt", "exp": "EXP_Thinking"},
+    {"sta": "STA_Stand_Front", "exp": "EXP_Concerned"},
+    {"cg": "CG_PandorasTech"},
+]
+
+
+def test_manifest_asset_paths():
+    paths = manifest_asset_paths("assets/manifest.json")
+    assert "assets/sta/STA_Stand_Front.png" in paths
+    assert all(Path(p).exists() for p in paths)
+
+
+@pytest.mark.parametrize("backend", ["pil", "numpy"])
+def test_atlas_renders_identically(backend):
+    expected = [render_scene_rgb(s, ASSET_DIRS, (128, 128), backend).tobytes() for s in STATES]
+
+    include = scene_asset_paths(STATES, ASSET_DIRS)
+    atlas = AssetAtlas.from_manifest("assets/manifest.json", (128, 128), backend, include=include)
+    try:
+        assert len(atlas) == len(include)
+        # Attach as a worker would, from the picklable handle
+        worker_atlas = AssetAtlas.attach(atlas.handle())
+        configure_layer_cache(256 * 1024 * 1024)
+        configure_prefix_cache(0)
+        set_layer_source(worker_atlas)
+        for state, pixels in zip(STATES, expected):
+            assert render_scene_rgb(state, ASSET_DIRS, (128, 128), backend).tobytes() == pixels
+        stats = get_layer_cache().stats()
+        assert stats["misses"] == 0
+        assert stats["shared_hits"] > 0
+    finally:
+        set_layer_source(None)
+        atlas.close()
+
+
+def test_atlas_misses_changed_files():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "a.png"
+        Image.new("RGBA", (8, 8), (255, 0, 0, 255)).save(path)
+        atlas = AssetAtlas.build([str(path)], (8, 8))
+        try:
+            assert atlas.lookup(str(path), (8, 8), "image").getpixel((0, 0)) == (255, 0, 0, 255)
+            assert atlas.lookup(str(path), (16, 16), "image") is None
+
+            st = os.stat(path)
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+            assert atlas.lookup(str(path), (8, 8), "image") is None
+        finally:
+            atlas.close()
+
+
+def test_pil_atlas_has_no_numpy_terms():
+    path = "assets/exp/EXP_Neutral.png"
+    atlas = AssetAtlas.build([path], (64, 64), backend="pil")
+    try:
+        assert atlas.lookup(path, (64, 64), "array") is None
+        assert atlas.lookup(path, (64, 64), "image").size == (64, 64)
+    finally:
+        atlas.close()
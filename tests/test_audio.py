@@ -0,0 +1,136 @@
+"""Tests for in-memory audio conversion and voice activity detection."""
+
+import sys
+import types
+import wave
+
+import numpy as np
+
+from talk2scene.audio import WHISPER_SAMPLE_RATE, EnergyVAD, SpeechGate, pcm_to_float32, split_at_silence
+from talk2scene.transcription import IncrementalTranscriber, Transcriber
+
+
+def test_pcm_to_float32_scales_int16():
+    pcm = np.array([0, 16384, -32768, 32767], dtype="<i2").tobytes()
+    audio = pcm_to_float32(pcm)
+    assert audio.dtype == np.float32
+    assert audio.tolist() == [0.0, 0.5, -1.0, 32767 / 32768]
+
+
+def test_pcm_to_float32_resamples_to_16k():
+    pcm = (np.sin(np.arange(8000) / 10) * 10000).astype("<i2").tobytes()
+    audio = pcm_to_float32(pcm, 8000)
+    assert len(audio) == WHISPER_SAMPLE_RATE
+    # Every other sample is an original one
+    assert np.allclose(audio[::2], pcm_to_float32(pcm))
+
+
+def test_pcm_to_float32_ignores_odd_trailing_byte():
+    assert len(pcm_to_float32(b"\x00\x01\x02")) == 1
+
+
+def test_local_chunk_goes_to_model_as_array(monkeypatch):
+    seen = []
+
+    class FakeModel:
+        def transcribe(self, audio, **opts):
+            seen.append(audio)
+            return {"segments": [{"start": 0.0, "end": 1.0, "text": " hi "}]}
+
+    fake_whisper = types.SimpleNamespace(load_model=lambda size, device: FakeModel())
+    monkeypatch.setitem(sys.modules, "whisper", fake_whisper)
+    transcriber = Transcriber("tiny")
+
+    pcm = np.zeros(WHISPER_SAMPLE_RATE, dtype="<i2").tobytes()
+    events = transcriber.transcribe_chunk(pcm)
+    assert events[0]["text"] == "hi"
+    assert isinstance(seen[0], np.ndarray) and seen[0].dtype == np.float32
+    assert len(seen[0]) == WHISPER_SAMPLE_RATE
+
+
+def tone(seconds: float, level: float = 0.2) -> bytes:
+    t = np.arange(int(seconds * WHISPER_SAMPLE_RATE)) / WHISPER_SAMPLE_RATE
+    return (np.sin(2 * np.pi * 220 * t) * level * 32767).astype("<i2").tobytes()
+
+
+def silence(seconds: float) -> bytes:
+    return bytes(int(seconds * WHISPER_SAMPLE_RATE) * 2)
+
+
+def test_vad_separates_speech_silence_and_hiss():
+    vad = EnergyVAD()
+    hiss = np.random.default_rng(0).normal(0, 0.1, WHISPER_SAMPLE_RATE).astype(np.float32)
+    assert vad.is_speech(pcm_to_float32(tone(1.0))).all()
+    assert not vad.is_speech(pcm_to_float32(silence(1.0))).any()
+    assert not vad.is_speech(pcm_to_float32(tone(1.0, level=0.005))).any()
+    assert not vad.is_speech(hiss).any()
+
+
+def test_gate_passes_speech_segments_only():
+    gate = SpeechGate(EnergyVAD(frame_ms=20), min_silence_ms=400, padding_ms=100, max_segment_s=10)
+    stream = silence(2.0) + tone(1.0) + silence(3.0) + tone(0.5) + silence(0.5)
+    pieces = []
+    # Redis chunk boundaries need not line up with frames
+    for i in range(0, len(stream), 4802):
+        pieces.extend(gate.feed(stream[i:i + 4802]))
+    pieces.extend(gate.flush())
+
+    assert [(round(start, 2), closed) for _, start, closed in pieces] == [(1.9, True), (5.9, True)]
+    durations = [len(pcm) / 2 / WHISPER_SAMPLE_RATE for pcm, _, _ in pieces]
+    assert [round(d, 2) for d in durations] == [1.2, 0.7]
+    assert round(gate.total_s, 2) == 7.0
+    assert round(gate.skipped_fraction, 2) == round(1 - 1.9 / 7.0, 2)
+
+
+def test_gate_splits_long_speech_into_contiguous_pieces():
+    gate = SpeechGate(EnergyVAD(frame_ms=20), min_silence_ms=400, padding_ms=0, max_segment_s=2)
+    pieces = gate.feed(tone(5.0)) + gate.flush()
+    assert [(round(start, 2), closed) for _, start, closed in pieces] == [(0.0, False), (2.0, False), (4.0, True)]
+    assert gate.skipped_s == 0
+
+
+def write_wav(path, pcm: bytes):
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(WHISPER_SAMPLE_RATE)
+        wf.writeframes(pcm)
+    return str(path)
+
+
+def test_split_at_silence_cuts_in_pauses(tmp_path):
+    # Speech 0-8 s, pause 8-9 s, speech 9-17 s, pause 17-18 s, speech 18-25 s
+    path = write_wav(tmp_path / "long.wav", tone(8) + silence(1) + tone(8) + silence(1) + tone(7))
+    ranges = split_at_silence(path, chunk_s=10, search_s=4)
+
+    assert ranges[0][0] == 0 and ranges[-1][1] == 25 * WHISPER_SAMPLE_RATE
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    cuts = [end / WHISPER_SAMPLE_RATE for _, end in ranges[:-1]]
+    assert len(cuts) == 2
+    assert 8 <= cuts[0] <= 9 and 17 <= cuts[1] <= 18
+
+
+def test_split_at_silence_short_file_is_one_range(tmp_path):
+    path = write_wav(tmp_path / "short.wav", tone(3))
+    assert split_at_silence(path, chunk_s=10) == [(0, 3 * WHISPER_SAMPLE_RATE)]
+
+
+def test_gated_speech_is_decoded_once_per_closed_segment():
+    class CountingTranscriber:
+        decodes = 0
+
+        def transcribe_chunk(self, audio_bytes, sample_rate=16000):
+            self.decodes += 1
+            length = len(audio_bytes) / 2 / sample_rate
+            return [{"type": "transcript", "start": 0.0, "end": length, "text": "hi", "speaker_id": "unknown"}]
+
+    gate = SpeechGate(EnergyVAD(frame_ms=20), min_silence_ms=400, padding_ms=100, max_segment_s=10)
+    fake = CountingTranscriber()
+    inc = IncrementalTranscriber(fake, settle_s=1.0)
+    emitted = []
+    for pcm, start_s, closed in gate.feed(silence(1.0) + tone(1.0) + silence(2.0) + tone(0.5) + silence(1.0)) + gate.flush():
+        emitted.extend(inc.feed(pcm, start_s, final=closed))
+
+    assert [round(e["start"], 2) for e in emitted] == [0.9, 3.9]
+    assert fake.decodes == 2
+    assert inc.flush() == [] and fake.decodes == 2
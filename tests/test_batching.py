@@ -0,0 +1,126 @@
+"""Unit tests for stream-mode micro-batching."""
+
+import threading
+import time
+
+from talk2scene.batching import MicroBatcher
+
+
+def _collector():
+    delivered = []
+    calls = []
+
+    def process(items):
+        calls.append(list(items))
+        return [x * 10 for x in items]
+
+    def deliver(items, results):
+        delivered.append((items, results))
+
+    return calls, delivered, process, deliver
+
+
+def test_burst_is_one_request_in_order():
+    calls, delivered, process, deliver = _collector()
+    batcher = MicroBatcher(process, deliver, max_delay_ms=200, max_segments=100)
+    for i in range(5):
+        batcher.submit([i])
+    batcher.close()
+    assert calls == [[0, 1, 2, 3, 4]]
+    assert delivered == [([i], [i * 10]) for i in range(5)]
+
+
+def test_max_segments_flushes_without_waiting():
+    calls, delivered, process, deliver = _collector()
+    batcher = MicroBatcher(process, deliver, max_delay_ms=10_000, max_segments=3)
+    start = time.monotonic()
+    batcher.submit([1, 2])
+    batcher.submit([3])
+    while not delivered and time.monotonic() - start < 2:
+        time.sleep(0.01)
+    assert time.monotonic() - start < 2
+    assert calls == [[1, 2, 3]]
+    batcher.close()
+
+
+def test_max_delay_flushes_partial_batch():
+    calls, delivered, process, deliver = _collector()
+    batcher = MicroBatcher(process, deliver, max_delay_ms=50, max_segments=100)
+    batcher.submit(["a"])
+    time.sleep(0.3)
+    assert calls == [["a"]]
+    batcher.close()
+
+
+def test_submissions_are_not_split():
+    calls, delivered, process, deliver = _collector()
+    gate = threading.Event()
+
+    def slow_process(items):
+        gate.wait(2)
+        return process(items)
+
+    batcher = MicroBatcher(slow_process, deliver, max_delay_ms=0, max_segments=3)
+    batcher.submit([1])
+    time.sleep(0.05)
+    # Accumulate while the first batch is in flight
+    batcher.submit([2, 3])
+    batcher.submit([4, 5])
+    gate.set()
+    batcher.close()
+    assert calls == [[1], [2, 3], [4, 5]]
+    assert [items for items, _ in delivered] == [[1], [2, 3], [4, 5]]
+
+
+def test_failed_batch_does_not_stop_batcher():
+    delivered = []
+
+    def process(items):
+        if "bad" in items:
+            raise ValueError("boom")
+        return items
+
+    batcher = MicroBatcher(process, lambda items, results: delivered.append(results), max_delay_ms=0, max_segments=1)
+    batcher.submit(["bad"])
+    batcher.submit(["ok"])
+    batcher.close()
+    assert delivered == [["ok"]]
+
+
+def _run_batch(process, submissions: list[list], indexed: bool = False) -> list[tuple]:
+    delivered = []
+    batcher = MicroBatcher(
+        process, lambda items, results: delivered.append((items, results)),
+        max_delay_ms=200, max_segments=100, indexed=indexed,
+    )
+    for items in submissions:
+        batcher.submit(items)
+    batcher.close()
+    return delivered
+
+
+def test_indexed_results_stay_with_their_submission():
+    # Two results for every item: each submission gets both of its own
+    def process(items):
+        for i, item in enumerate(items):
+            yield i, item
+            yield i, f"{item}-extra"
+
+    delivered = _run_batch(process, [["a"], ["b"]], indexed=True)
+    assert delivered == [(["a"], ["a", "a-extra"]), (["b"], ["b", "b-extra"])]
+
+
+def test_indexed_missing_results_leave_submission_short():
+    # No result for "b"
+    delivered = _run_batch(lambda items: iter([(0, "a"), (2, "c")]), [["a"], ["b"], ["c"]], indexed=True)
+    assert delivered == [(["a"], ["a"]), (["b"], []), (["c"], ["c"])]
+
+
+def test_positional_extra_results_go_to_last_submission():
+    delivered = _run_batch(lambda items: items + ["extra"], [["a"], ["b"]])
+    assert delivered == [(["a"], ["a"]), (["b"], ["b", "extra"])]
+
+
+def test_positional_missing_results_leave_later_submissions_short():
+    delivered = _run_batch(lambda items: items[:1], [["a"], ["b"], ["c"]])
+    assert delivered == [(["a"], ["a"]), (["b"], []), (["c"], [])]
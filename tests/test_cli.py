@@ -0,0 +1,264 @@
+"""Unit tests for the CLI's video frame planning and encoding, and batch-all bookkeeping."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from talk2scene import cli
+from talk2scene.cli import (
+    _audio_source,
+    _batch_job_complete,
+    _batch_report,
+    _batch_session_id,
+    _encode_pipe,
+    _scene_frame_counts,
+    _segment_index,
+    _track_worker_stats,
+    _unique_frames,
+    _write_concat_list,
+    _write_scene_frames,
+)
+from talk2scene.jobs import Job
+from talk2scene.performance import PerformanceMonitor
+
+
+def scene(start: float, end: float, exp: str = "EXP_Neutral", text: str = "hi") -> dict:
+    return {
+        "type": "scene", "start": start, "end": end, "text": text,
+        "sta": "STA_Stand_Front", "exp": exp, "act": "ACT_None", "bg": "BG_Lab_Modern", "cg": "CG_None",
+    }
+
+
+SCENES = [
+    scene(0.0, 1.5),
+    scene(1.5, 2.0),
+    scene(2.0, 3.25, exp="EXP_Laugh"),
+    scene(3.25, 4.0),
+    scene(4.0, 5.0, text="bye"),
+]
+
+
+def test_identical_states_share_a_frame():
+    scene_frames, unique_events = _unique_frames(SCENES, burn_subs=False)
+    assert scene_frames == [0, 0, 1, 0, 0]
+    assert unique_events == [SCENES[0], SCENES[2]]
+
+
+def test_burned_subtitles_are_part_of_the_frame():
+    scene_frames, unique_events = _unique_frames(SCENES, burn_subs=True)
+    assert scene_frames == [0, 0, 1, 0, 2]
+    assert len(unique_events) == 3
+
+
+def test_concat_list_durations_match_scenes(tmp_path):
+    scene_frames, unique_events = _unique_frames(SCENES, burn_subs=False)
+    frame_paths = {idx: str(tmp_path / f"frame_{idx:05d}.png") for idx in range(len(unique_events))}
+    concat_path = tmp_path / "concat.txt"
+    _write_concat_list(str(concat_path), SCENES, scene_frames, frame_paths)
+
+    lines = concat_path.read_text().splitlines()
+    files = [line.split("'")[1] for line in lines if line.startswith("file ")]
+    durations = [float(line.split()[1]) for line in lines if line.startswith("duration ")]
+    # One entry per scene, plus the last frame repeated without a duration
+    assert files == [f"frame_{idx:05d}.png" for idx in scene_frames + scene_frames[-1:]]
+    assert durations == [ev["end"] - ev["start"] for ev in SCENES]
+    assert sum(durations) == SCENES[-1]["end"] - SCENES[0]["start"]
+
+
+def test_scene_frame_counts_follow_cumulative_time():
+    events = [scene(0.0, 0.34), scene(0.34, 0.67), scene(0.67, 1.0), scene(1.0, 1.01)]
+    counts = _scene_frame_counts(events, fps=10)
+    # Per-scene rounding would give 3 + 3 + 3 = 9 frames for the first second
+    assert counts == [3, 4, 3, 0]
+    assert sum(counts) == round(1.01 * 10)
+
+
+def test_scene_frame_counts_never_negative():
+    assert _scene_frame_counts([scene(0.0, 0.04), scene(0.04, 0.08), scene(0.08, 0.2)], fps=10) == [0, 1, 1]
+
+
+def stats(pid: int = 1) -> dict:
+    return {"pid": pid, "layer": {"hits": 0, "misses": 0, "evictions": 0, "shared_hits": 0}, "prefix": {}}
+
+
+def test_frames_are_written_in_scene_order():
+    # Scenes use frames 0, 1, 0, 2; frames arrive in first-use order
+    scene_frames = [0, 1, 0, 2]
+    results = [(0, b"a", stats()), (1, b"b", stats()), (2, b"c", stats())]
+    written = []
+    count = _write_scene_frames(iter(results), scene_frames, [2, 1, 3, 1], written.append, {})
+    assert written == [b"a", b"a", b"b", b"a", b"a", b"a", b"c"]
+    assert count == 7
+
+
+def test_frame_writing_stops_on_shutdown(monkeypatch):
+    written = []
+
+    def results():
+        yield 0, b"a", stats()
+        monkeypatch.setattr(cli, "_shutdown_requested", True)
+        yield 1, b"b", stats()
+
+    assert _write_scene_frames(results(), [0, 1], [1, 1], written.append, {}) is None
+    assert written == [b"a"]
+
+
+@pytest.fixture
+def fake_ffmpeg(monkeypatch):
+    """Run a stdin-draining Python process in place of ffmpeg; yields the started processes."""
+    procs = []
+    popen = subprocess.Popen
+
+    def start(*args, **kwargs):
+        procs.append(popen(*args, **kwargs))
+        return procs[-1]
+
+    drain = [sys.executable, "-c", "import sys; sys.stdin.buffer.read()"]
+    monkeypatch.setattr(cli, "_build_ffmpeg_pipe_cmd", lambda *args: drain)
+    monkeypatch.setattr(subprocess, "Popen", start)
+    return procs
+
+
+def test_encode_pipe_stopped_early_is_a_failure(fake_ffmpeg, monkeypatch, tmp_path):
+    output = tmp_path / "scene_video.mp4"
+    output.write_bytes(b"partial")
+
+    def results():
+        yield 0, b"a", stats()
+        monkeypatch.setattr(cli, "_shutdown_requested", True)
+        yield 1, b"b", stats()
+
+    events = [scene(0.0, 1.0), scene(1.0, 2.0, exp="EXP_Laugh")]
+    ok = _encode_pipe(results(), events, [0, 1], (1, 1), (1, 18, "mp4", str(output)), PerformanceMonitor(), {})
+    assert ok is False
+    assert fake_ffmpeg[0].returncode is not None
+    assert not output.exists()
+
+
+def test_encode_pipe_reaps_ffmpeg_on_worker_error(fake_ffmpeg, tmp_path):
+    def results():
+        yield 0, b"a", stats()
+        raise RuntimeError("worker failed")
+
+    events = [scene(0.0, 1.0), scene(1.0, 2.0, exp="EXP_Laugh")]
+    cmd_args = (1, 18, "mp4", str(tmp_path / "scene_video.mp4"))
+    with pytest.raises(RuntimeError):
+        _encode_pipe(results(), events, [0, 1], (1, 1), cmd_args, PerformanceMonitor(), {})
+    assert fake_ffmpeg[0].returncode is not None
+    assert fake_ffmpeg[0].stdin.closed
+
+
+def test_encode_pipe_writes_every_frame(fake_ffmpeg, tmp_path):
+    monitor = PerformanceMonitor()
+    results = [(0, b"a", stats()), (1, b"b", stats())]
+    events = [scene(0.0, 2.0), scene(2.0, 3.0, exp="EXP_Laugh")]
+    cmd_args = (1, 18, "mp4", str(tmp_path / "scene_video.mp4"))
+    assert _encode_pipe(iter(results), events, [0, 1], (1, 1), cmd_args, monitor, {}) is True
+    assert fake_ffmpeg[0].returncode == 0
+    assert monitor.counters["video_frames_written"] == 3
+
+
+def test_worker_stats_keep_latest_snapshot_with_shared_layers():
+    # With an atlas or pack, lookups only bump shared_hits and prefix counts
+    def snapshot(shared_hits: int, prefix_misses: int) -> dict:
+        snap = stats(pid=7)
+        snap["layer"]["shared_hits"] = shared_hits
+        snap["prefix"] = {"depth1": {"hits": 0, "misses": prefix_misses}}
+        return snap
+
+    worker_stats = {}
+    for snap in (snapshot(3, 1), snapshot(11, 4), snapshot(7, 2)):
+        _track_worker_stats(worker_stats, snap)
+    assert worker_stats[7]["layer"]["shared_hits"] == 11
+    assert worker_stats[7]["prefix"]["depth1"]["misses"] == 4
+
+
+def test_batch_session_id_is_stable_and_per_path(tmp_path):
+    a = tmp_path / "a" / "talk show #1.wav"
+    b = tmp_path / "b" / "talk show #1.wav"
+    session_id = _batch_session_id(a)
+    assert session_id == _batch_session_id(Path(str(a)))
+    assert session_id.startswith("talk_show_1_")
+    assert session_id != _batch_session_id(b)
+
+
+def finished_session(session_dir: Path, source: dict, **record) -> Path:
+    session_dir.mkdir()
+    (session_dir / "events.jsonl").write_text("")
+    (session_dir / "job.json").write_text(json.dumps({"source": source, "status": "done", "rendered": False, **record}))
+    return session_dir
+
+
+def test_batch_job_complete_for_same_file_only(tmp_path):
+    audio = tmp_path / "talk.wav"
+    audio.write_bytes(b"RIFF")
+    source = _audio_source(audio)
+    session_dir = finished_session(tmp_path / "session", source)
+
+    assert _batch_job_complete(session_dir, source, render_video=False)
+    # Video wanted but not rendered last time
+    assert not _batch_job_complete(session_dir, source, render_video=True)
+    # The input file changed since
+    audio.write_bytes(b"RIFF changed")
+    assert not _batch_job_complete(session_dir, _audio_source(audio), render_video=False)
+
+
+def test_batch_job_incomplete_outputs_are_redone(tmp_path):
+    source = {"path": "talk.wav", "size": 4, "mtime_ns": 1}
+    failed = finished_session(tmp_path / "failed", source, status="failed")
+    assert not _batch_job_complete(failed, source, render_video=False)
+
+    no_events = finished_session(tmp_path / "no_events", source)
+    (no_events / "events.jsonl").unlink()
+    assert not _batch_job_complete(no_events, source, render_video=False)
+
+    corrupt = finished_session(tmp_path / "corrupt", source)
+    (corrupt / "job.json").write_text("{")
+    assert not _batch_job_complete(corrupt, source, render_video=False)
+    assert not _batch_job_complete(tmp_path / "missing", source, render_video=False)
+
+
+def test_batch_report():
+    def job(key: str, status: str, audio_s: float, stage_s: dict, error: str | None = None) -> Job:
+        j = Job(key, {"source": {"path": f"{key}.wav"}, "audio_s": audio_s})
+        j.status, j.stage_s, j.error = status, stage_s, error
+        return j
+
+    jobs = [
+        job("a", "done", 60.0, {"transcribe": 4.0, "generate": 2.0}),
+        job("b", "done", 30.0, {"transcribe": 2.0, "generate": 1.0}),
+        job("c", "failed", 10.0, {"transcribe": 1.0}, error="transcribe: RuntimeError: boom"),
+        job("d", "skipped", 0.0, {}),
+    ]
+    stages = [("transcribe", None, 1), ("generate", None, 2)]
+    report = _batch_report(jobs, stages, wall_s=10.0)
+
+    assert (report["done"], report["failed"], report["skipped"], report["cancelled"]) == (2, 1, 1, 0)
+    assert report["files"] == 4
+    # Only finished files count towards throughput
+    assert report["audio_s"] == 90.0
+    assert report["realtime_factor"] == 9.0
+    assert report["files_per_hour"] == 720.0
+    assert report["stages"]["transcribe"] == {"workers": 1, "jobs": 3, "busy_s": 7.0, "avg_s": 2.333, "utilization": 0.7}
+    assert report["stages"]["generate"] == {"workers": 2, "jobs": 2, "busy_s": 3.0, "avg_s": 1.5, "utilization": 0.15}
+    assert [j["status"] for j in report["jobs"]] == ["done", "done", "failed", "skipped"]
+    assert report["jobs"][2]["error"] == "transcribe: RuntimeError: boom"
+
+
+def test_batch_report_counts_zero_workers_as_one():
+    j = Job("a", {"source": {"path": "a.wav"}, "audio_s": 5.0})
+    j.status, j.stage_s = "done", {"generate": 2.0}
+    report = _batch_report([j], [("generate", None, 0)], wall_s=4.0)
+    assert report["stages"]["generate"]["workers"] == 1
+    assert report["stages"]["generate"]["utilization"] == 0.5
+
+
+def test_scenes_map_to_nearest_segment():
+    starts = [0.0, 2.0, 4.0]
+    assert [_segment_index(starts, {"start": t}, 0) for t in (0.0, 1.9, 2.0, 3.5, 9.0, -1.0)] == [0, 1, 1, 2, 2, 0]
+    # Without a usable start, fall back on the scene's position
+    assert _segment_index(starts, {}, 1) == 1
+    assert _segment_index(starts, {"start": None}, 7) == 2
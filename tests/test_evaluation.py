@@ -0,0 +1,31 @@
+"""Unit tests for the evaluation framework."""
+
+import json
+
+import pytest
+from PIL import Image
+
+from talk2scene.evaluation import run_evaluation
+
+
+@pytest.mark.parametrize("golden_backend,backend", [("pil", "numpy"), ("numpy", "pil")])
+def test_backends_agree_without_background(tmp_path, golden_backend, backend):
+    # No BG: the character's transparent surroundings must come out white on both backends
+    cases = tmp_path / "cases"
+    cases.mkdir()
+    (cases / "no_bg.json").write_text(json.dumps({"sta": "STA_Stand_Front", "exp": "EXP_Neutral"}))
+    dirs = {
+        "cases_dir": str(cases),
+        "expected_dir": str(tmp_path / "expected"),
+        "output_dir": str(tmp_path / "output"),
+        "diffs_dir": str(tmp_path / "diffs"),
+        "canvas_size": (64, 64),
+    }
+
+    golden = run_evaluation(**dirs, backend=golden_backend)
+    assert golden["cases"][0]["note"].startswith("No expected image")
+    assert Image.open(tmp_path / "expected" / "no_bg.png").getpixel((0, 0)) == (255, 255, 255)
+
+    results = run_evaluation(**dirs, tolerance=0.0, backend=backend)
+    assert results["summary"]["passed"] == 1
+    assert results["cases"][0]["pixel_diff_pct"] == 0
@@ -0,0 +1,79 @@
+"""Tests for the staged job queue."""
+
+import threading
+import time
+
+from talk2scene.jobs import Job, JobPipeline
+
+
+def test_stages_run_in_order_and_jobs_keep_input_order():
+    log = []
+    lock = threading.Lock()
+
+    def stage(name):
+        def run(job):
+            with lock:
+                log.append((job.key, name))
+            job.data.setdefault("trail", []).append(name)
+        return run
+
+    jobs = [Job(f"f{i}") for i in range(5)]
+    result = JobPipeline([("a", stage("a"), 2), ("b", stage("b"), 1), ("c", stage("c"), 3)]).run(jobs)
+
+    assert [job.key for job in result] == [f"f{i}" for i in range(5)]
+    assert all(job.status == "done" and job.data["trail"] == ["a", "b", "c"] for job in result)
+    assert all(set(job.stage_s) == {"a", "b", "c"} for job in result)
+    assert len(log) == 15
+
+
+def test_files_overlap_across_stages():
+    active = {"slow_a": 0, "slow_b": 0}
+    overlap = threading.Event()
+    lock = threading.Lock()
+
+    def slow(name):
+        def run(job):
+            with lock:
+                active[name] += 1
+                if active["slow_a"] and active["slow_b"]:
+                    overlap.set()
+            time.sleep(0.05)
+            with lock:
+                active[name] -= 1
+        return run
+
+    jobs = [Job(str(i)) for i in range(4)]
+    JobPipeline([("slow_a", slow("slow_a"), 1), ("slow_b", slow("slow_b"), 1)]).run(jobs)
+    # The second file was in stage a while the first was in stage b
+    assert overlap.is_set()
+
+
+def test_failed_job_skips_later_stages_only():
+    ran = []
+
+    def first(job):
+        if job.key == "bad":
+            raise ValueError("boom")
+
+    jobs = [Job("ok1"), Job("bad"), Job("ok2")]
+    JobPipeline([("first", first, 1), ("second", lambda job: ran.append(job.key), 1)]).run(jobs)
+
+    assert [job.status for job in jobs] == ["done", "failed", "done"]
+    assert jobs[1].error == "first: ValueError: boom"
+    assert ran == ["ok1", "ok2"]
+
+
+def test_skipped_and_stopped_jobs_are_not_run():
+    ran = []
+    stop = threading.Event()
+
+    def work(job):
+        ran.append(job.key)
+        stop.set()
+
+    jobs = [Job("skip"), Job("one"), Job("two")]
+    jobs[0].status = "skipped"
+    JobPipeline([("work", work, 1)], should_stop=stop.is_set).run(jobs)
+
+    assert ran == ["one"]
+    assert [job.status for job in jobs] == ["skipped", "done", "cancelled"]
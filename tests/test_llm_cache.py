@@ -0,0 +1,79 @@
+"""Unit tests for the on-disk LLM result cache."""
+
+import os
+import tempfile
+import time
+
+from talk2scene.llm_cache import LLMCache, request_key
+from talk2scene.performance import PerformanceMonitor
+from talk2scene.scene_gen import SceneGenerator
+
+
+def _transcript(n: int) -> list[dict]:
+    return [{"start": float(i), "end": i + 0.5, "speaker_id": "bob", "text": f"hello {i}"} for i in range(n)]
+
+
+def test_request_key_is_canonical():
+    a = {"model": "m", "temperature": 0.3, "messages": [{"role": "user", "content": "x"}]}
+    b = {"messages": [{"content": "x", "role": "user"}], "temperature": 0.3, "model": "m"}
+    assert request_key(a) == request_key(b)
+    assert request_key(a) != request_key(dict(a, temperature=0.4))
+
+
+def test_get_put_roundtrip():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = LLMCache(tmpdir)
+        assert cache.get("ab" * 32) is None
+        cache.put("ab" * 32, [{"exp": "EXP_Laugh"}])
+        assert cache.get("ab" * 32) == [{"exp": "EXP_Laugh"}]
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+        # Survives a new instance (a new process)
+        assert LLMCache(tmpdir).get("ab" * 32) == [{"exp": "EXP_Laugh"}]
+
+
+def test_lru_eviction():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        scenes = [{"text": "x" * 100}]
+        entry_size = len(b'[{"text": "') + 100 + len(b'"}]')
+        cache = LLMCache(tmpdir, max_bytes=2 * entry_size)
+        keys = [f"{i:064x}" for i in range(3)]
+        cache.put(keys[0], scenes)
+        cache.put(keys[1], scenes)
+        # Make keys[0] the most recently used
+        old = time.time() - 10
+        os.utime(cache._path(keys[1]), (old, old))
+        cache.get(keys[0])
+        cache.put(keys[2], scenes)
+        assert cache.stats()["evictions"] == 1
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None
+
+
+def test_warm_run_skips_network(llm_stub):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        events = _transcript(10)
+        cold_monitor = PerformanceMonitor()
+        cold = SceneGenerator(model="stub", chunk_size=4, cache=LLMCache(tmpdir), monitor=cold_monitor)
+        cold_scenes = cold.generate(events)
+        assert len(llm_stub.requests) == 3
+        assert cold_monitor.counters["llm_cache_misses"] == 3
+
+        warm_monitor = PerformanceMonitor()
+        warm = SceneGenerator(model="stub", chunk_size=4, cache=LLMCache(tmpdir), monitor=warm_monitor)
+        assert warm.generate(events) == cold_scenes
+        assert len(llm_stub.requests) == 3
+        assert warm_monitor.counters["llm_cache_hits"] == 3
+
+        # A different model is a different request
+        SceneGenerator(model="other", cache=LLMCache(tmpdir)).generate(events[:2])
+        assert len(llm_stub.requests) == 4
+
+
+def test_failures_are_not_cached(llm_stub):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        events = [{"start": 0.0, "end": 1.0, "speaker_id": "bob", "text": "FAIL"}]
+        gen = SceneGenerator(model="stub", cache=LLMCache(tmpdir))
+        gen.generate(events)
+        gen.generate(events)
+        assert len(llm_stub.requests) == 2
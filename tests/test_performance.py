@@ -35,6 +35,21 @@ def test_report():
     assert report["op_a"]["max_s"] == 3.0
 
 
+def test_histogram():
+    mon = PerformanceMonitor()
+    for ms in (10, 40, 60, 300, 20000):
+        mon.observe("api", ms / 1000)
+    hist = mon.report()["histograms"]["api"]
+    assert hist["count"] == 5
+    assert hist["p50_ms"] == 60.0
+    assert hist["max_ms"] == 20000.0
+    assert hist["buckets"]["le_25ms"] == 1
+    assert hist["buckets"]["le_50ms"] == 1
+    assert hist["buckets"]["le_500ms"] == 1
+    assert hist["buckets"]["gt_10000ms"] == 1
+    assert sum(hist["buckets"].values()) == 5
+
+
 def test_save():
     mon = PerformanceMonitor()
     mon.record("test", 1.0)
@@ -44,3 +59,24 @@ def test_save():
         with open(path) as f:
             data = json.load(f)
         assert "test" in data
+
+
+def test_counters():
+    mon = PerformanceMonitor()
+    mon.count("cache_hits")
+    mon.count("cache_hits", 4)
+    report = mon.report()
+    assert report["counters"]["cache_hits"] == 5
+
+
+def test_report_without_counters():
+    mon = PerformanceMonitor()
+    mon.record("op", 1.0)
+    assert "counters" not in mon.report()
+
+
+def test_gauges():
+    mon = PerformanceMonitor()
+    mon.gauge("hit_rate", 0.5)
+    mon.gauge("hit_rate", 0.75)
+    assert mon.report()["gauges"]["hit_rate"] == 0.75
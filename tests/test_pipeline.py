@@ -0,0 +1,44 @@
+"""Unit tests for the bounded ordered pool pipeline."""
+
+import time
+from multiprocessing.pool import ThreadPool
+
+import pytest
+
+from talk2scene.pipeline import ordered_imap
+
+
+def _slow_square(x):
+    # Later tasks finish first, so results must be reordered
+    time.sleep(0.01 * (5 - x % 5))
+    return x * x
+
+
+def test_ordered_imap_preserves_order():
+    with ThreadPool(4) as pool:
+        assert list(ordered_imap(pool, _slow_square, range(20), 4)) == [x * x for x in range(20)]
+
+
+def test_ordered_imap_bounds_inflight():
+    submitted = []
+
+    def tasks():
+        for i in range(10):
+            submitted.append(i)
+            yield i
+
+    with ThreadPool(2) as pool:
+        results = ordered_imap(pool, _slow_square, tasks(), 3)
+        assert next(results) == 0
+        # Window of 3, refilled once after the first result was taken
+        assert len(submitted) == 4
+        assert list(results) == [x * x for x in range(1, 10)]
+
+
+def test_ordered_imap_propagates_errors():
+    def fail(x):
+        raise ValueError(x)
+
+    with ThreadPool(2) as pool:
+        with pytest.raises(ValueError):
+            list(ordered_imap(pool, fail, range(3), 2))
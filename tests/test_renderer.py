@@ -0,0 +1,234 @@
+"""Unit tests for the scene renderer and its caches."""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from talk2scene.render_cache import (
+    LayerCache,
+    PrefixCache,
+    configure_layer_cache,
+    configure_prefix_cache,
+    get_layer_cache,
+    get_prefix_cache,
+    invalidate_asset_dirs,
+)
+from talk2scene.compositing import alpha_composite, blend_over_opaque, flatten_on_white
+from talk2scene.renderer import preload_scene_assets, render_scene, render_scene_rgb
+from tests.conftest import ASSET_DIRS
+
+pytestmark = pytest.mark.usefixtures("fresh_render_caches")
+
+
+def _write_png(path: Path, color: tuple, size=(8, 8)):
+    Image.new("RGBA", size, color).save(path)
+
+
+def test_layer_cache_hit_and_miss():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = str(Path(tmpdir) / "a.png")
+        _write_png(Path(path), (255, 0, 0, 255))
+        cache = LayerCache()
+        first = cache.get(path, (16, 16))
+        second = cache.get(path, (16, 16))
+        assert first is second
+        assert first.size == (16, 16)
+        assert first.mode == "RGBA"
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+
+def test_layer_cache_keyed_by_canvas_size():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = str(Path(tmpdir) / "a.png")
+        _write_png(Path(path), (255, 0, 0, 255))
+        cache = LayerCache()
+        cache.get(path, (16, 16))
+        cache.get(path, (32, 32))
+        assert cache.stats()["misses"] == 2
+        assert cache.stats()["entries"] == 2
+
+
+def test_layer_cache_reloads_on_mtime_change():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "a.png"
+        _write_png(path, (255, 0, 0, 255))
+        cache = LayerCache()
+        assert cache.get(str(path), (8, 8)).getpixel((0, 0)) == (255, 0, 0, 255)
+
+        _write_png(path, (0, 0, 255, 255))
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert cache.get(str(path), (8, 8)).getpixel((0, 0)) == (0, 0, 255, 255)
+        # The stale entry is replaced, not kept alongside
+        assert cache.stats()["entries"] == 1
+
+
+def test_layer_cache_lru_eviction():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = []
+        for i in range(3):
+            p = Path(tmpdir) / f"{i}.png"
+            _write_png(p, (i, 0, 0, 255))
+            paths.append(str(p))
+        # Room for exactly two 8x8 RGBA layers
+        cache = LayerCache(max_bytes=2 * 8 * 8 * 4)
+        cache.get(paths[0], (8, 8))
+        cache.get(paths[1], (8, 8))
+        cache.get(paths[0], (8, 8))  # 0 becomes most recently used
+        cache.get(paths[2], (8, 8))  # evicts 1
+        assert cache.stats()["evictions"] == 1
+        cache.get(paths[0], (8, 8))
+        assert cache.stats()["hits"] == 2
+        cache.get(paths[1], (8, 8))
+        assert cache.stats()["misses"] == 4
+
+
+def test_render_scene_uses_cache():
+    state = {"bg": "BG_Lab_Modern", "sta": "STA_Stand_Front", "exp": "EXP_Neutral",
+             "act": "ACT_None", "cg": "CG_None"}
+    first = render_scene(state, ASSET_DIRS)
+    second = render_scene(state, ASSET_DIRS)
+    assert first.tobytes() == second.tobytes()
+    stats = get_layer_cache().stats()
+    assert stats["misses"] == 3
+    # Second render resumes from the cached BG+STA prefix: only EXP is fetched
+    assert stats["hits"] == 1
+
+
+@pytest.mark.parametrize("case", ["basic_scene", "cafe_thinking", "cg_pandora"])
+def test_render_matches_expected(case):
+    with open(f"evaluation/cases/{case}.json") as f:
+        state = json.load(f)
+    for _ in range(2):  # cold and warm cache
+        rendered = np.array(render_scene(state, ASSET_DIRS).convert("RGB"))
+        expected = np.array(Image.open(f"evaluation/expected/{case}.png").convert("RGB"))
+        assert np.array_equal(rendered, expected)
+
+
+def test_prefix_cache_lru():
+    cache = PrefixCache(max_entries=2)
+    img = Image.new("RGBA", (1, 1))
+    cache.put(("a",), img)
+    cache.put(("b",), img)
+    assert cache.get(("a",)) is img
+    cache.put(("c",), img)  # evicts ("b",)
+    assert cache.get(("b",)) is None
+    assert cache.stats()["depth1"] == {"hits": 1, "misses": 1}
+
+
+def test_render_scene_reuses_prefix_on_top_layer_change():
+    base = {"bg": "BG_Cafe_Starbucks", "sta": "STA_Stand_Side", "act": "ACT_HeadTilt",
+            "exp": "EXP_Thinking", "cg": "CG_None"}
+    render_scene(base, ASSET_DIRS)
+    layer_misses = get_layer_cache().stats()["misses"]
+
+    changed = dict(base, exp="EXP_Laugh")
+    rendered = render_scene(changed, ASSET_DIRS)
+    assert get_prefix_cache().stats()["depth3"]["hits"] == 1
+    # Only the new EXP layer was fetched
+    layer_stats = get_layer_cache().stats()
+    assert layer_stats["misses"] == layer_misses + 1
+    assert layer_stats["hits"] == 0
+
+    # Identical to a render from a blank canvas
+    configure_layer_cache(256 * 1024 * 1024)
+    configure_prefix_cache(0)
+    assert rendered.tobytes() == render_scene(changed, ASSET_DIRS).tobytes()
+
+
+def _random_rgba(rng, shape=(32, 48)):
+    arr = rng.integers(0, 256, shape + (4,), dtype=np.uint8)
+    arr[rng.random(shape) < 0.2, 3] = 0
+    arr[rng.random(shape) < 0.2, 3] = 255
+    return arr
+
+
+def test_numpy_alpha_composite_matches_pil():
+    rng = np.random.default_rng(0)
+    for _ in range(5):
+        dst, src = _random_rgba(rng), _random_rgba(rng)
+        expected = Image.alpha_composite(Image.fromarray(dst, "RGBA"), Image.fromarray(src, "RGBA"))
+        assert np.array_equal(alpha_composite(dst, src), np.asarray(expected))
+
+
+def test_numpy_blend_over_opaque_matches_pil():
+    # Every (src, alpha) pair over every dst value
+    values = np.arange(256, dtype=np.uint8)
+    s, a, d = (v.ravel() for v in np.meshgrid(values, values, values, indexing="ij"))
+    src = np.stack([s, s, s, a], axis=-1).reshape(256 * 256, 256, 4)
+    dst = np.stack([d, d, d, np.full_like(d, 255)], axis=-1).reshape(256 * 256, 256, 4)
+    expected = Image.alpha_composite(Image.fromarray(dst, "RGBA"), Image.fromarray(src, "RGBA"))
+
+    rgb = np.ascontiguousarray(dst[..., :3])
+    blend_over_opaque(rgb, src, (0, 0, 256, 256 * 256))
+    assert np.array_equal(rgb, np.asarray(expected)[..., :3])
+
+
+def test_numpy_flatten_on_white_matches_pil():
+    rgba = _random_rgba(np.random.default_rng(1))
+    white = Image.new("RGBA", (48, 32), (255, 255, 255, 255))
+    expected = Image.alpha_composite(white, Image.fromarray(rgba, "RGBA")).convert("RGB")
+    assert np.array_equal(flatten_on_white(rgba), np.asarray(expected))
+
+
+@pytest.mark.parametrize("state", [
+    {"bg": "BG_Garden_Rooftop", "sta": "STA_Stand_Lean", "act": "ACT_WaveGreeting", "exp": "EXP_Laugh"},
+    {"sta": "STA_Stand_Front", "exp": "EXP_Concerned"},  # no BG: non-opaque canvas
+    {},
+])
+@pytest.mark.parametrize("canvas_size", [(1024, 1024), (320, 240)])
+def test_backends_are_bit_identical(state, canvas_size):
+    pil = render_scene_rgb(state, ASSET_DIRS, canvas_size, backend="pil")
+    for _ in range(2):  # cold and warm prefix cache
+        numpy_img = render_scene_rgb(state, ASSET_DIRS, canvas_size, backend="numpy")
+        assert numpy_img.tobytes() == pil.tobytes()
+
+
+@pytest.mark.parametrize("case", ["basic_scene", "cafe_thinking", "cg_pandora"])
+def test_numpy_backend_matches_expected(case):
+    with open(f"evaluation/cases/{case}.json") as f:
+        state = json.load(f)
+    rendered = np.asarray(render_scene_rgb(state, ASSET_DIRS, backend="numpy"))
+    expected = np.array(Image.open(f"evaluation/expected/{case}.png").convert("RGB"))
+    assert np.array_equal(rendered, expected)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        render_scene_rgb({}, ASSET_DIRS, backend="cairo")
+
+
+def test_preload_scene_assets():
+    states = [
+        {"bg": "BG_Lab_Modern", "sta": "STA_Stand_Front", "exp": "EXP_Neutral"},
+        {"bg": "BG_Lab_Modern", "sta": "STA_Stand_Front", "exp": "EXP_Laugh"},
+    ]
+    assert preload_scene_assets(states, ASSET_DIRS, (64, 64)) == 4
+    assert get_layer_cache().stats()["misses"] == 4
+
+    render_scene(states[1], ASSET_DIRS, (64, 64))
+    assert get_layer_cache().stats()["misses"] == 4
+
+
+def test_invalidate_asset_dirs_drops_only_those_layers():
+    state = {"bg": "BG_Lab_Modern", "sta": "STA_Stand_Front", "exp": "EXP_Neutral", "cg": "CG_None"}
+    render_scene(state, ASSET_DIRS, (64, 64))
+    entries = get_layer_cache().stats()["entries"]
+
+    # EXP is the top layer, so no cached composite contains it
+    assert invalidate_asset_dirs([ASSET_DIRS["exp"]]) == 1
+    assert get_layer_cache().stats()["entries"] == entries - 1
+    assert len(get_prefix_cache()._entries) > 0
+    misses = get_layer_cache().stats()["misses"]
+    render_scene(state, ASSET_DIRS, (64, 64))
+    assert get_layer_cache().stats()["misses"] == misses + 1
+
+    # Every composite starts with the BG layer
+    invalidate_asset_dirs([ASSET_DIRS["bg"]])
+    assert len(get_prefix_cache()._entries) == 0
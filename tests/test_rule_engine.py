@@ -0,0 +1,63 @@
+"""Unit tests for the offline rule-based scene generator."""
+
+from talk2scene.rule_engine import RuleEngine, RuleSceneGenerator
+from talk2scene.scene_gen import SceneGenerator
+from talk2scene.whitelist import validate_scene_event
+
+
+def _events(*texts):
+    return [
+        {"type": "transcript", "start": float(i), "end": i + 0.9, "speaker_id": "alice", "text": t}
+        for i, t in enumerate(texts)
+    ]
+
+
+def test_keywords_pick_codes():
+    gen = RuleSceneGenerator()
+    scenes = gen.generate(_events(
+        "Haha, that's a good one.",
+        "Hmm, let me think.",
+        "哈哈，太好笑了",
+        "Nothing special here.",
+    ))
+    assert [s["exp"] for s in scenes] == ["EXP_Laugh", "EXP_Thinking", "EXP_Laugh", "EXP_Neutral"]
+    assert scenes[1]["act"] == "ACT_HeadTilt"
+    assert scenes[3]["act"] == "ACT_None"
+    assert [s["seq"] for s in scenes] == [0, 1, 2, 3]
+    assert all(validate_scene_event(s) == s for s in scenes)
+
+
+def test_keywords_match_whole_words():
+    engine = RuleEngine({"keyword_rules": [{"keywords": ["hi"], "act": "ACT_WaveGreeting"}]})
+    assert engine.match("Hi there!") == {"act": "ACT_WaveGreeting"}
+    assert engine.match("This is it") == {}
+
+
+def test_first_rule_wins_and_recommended_pairs():
+    engine = RuleEngine({
+        "recommended_pairs": {"ACT_HeadTilt": ["EXP_Thinking"]},
+        "keyword_rules": [
+            {"keywords": ["tilt"], "act": "ACT_HeadTilt"},
+            {"pattern": "ti+lt", "act": "ACT_ArmsCrossed", "bg": "BG_Cafe_Starbucks"},
+        ],
+    })
+    assert engine.match("TILT") == {"act": "ACT_HeadTilt", "bg": "BG_Cafe_Starbucks", "exp": "EXP_Thinking"}
+
+
+def test_invalid_codes_are_ignored():
+    engine = RuleEngine({"keyword_rules": [{"keywords": ["x"], "exp": "EXP_Nope", "act": "ACT_PalmOpen"}]})
+    assert engine.match("x") == {"act": "ACT_PalmOpen"}
+
+
+def test_background_is_sticky():
+    gen = RuleSceneGenerator()
+    scenes = gen.generate(_events("Let's get a coffee.", "So anyway."))
+    scenes += gen.generate(_events("Back at the lab now."))
+    assert [s["bg"] for s in scenes] == ["BG_Cafe_Starbucks", "BG_Cafe_Starbucks", "BG_Lab_Modern"]
+
+
+def test_rules_fallback_for_failed_requests(llm_stub):
+    gen = SceneGenerator(model="stub", fallback_engine=RuleEngine.from_file("config/composition_rules.json"))
+    scenes = gen.generate(_events("haha FAIL"))
+    assert scenes[0]["exp"] == "EXP_Laugh"
+    assert scenes[0]["seq"] == 0
@@ -0,0 +1,186 @@
+"""Unit tests for LLM scene generation against a local stub server."""
+
+from talk2scene.performance import PerformanceMonitor
+import json
+import time
+
+from talk2scene.scene_gen import CONTEXT_HEADER, SceneGenerator, ScenesArrayParser, parse_scenes, system_prompt
+from talk2scene.whitelist import get_compiled_whitelist, get_whitelist
+
+
+def _transcript(n: int, texts: dict = None) -> list[dict]:
+    texts = texts or {}
+    return [
+        {"type": "transcript", "start": float(i), "end": i + 0.9,
+         "speaker_id": "alice", "text": texts.get(i, f"line {i}")}
+        for i in range(n)
+    ]
+
+
+def test_parse_scenes_variants():
+    assert parse_scenes('{"scenes": [{"a": 1}]}') == [{"a": 1}]
+    assert parse_scenes('```json\n{"events": [{"a": 1}]}\n```') == [{"a": 1}]
+    assert parse_scenes('{"a": 1}') == [{"a": 1}]
+
+
+def test_generate_single_request(llm_stub):
+    gen = SceneGenerator(model="stub")
+    scenes = gen.generate(_transcript(3, {1: "haha"}))
+    assert len(llm_stub.requests) == 1
+    assert [s["seq"] for s in scenes] == [0, 1, 2]
+    assert scenes[1]["exp"] == "EXP_Laugh"
+    assert all(s["type"] == "scene" for s in scenes)
+
+
+def test_scenes_stamped_with_whitelist_version(llm_stub):
+    version = get_compiled_whitelist().version
+    scenes = SceneGenerator(model="stub").generate(_transcript(2, {1: "FAIL"}))
+    scenes += SceneGenerator(model="stub").generate(_transcript(1))
+    assert [s["wl_version"] for s in scenes] == [version] * 3
+
+
+def test_generate_chunked_concurrent(llm_stub):
+    llm_stub.delay_s = 0.1
+    gen = SceneGenerator(model="stub", chunk_size=4, chunk_overlap=2, concurrency=3)
+    events = _transcript(22)
+    scenes = gen.generate(events)
+
+    assert len(llm_stub.requests) == 6
+    assert llm_stub.max_concurrent == 3
+    # Stitched in transcript order with stable numbering
+    assert [s["text"] for s in scenes] == [e["text"] for e in events]
+    assert [s["seq"] for s in scenes] == list(range(22))
+
+    # Every chunk after the first carries the preceding segments as context
+    prompts = [r["messages"][-1]["content"] for r in llm_stub.requests]
+    assert sum(p.startswith(CONTEXT_HEADER) for p in prompts) == 5
+    assert any("line 2" in p.split("Segments:")[0] and "line 4" in p for p in prompts)
+
+
+def test_seq_continues_across_calls(llm_stub):
+    gen = SceneGenerator(model="stub", chunk_size=2)
+    gen.generate(_transcript(5))
+    scenes = gen.generate(_transcript(3))
+    assert [s["seq"] for s in scenes] == [5, 6, 7]
+
+
+def test_scenes_array_parser_pieces():
+    scenes = [{"text": 'quote " and ] inside', "n": [1, 2]}, {"x": {"y": "}"}}]
+    raw = json.dumps({"scenes": scenes})
+    parser = ScenesArrayParser()
+    out = []
+    for i in range(0, len(raw), 3):
+        out += parser.feed(raw[i:i + 3])
+    assert out == scenes
+    assert ScenesArrayParser().feed("[[0, 1], [2, 3]]") == [[0, 1], [2, 3]]
+
+
+def test_generate_stream_emits_early(llm_stub):
+    llm_stub.piece_chars = 40
+    llm_stub.stream_delay_s = 0.05
+    mon = PerformanceMonitor()
+    gen = SceneGenerator(model="stub", monitor=mon)
+    events = _transcript(4, {1: "haha"})
+    start = time.monotonic()
+    arrivals = []
+    scenes = []
+    for scene in gen.generate_stream(events):
+        arrivals.append(time.monotonic() - start)
+        scenes.append(scene)
+    assert llm_stub.requests[0]["stream"] is True
+    assert [s["seq"] for s in scenes] == [0, 1, 2, 3]
+    assert scenes[1]["exp"] == "EXP_Laugh"
+    # The first scene arrived well before the completion finished
+    assert arrivals[0] < arrivals[-1] - 0.1
+    assert mon.report()["counters"]["llm_completion_tokens"] == 10
+    gen.close()
+
+
+def test_generate_stream_matches_generate(llm_stub):
+    events = _transcript(3, {0: "haha"})
+    for encoding in ("names", "codes"):
+        streamed = list(SceneGenerator(model="stub", encoding=encoding).generate_stream(events))
+        whole = SceneGenerator(model="stub", encoding=encoding).generate(events)
+        assert streamed == whole
+
+
+def test_generate_stream_failure_falls_back(llm_stub):
+    gen = SceneGenerator(model="stub")
+    scenes = list(gen.generate_stream(_transcript(2, {1: "FAIL"})))
+    assert [s["exp"] for s in scenes] == ["EXP_Neutral", "EXP_Neutral"]
+    assert [s["seq"] for s in scenes] == [0, 1]
+
+
+def test_system_prompt_built_once_per_whitelist():
+    wl = get_whitelist()
+    assert system_prompt(wl) is system_prompt(wl)
+    assert "STA_Stand_Front" in system_prompt(wl)
+    # A reloaded whitelist is a new object and gets a fresh prompt
+    assert system_prompt(dict(wl)) is not system_prompt(wl)
+
+
+def test_codes_encoding(llm_stub):
+    mon = PerformanceMonitor()
+    gen = SceneGenerator(model="stub", encoding="codes", monitor=mon)
+    events = _transcript(3, {2: "haha"})
+    scenes = gen.generate(events)
+    system = llm_stub.requests[0]["messages"][0]["content"]
+    assert "EXP: 0=EXP_Neutral" in system
+    assert [s["exp"] for s in scenes] == ["EXP_Neutral", "EXP_Neutral", "EXP_Laugh"]
+    assert [s["text"] for s in scenes] == [e["text"] for e in events]
+    assert scenes[0]["speaker_id"] == "alice" and scenes[2]["start"] == 2.0
+    counters = mon.report()["counters"]
+    assert counters["llm_prompt_tokens"] == 10
+    assert counters["llm_completion_tokens"] == 10
+    gen.close()
+
+
+def test_codes_encoding_repairs_bad_rows():
+    gen = SceneGenerator(model="stub", encoding="codes")
+    events = _transcript(3)
+    scenes = gen._number_and_validate(gen._decode_rows([[1, 99, 0, 0, 0], [0, 0]], events))
+    assert scenes[0]["sta"] == "STA_Stand_Side"
+    assert scenes[0]["exp"] == "EXP_Neutral"
+    assert scenes[1]["bg"] == get_whitelist()["BG"][0]
+    # Missing row: fallback scene, text still aligned
+    assert scenes[2]["text"] == "line 2"
+
+
+def test_client_reused_across_calls(llm_stub):
+    mon = PerformanceMonitor()
+    gen = SceneGenerator(model="stub", monitor=mon)
+    gen.generate(_transcript(2))
+    client = gen._client
+    gen.generate(_transcript(3))
+    assert gen._client is client
+    assert len(llm_stub.requests) == 2
+    assert len(llm_stub.connections) == 1
+    assert mon.report()["histograms"]["llm_request"]["count"] == 2
+    gen.close()
+
+
+def test_chunked_client_reused_across_calls(llm_stub):
+    gen = SceneGenerator(model="stub", chunk_size=2, concurrency=1)
+    first = gen.generate(_transcript(4))
+    client = gen._async_client
+    second = gen.generate(_transcript(4))
+    assert gen._async_client is client
+    assert [s["seq"] for s in first + second] == list(range(8))
+    assert len(llm_stub.requests) == 4
+    assert len(llm_stub.connections) == 1
+    gen.close()
+
+
+def test_failed_chunk_falls_back_in_place(llm_stub):
+    gen = SceneGenerator(model="stub", chunk_size=3, concurrency=2)
+    scenes = gen.generate(_transcript(9, {4: "FAIL"}))
+    assert [s["seq"] for s in scenes] == list(range(9))
+    # Only the failing chunk uses the neutral fallback state
+    assert [s["bg"] for s in scenes[3:6]] == ["BG_Lab_Modern"] * 3
+    assert scenes[0]["bg"] == scenes[8]["bg"] == "BG_Cafe_Starbucks"
+
+
+def test_fallback_scenes_numbering():
+    scenes = SceneGenerator(model="stub")._fallback_scenes(_transcript(2))
+    assert [s["seq"] for s in scenes] == [0, 1]
+    assert list(scenes[0])[:2] == ["type", "seq"]
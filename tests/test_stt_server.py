@@ -0,0 +1,136 @@
+"""Tests for the persistent transcription worker."""
+
+import sys
+import threading
+import types
+import wave
+
+import pytest
+from omegaconf import OmegaConf
+
+from talk2scene import cli
+from talk2scene.audio import split_at_silence
+from talk2scene.cli import _make_transcriber, _transcribe_batch
+from talk2scene.performance import PerformanceMonitor
+from talk2scene.stt_server import RemoteTranscriber, STTServer
+
+
+class FakeTranscriber:
+    def __init__(self):
+        self.calls = []
+
+    def transcribe_file(self, audio_path):
+        self.calls.append(("file", audio_path))
+        if audio_path.endswith("missing.wav"):
+            raise FileNotFoundError(audio_path)
+        return [{"type": "transcript", "start": 0.0, "end": 1.0, "text": "hello", "speaker_id": "unknown"}]
+
+    def transcribe_chunk(self, audio_bytes, sample_rate=16000):
+        self.calls.append(("chunk", len(audio_bytes), sample_rate))
+        return [{"type": "transcript", "start": 0.0, "end": 0.5, "text": "chunk", "speaker_id": "unknown"}]
+
+
+@pytest.fixture
+def server(tmp_path):
+    transcriber = FakeTranscriber()
+    srv = STTServer(transcriber, str(tmp_path / "stt.sock"), {"model_size": "base", "load_s": 1.5})
+    thread = threading.Thread(target=srv.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_requests_share_one_loaded_model(server):
+    monitor = PerformanceMonitor()
+    first = RemoteTranscriber(server.server_address, monitor=monitor)
+    second = RemoteTranscriber(server.server_address)
+    assert first.server_info["model_size"] == "base"
+    assert first.server_info["load_s"] == 1.5
+
+    assert first.transcribe_file("a.wav")[0]["text"] == "hello"
+    assert first.transcribe_file("b.wav")[0]["text"] == "hello"
+    assert second.transcribe_chunk(b"\x00\x01" * 800, 8000)[0]["text"] == "chunk"
+    first.close()
+    second.close()
+
+    kinds = [call[0] for call in server.transcriber.calls]
+    assert kinds == ["file", "file", "chunk"]
+    # Paths are sent absolute; PCM arrives intact
+    assert server.transcriber.calls[0][1].startswith("/")
+    assert server.transcriber.calls[2][1:] == (1600, 8000)
+    assert server.requests == 3
+    assert len(monitor.histograms["stt_server_request"]) == 2
+
+
+def test_server_error_is_raised_and_connection_survives(server):
+    remote = RemoteTranscriber(server.server_address)
+    with pytest.raises(RuntimeError, match="FileNotFoundError"):
+        remote.transcribe_file("missing.wav")
+    assert remote.transcribe_file("ok.wav")[0]["text"] == "hello"
+    remote.close()
+
+
+def test_no_server_raises_oserror(tmp_path):
+    with pytest.raises(OSError):
+        RemoteTranscriber(str(tmp_path / "nobody.sock"))
+
+
+def test_refuses_socket_of_live_server(server):
+    with pytest.raises(RuntimeError, match="already listening"):
+        STTServer(FakeTranscriber(), server.server_address)
+
+
+def whisper_cfg(socket_path: str, language):
+    return OmegaConf.create({
+        "model": {
+            "whisper": {
+                "model_size": "base", "language": language, "device": "cpu",
+                "server": {"enabled": True, "socket": socket_path, "timeout_s": 5},
+                "batch": {"chunk_s": 1.0, "search_s": 0.2, "workers": 2},
+            },
+            "http": {},
+        },
+    })
+
+
+@pytest.mark.parametrize("server_language,language,warm", [("en", "en", True), (None, "zh", False), ("en", "zh", False)])
+def test_server_used_only_for_same_model_and_language(tmp_path, monkeypatch, server_language, language, warm):
+    # The local fallback must not load a real model
+    monkeypatch.setitem(sys.modules, "whisper", types.SimpleNamespace(load_model=lambda size, device: object()))
+    info = {"model_size": "base", "language": server_language}
+    srv = STTServer(FakeTranscriber(), str(tmp_path / "stt.sock"), info)
+    thread = threading.Thread(target=srv.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    try:
+        monitor = PerformanceMonitor()
+        transcriber = _make_transcriber(whisper_cfg(srv.server_address, language), monitor)
+        assert isinstance(transcriber, RemoteTranscriber) == warm
+        assert monitor.gauges["transcriber_warm"] == int(warm)
+        transcriber.close()
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+
+def test_batch_chunks_go_to_the_server_without_a_pool(server, tmp_path, monkeypatch):
+    def no_pool(*args):
+        raise AssertionError("a worker pool was started")
+
+    monkeypatch.setattr(cli, "_stt_pool", no_pool)
+    wav_path = str(tmp_path / "a.wav")
+    with wave.open(wav_path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(16000)
+        wf.writeframes(bytes(3 * 16000 * 2))
+
+    monitor = PerformanceMonitor()
+    chunks = list(_transcribe_batch(whisper_cfg(server.server_address, None), wav_path, monitor))
+    ranges = split_at_silence(wav_path, 1.0, 0.2)
+    assert len(ranges) > 1
+    assert [call[0] for call in server.transcriber.calls] == ["chunk"] * len(ranges)
+    # Timestamps are in the whole file
+    assert [events[0]["start"] for events in chunks] == [round(start / 16000, 3) for start, _ in ranges]
+    assert monitor.gauges["transcription_workers"] == 1
+    assert monitor.gauges["transcriber_warm"] == 1
@@ -0,0 +1,62 @@
+"""Unit tests for subtitle wrapping and the subtitle patch cache."""
+
+from PIL import Image
+
+from talk2scene.subtitles import (
+    BOTTOM_MARGIN,
+    burn_subtitle,
+    find_subtitle_font,
+    load_font,
+    subtitle_patch,
+    wrap_text,
+)
+
+FONT_PATH = find_subtitle_font()
+
+
+def test_wrap_at_spaces():
+    font = load_font(FONT_PATH, 20)
+    text = "the quick brown fox jumps over the lazy dog"
+    lines = wrap_text(text, font, 150)
+    assert len(lines) > 1
+    assert " ".join(lines) == text
+    assert all(font.getlength(line) <= 150 for line in lines)
+
+
+def test_wrap_cjk_between_characters():
+    font = load_font(FONT_PATH, 20)
+    text = "这是一个非常非常长的中文句子用来测试字幕自动换行"
+    lines = wrap_text(text, font, 120)
+    assert len(lines) > 1
+    assert "".join(lines) == text
+    assert all(font.getlength(line) <= 120 for line in lines)
+
+
+def test_wrap_breaks_long_word():
+    font = load_font(FONT_PATH, 20)
+    lines = wrap_text("a" * 80, font, 100)
+    assert "".join(lines) == "a" * 80
+    assert all(font.getlength(line) <= 100 for line in lines)
+
+
+def test_short_text_single_line():
+    font = load_font(FONT_PATH, 20)
+    assert wrap_text("  hi there ", font, 500) == ["hi there"]
+
+
+def test_patch_is_cached_and_fits_canvas():
+    first = subtitle_patch("a long line " * 10, FONT_PATH, 20, 256)
+    assert subtitle_patch("a long line " * 10, FONT_PATH, 20, 256) is first
+    assert first.width <= 256
+    assert first.mode == "RGB"
+
+
+def test_burn_subtitle():
+    img = Image.new("RGB", (256, 256), (255, 0, 0))
+    burn_subtitle(img, "hello", FONT_PATH, 20)
+    patch = subtitle_patch("hello", FONT_PATH, 20, 256)
+    # Box sits centered above the bottom margin; the top of the canvas is untouched
+    y = 256 - BOTTOM_MARGIN - patch.height
+    assert img.getpixel(((256 - patch.width) // 2, y)) == (0, 0, 0)
+    assert img.getpixel((128, 0)) == (255, 0, 0)
+    assert img.getpixel((128, 255)) == (255, 0, 0)
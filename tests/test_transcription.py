@@ -0,0 +1,107 @@
+"""Tests for incremental stream transcription."""
+
+import struct
+import wave
+
+from talk2scene.performance import PerformanceMonitor
+from talk2scene.transcription import IncrementalTranscriber, transcribe_wav_range
+
+RATE = 1000  # samples per second; each sample holds its stream time in ms / 10
+
+
+def pcm(start_s: float, seconds: float) -> bytes:
+    first = round(start_s * RATE)
+    return b"".join(struct.pack("<h", (first + i) // 10) for i in range(round(seconds * RATE)))
+
+
+class ScriptedTranscriber:
+    """Returns the scripted segments overlapping the audio it is given.
+
+    A segment cut off by the end of the audio comes back truncated, with a
+    partial text, as a speech model would hear it.
+    """
+
+    def __init__(self, script):
+        self.script = script
+        self.decoded_s = 0.0
+
+    def transcribe_chunk(self, audio_bytes, sample_rate=16000):
+        offset = struct.unpack_from("<h", audio_bytes)[0] * 10 / RATE
+        length = len(audio_bytes) / 2 / sample_rate
+        self.decoded_s += length
+        events = []
+        for start, end, text in self.script:
+            if end <= offset or start >= offset + length:
+                continue
+            cut = end > offset + length
+            events.append({
+                "type": "transcript",
+                "start": max(start, offset) - offset,
+                "end": min(end, offset + length) - offset,
+                "text": text + "..." if cut else text,
+                "speaker_id": "unknown",
+            })
+        return events
+
+
+SCRIPT = [(0.0, 2.0, "one"), (2.5, 5.0, "two"), (6.0, 9.0, "three"), (10.0, 11.5, "four"), (13.0, 15.5, "five")]
+
+
+def test_each_segment_emitted_once_with_stream_timestamps():
+    fake = ScriptedTranscriber(SCRIPT)
+    monitor = PerformanceMonitor()
+    inc = IncrementalTranscriber(fake, sample_rate=RATE, max_window_s=30, overlap_s=1.0, settle_s=1.0, monitor=monitor)
+    emitted = []
+    for second in range(16):
+        emitted.extend(inc.feed(pcm(second, 1.0)))
+    emitted.extend(inc.flush())
+
+    assert [(e["start"], e["end"], e["text"]) for e in emitted] == SCRIPT
+    # Re-decoding the whole 16 s window per chunk would decode 136 s
+    assert fake.decoded_s < 136 / 2
+    assert monitor.counters["stt_audio_ms"] == 16000
+    assert monitor.counters["stt_segments_committed"] == 5
+
+
+def test_silence_does_not_grow_the_window():
+    fake = ScriptedTranscriber([])
+    inc = IncrementalTranscriber(fake, sample_rate=RATE, max_window_s=30, overlap_s=1.0, settle_s=1.0)
+    for second in range(20):
+        assert inc.feed(pcm(second, 1.0)) == []
+    assert inc.stream_end - inc.watermark <= 1.0
+    assert fake.decoded_s < 3 * 20
+
+
+def test_long_unbroken_speech_is_committed_at_the_window_limit():
+    fake = ScriptedTranscriber([(0.0, 4.0, "a"), (4.0, 8.0, "b"), (8.0, 12.0, "c")])
+    inc = IncrementalTranscriber(fake, sample_rate=RATE, max_window_s=5, overlap_s=0.5, settle_s=100)
+    emitted = []
+    for second in range(12):
+        emitted.extend(inc.feed(pcm(second, 1.0)))
+    emitted.extend(inc.flush())
+    assert [(e["start"], e["end"], e["text"]) for e in emitted] == [(0.0, 4.0, "a"), (4.0, 8.0, "b"), (8.0, 12.0, "c")]
+
+
+def test_gap_in_fed_audio_commits_the_buffer_first():
+    fake = ScriptedTranscriber([(0.0, 1.5, "before"), (10.0, 11.0, "after")])
+    inc = IncrementalTranscriber(fake, sample_rate=RATE, overlap_s=0.5, settle_s=1.0)
+    # The second segment is still unsettled when the first one closes
+    assert inc.feed(pcm(0.0, 2.0)) == []
+    emitted = inc.feed(pcm(9.5, 2.0), start_s=9.5)
+    emitted += inc.flush()
+    assert [(e["start"], e["end"], e["text"]) for e in emitted] == [(0.0, 1.5, "before"), (10.0, 11.0, "after")]
+    # Nothing left to decode
+    decoded = fake.decoded_s
+    assert inc.flush() == [] and fake.decoded_s == decoded
+
+
+def test_wav_range_timestamps_are_in_the_whole_file(tmp_path):
+    path = str(tmp_path / "a.wav")
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(RATE)
+        wf.writeframes(pcm(0.0, 20.0))
+    fake = ScriptedTranscriber(SCRIPT)
+    events = transcribe_wav_range(fake, path, 5 * RATE, 12 * RATE)
+    assert [(e["start"], e["end"], e["text"]) for e in events] == [(6.0, 9.0, "three"), (10.0, 11.5, "four")]
@@ -1,7 +1,20 @@
 """Unit tests for whitelist validation."""
 
+import os
+import time
+
 import pytest
-from talk2scene.whitelist import load_whitelist, validate_code, repair_code, validate_scene_event
+
+from talk2scene.whitelist import (
+    get_compiled_whitelist,
+    load_whitelist,
+    on_whitelist_change,
+    remove_whitelist_listener,
+    repair_code,
+    validate_code,
+    validate_scene_event,
+    validate_scene_events,
+)
 
 
 @pytest.fixture(autouse=True)
@@ -9,6 +22,8 @@ def reset_whitelist():
     import talk2scene.whitelist as wl
     wl._whitelist = None
     load_whitelist("conf/whitelist.yaml")
+    yield
+    load_whitelist("conf/whitelist.yaml")
 
 
 def test_load_whitelist():
@@ -61,3 +76,72 @@ def test_cg_none_is_valid():
 
 def test_cg_illustration_is_valid():
     assert validate_code("CG", "CG_PandorasTech") is True
+
+
+def test_repair_code_closest():
+    assert repair_code("EXP", "EXP_smile") == "EXP_Smile_EyesClosed"
+    assert repair_code("EXP", "exp_neutral") == "EXP_Neutral"
+    assert repair_code("EXP", "EXP_Thinkng") == "EXP_Thinking"
+    assert repair_code("CG", "CG_Pandora") == "CG_PandorasTech"
+    assert repair_code("EXP", None) == "EXP_Neutral"
+
+
+def test_reloaded_whitelist_is_recompiled():
+    import talk2scene.whitelist as wl
+    wl._whitelist = {"STA": ["STA_Only"], "EXP": [], "ACT": [], "BG": [], "CG": []}
+    assert validate_code("STA", "STA_Only") is True
+    assert repair_code("STA", "STA_Stand_Front") == "STA_Only"
+    with pytest.raises(ValueError):
+        repair_code("EXP", "EXP_Neutral")
+
+
+def test_validate_scene_events_batch():
+    valid = {"sta": "STA_Stand_Side", "exp": "EXP_Laugh", "act": "ACT_None", "bg": "BG_Lab_Modern", "cg": "CG_None"}
+    broken = {**valid, "exp": "EXP_laugh", "act": ["not", "a", "code"]}
+    result = validate_scene_events([valid, broken])
+    assert result[0] is valid
+    assert result[1] == {**valid}
+    assert broken["exp"] == "EXP_laugh"  # Repaired on a copy
+    assert result == [validate_scene_event(valid), validate_scene_event(broken)]
+
+
+def _write(path, text, mtime_ns):
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_hot_reload_swaps_version_and_notifies(tmp_path):
+    path = tmp_path / "whitelist.yaml"
+    base = "STA: [STA_Stand_Front]\nACT: [ACT_None]\nBG: [BG_Lab_Modern]\nCG: [CG_None]\n"
+    _write(path, base + "EXP: [EXP_Neutral]\n", 1_000_000_000)
+    load_whitelist(str(path), reload_s=0.01)
+    v1 = get_compiled_whitelist()
+    notified = []
+
+    def listener(old, new, changed):
+        notified.append((old.version, new.version, changed))
+
+    on_whitelist_change(listener)
+    try:
+        _write(path, base + "EXP: [EXP_Neutral, EXP_Laugh]\n", 2_000_000_000)
+        time.sleep(0.02)
+        v2 = get_compiled_whitelist()
+        assert v2.version == v1.version + 1
+        assert validate_code("EXP", "EXP_Laugh") is True
+        assert notified == [(v1.version, v2.version, frozenset({"EXP"}))]
+
+        # A broken file keeps the current version
+        _write(path, "EXP: [unclosed\n", 3_000_000_000)
+        time.sleep(0.02)
+        assert get_compiled_whitelist() is v2
+    finally:
+        remove_whitelist_listener(listener)
+
+
+def test_reload_not_checked_when_disabled(tmp_path):
+    path = tmp_path / "whitelist.yaml"
+    _write(path, "EXP: [EXP_Neutral]\n", 1_000_000_000)
+    load_whitelist(str(path))
+    compiled = get_compiled_whitelist()
+    _write(path, "EXP: [EXP_Laugh]\n", 2_000_000_000)
+    assert get_compiled_whitelist() is compiled